@@ -0,0 +1 @@
+"""Benchmarks of the app, run from the root of the project."""
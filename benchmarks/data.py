@@ -0,0 +1,45 @@
+"""Data shared by the benchmarks."""
+
+MESSAGE = ("Salut GrandPy ! Comment s'est passée ta journée d'hier ? "
+           "J'espère que tu as bien dormi et que ta sciatique va mieux. "
+           "Est-ce que tu pourrais m'indiquer l'adresse d'OpenClassrooms ? "
+           "Ma grand-mère m'a dit qu'elle se trouvait près de la Gare de "
+           "l'Est, mais je n'en suis pas sûr. ")
+
+# Questions as the users write them, one sentence each.
+QUESTIONS = ["Bonsoir Grandpy, Comment vas-tu?",
+             "Est-ce que tu pourrais m indiquer l adresse de la tour eiffel?",
+             "donne moi l'adresse de",
+             "je me trouve et je veux acceder depuis ma position",
+             "adresse openclassrooms paris?",
+             "Salut GrandPy! Est-ce que tu connais l'adresse "
+             "d’OpenClassrooms ?",
+             "Comment s'est passée ta journée d'hier ?",
+             "ÉCOLE Straße Ωμέγα  ÇA —va ?",
+             "je n'en suis pas sûr, \"vraiment\" ; aujourd'hui"]
+
+PARAGRAPH = ("La cité Paradis est une voie publique située dans le 10e "
+             "arrondissement de Paris. Elle débute au 43, rue de Paradis et "
+             "se termine en impasse. Son nom vient de la rue de Paradis, "
+             "qui doit elle-même son nom à une enseigne. ")
+
+
+def make_extract(sections=40, paragraphs=6):
+    """This function builds an extract with the size and the layout of the
+    extract of a long wikipedia article.
+
+    Args:
+        sections (Int, optional): Number of sections.
+        paragraphs (Int, optional): Number of paragraphs by section.
+
+    Returns:
+        [String]: Extract, about 1 kB by paragraph.
+    """
+    parts = [PARAGRAPH * 4]
+    for number in range(sections):
+        parts.append(f"\n\n\n== Section {number} ==\n")
+        if number % 4 == 0:
+            parts.append(f"\n=== Sous-section {number} ===\n")
+        parts.extend((PARAGRAPH * 4) + "\n" for i in range(paragraphs))
+
+    return "".join(parts)
@@ -0,0 +1,264 @@
+"""Load generator for the /form endpoint of the app.
+
+The questions are sent at a fixed rate, whatever the time the app takes to
+answer, and the latency of a question is measured from the time it was
+scheduled, so a slow app can't hide its queue. The report gives the
+throughput, the percentiles of the latency, and a breakdown by stage: the
+stages of the app from its Server-Timing header, when it sends one, and the
+stages of the apis from the stubs of `benchmarks.stubs`.
+
+Usage:
+    python -m benchmarks.loadgen http://127.0.0.1:5000/form --rps 50 \
+        --duration 30 --stubs http://127.0.0.1:8001
+"""
+import argparse
+import math
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+QUESTION = ("Salut GrandPy ! Est-ce que tu connais l'adresse de la "
+            "{place} a {city}?")
+
+# Letters only: the parser keeps the questions made of letters and
+# punctuation marks, so a number would make every question parse to ''.
+PLACES = ["rue des Lilas", "place Bellecour", "avenue Foch",
+          "rue de la Paix", "boulevard Voltaire", "quai des Orfevres",
+          "rue Lepic", "place du Marche", "avenue Jean Jaures",
+          "rue Victor Hugo", "cours Mirabeau", "rue Nationale",
+          "place Carnot", "rue du Moulin", "avenue Pasteur",
+          "rue Gambetta", "place de la Bastille", "rue des Rosiers",
+          "boulevard Saint Michel", "rue Montmartre"]
+CITIES = ["Paris", "Lyon", "Marseille", "Bordeaux", "Nantes", "Lille",
+          "Toulouse", "Rennes", "Strasbourg", "Grenoble"]
+
+
+def make_questions(unique):
+    """This function get distinct questions, each one with its own address.
+
+    Args:
+        unique (Int): Number of distinct questions.
+
+    Returns:
+        [List]: Questions.
+    """
+    if not 0 < unique <= len(PLACES) * len(CITIES):
+        raise ValueError(f"unique must be between 1 and "
+                         f"{len(PLACES) * len(CITIES)}")
+
+    return [QUESTION.format(place=PLACES[number % len(PLACES)],
+                            city=CITIES[number // len(PLACES)])
+            for number in range(unique)]
+
+
+def percentile(values, rank):
+    """This function get a percentile of a list of values, by the nearest
+    rank method.
+
+    Args:
+        values (List): Values, sorted.
+        rank (Float): Percentile, between 0 and 100.
+
+    Returns:
+        [Float]: Value of the percentile, or None without value.
+    """
+    if not values:
+        return None
+
+    index = math.ceil(rank / 100 * len(values)) - 1
+    return values[max(0, min(len(values) - 1, index))]
+
+
+def parse_server_timing(header):
+    """This function parses a Server-Timing header.
+
+    Args:
+        header (String): Value of the header, like "google;dur=12.5, wiki".
+
+    Returns:
+        [Dict]: Contains the duration of each stage, in milliseconds.
+    """
+    timings = {}
+    for metric in filter(None, (part.strip() for part in header.split(","))):
+        name, *params = (param.strip() for param in metric.split(";"))
+        for param in params:
+            key, _, value = param.partition("=")
+            if key == "dur":
+                try:
+                    timings[name] = float(value)
+                except ValueError:
+                    pass
+
+    return timings
+
+
+class Recorder:
+    def __init__(self):
+        """Constructor of the class Recorder."""
+        self.latencies = []
+        self.statuses = {}
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def add(self, latency, status, timings):
+        """This method records the answer to a question.
+
+        Args:
+            latency (Float): Latency, in seconds.
+            status (String): Status code, or the name of the error.
+            timings (Dict): Duration of each stage of the app, in ms.
+        """
+        with self._lock:
+            self.latencies.append(latency)
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            for stage, duration in timings.items():
+                self.stages.setdefault(stage, []).append(duration / 1000)
+
+
+def send(session, url, question, scheduled, recorder, timeout):
+    """This function sends a question and records the answer.
+
+    Args:
+        session (Session): Session of the worker.
+        url (String): Url of the /form endpoint.
+        question (String): Question.
+        scheduled (Float): Time the question was scheduled, from
+        time.perf_counter.
+        recorder (Recorder): Recorder of the answers.
+        timeout (Float): Timeout of the request, in seconds.
+    """
+    timings = {}
+    try:
+        response = session.post(url, data={"user_text": question},
+                                timeout=timeout)
+        status = str(response.status_code)
+        timings = parse_server_timing(
+            response.headers.get("Server-Timing", ""))
+    except requests.RequestException as error:
+        status = error.__class__.__name__
+
+    recorder.add(time.perf_counter() - scheduled, status, timings)
+
+
+def run(url, rps, duration, workers=64, unique=100, timeout=10):
+    """This function sends the questions at a fixed rate.
+
+    Args:
+        url (String): Url of the /form endpoint.
+        rps (Float): Number of questions by second.
+        duration (Float): Duration of the run, in seconds.
+        workers (Int, optional): Maximum number of questions in flight.
+        unique (Int, optional): Number of distinct questions.
+        timeout (Float, optional): Timeout of a request, in seconds.
+
+    Returns:
+        [Tuple]: Contains the recorder and the duration of the run.
+    """
+    recorder = Recorder()
+    local = threading.local()
+    questions = make_questions(unique)
+
+    def task(question, scheduled):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        send(local.session, url, question, scheduled, recorder, timeout)
+
+    total = int(rps * duration)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for number in range(total):
+            scheduled = start + number / rps
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(task, questions[number % unique], scheduled)
+
+    return recorder, time.perf_counter() - start
+
+
+def summarize(latencies):
+    """This function get the summary of a list of latencies.
+
+    Args:
+        latencies (List): Latencies, in seconds.
+
+    Returns:
+        [String]: Number, p50, p95 and p99 in milliseconds.
+    """
+    latencies = sorted(latencies)
+    ranks = " ".join(f"p{rank}={percentile(latencies, rank) * 1000:8.1f}ms"
+                     for rank in (50, 95, 99))
+    return f"{len(latencies):7d}  {ranks}"
+
+
+def report(recorder, elapsed, stubs_stats=None):
+    """This function get the report of a run.
+
+    Args:
+        recorder (Recorder): Recorder of the answers.
+        elapsed (Float): Duration of the run, in seconds.
+        stubs_stats (Dict, optional): Stats of the stubs.
+
+    Returns:
+        [String]: Report.
+    """
+    lines = [f"questions: {len(recorder.latencies)} in {elapsed:.1f}s, "
+             f"{len(recorder.latencies) / elapsed:.1f}/s",
+             "statuses:  " + ", ".join(
+                 f"{status}={count}"
+                 for status, count in sorted(recorder.statuses.items()))]
+    if recorder.latencies:
+        lines.append(f"{'total':<18}{summarize(recorder.latencies)}")
+    for stage, durations in sorted(recorder.stages.items()):
+        lines.append(f"{'app.' + stage:<18}{summarize(durations)}")
+    for stage, stats in sorted((stubs_stats or {}).items()):
+        if stats["latencies"]:
+            lines.append(f"{'api.' + stage:<18}"
+                         f"{summarize(stats['latencies'])}"
+                         f"  errors={stats['errors']}")
+
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """This function runs the load generator and prints its report."""
+    parser = argparse.ArgumentParser(
+        description="Send questions to the /form endpoint at a fixed rate.")
+    parser.add_argument('url', nargs='?', default="http://127.0.0.1:5000/form")
+    parser.add_argument('--rps', type=float, default=20,
+                        help="questions by second")
+    parser.add_argument('--duration', type=float, default=10,
+                        help="duration of the run, in seconds")
+    parser.add_argument('--workers', type=int, default=64,
+                        help="maximum number of questions in flight")
+    parser.add_argument('--unique', type=int, default=100,
+                        help="number of distinct questions")
+    parser.add_argument('--timeout', type=float, default=10,
+                        help="timeout of a request, in seconds")
+    parser.add_argument('--stubs', metavar='URL',
+                        help="url of the stubs, for the stages of the apis")
+    args = parser.parse_args(argv)
+
+    try:
+        make_questions(args.unique)
+    except ValueError as error:
+        parser.error(str(error))
+
+    if args.stubs:
+        requests.delete(f"{args.stubs}/_stats")
+
+    recorder, elapsed = run(args.url, args.rps, args.duration, args.workers,
+                            args.unique, args.timeout)
+
+    stubs_stats = None
+    if args.stubs:
+        stubs_stats = requests.get(f"{args.stubs}/_stats").json()
+
+    print(report(recorder, elapsed, stubs_stats))
+
+
+if __name__ == '__main__':
+    main()
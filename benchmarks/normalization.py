@@ -0,0 +1,68 @@
+"""Benchmark of the normalization of the message of the user.
+
+Compares the chain of Parser methods with the single translation of
+Parser.normalize on a long pasted message.
+
+Usage:
+    python -m benchmarks.normalization
+"""
+import timeit
+
+from benchmarks import data
+from flaskr.models import Parser
+
+MESSAGE = data.MESSAGE * 40
+
+
+def chain(message):
+    """This function normalizes the message with the chain of methods.
+
+    Args:
+        message (String): Message from the user.
+
+    Returns:
+        [String]: Normalized message.
+    """
+    parser = Parser(message)
+    parser.set_lowercase()
+    parser.remove_accents()
+    parser.remove_apostrof()
+    parser.remove_hyphen()
+    parser.remove_stop_words()
+
+    return parser.message
+
+
+def single_pass(message):
+    """This function normalizes the message with Parser.normalize.
+
+    Args:
+        message (String): Message from the user.
+
+    Returns:
+        [String]: Normalized message.
+    """
+    return Parser(message).normalize()
+
+
+def main(number=200):
+    """This function runs the benchmark and prints the results.
+
+    Args:
+        number (Int, optional): Number of runs of each function.
+    """
+    assert chain(MESSAGE) == single_pass(MESSAGE)
+
+    print(f"message: {len(MESSAGE)} characters, {number} runs")
+    results = {}
+    for function in (chain, single_pass):
+        seconds = min(timeit.repeat(lambda: function(MESSAGE),
+                                    number=number, repeat=5))
+        results[function.__name__] = seconds / number
+        print(f"{function.__name__:>12}: {seconds / number * 1e6:9.1f} us")
+
+    print(f"     speedup: {results['chain'] / results['single_pass']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+"""Benchmark of the cold start of the app.
+
+The benchmark runs the way gunicorn starts its workers: a master process is
+forked into workers, and each worker answers a first question. Without
+preload, each worker imports the app after the fork and loads the stemmer,
+the tokenizer data and the resources on its first question. With preload,
+the master imports the app and calls `flaskr.startup.preload` before the
+fork. The report gives, for each worker, the time of the import and of the
+first question, its resident memory, and its private memory: the part of
+the resident memory not shared with the other processes. The apis are
+replaced by canned responses.
+
+Usage:
+    python -m benchmarks.startup --workers 4 [--preload]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from unittest import mock
+
+
+def private_memory():
+    """This function get the private memory of the current process.
+
+    Returns:
+        [Int]: Private memory, in bytes, or None where /proc is not
+        available.
+    """
+    try:
+        with open('/proc/self/smaps_rollup') as smaps:
+            return sum(int(line.split()[1]) * 1024 for line in smaps
+                       if line.startswith(('Private_Clean:',
+                                           'Private_Dirty:')))
+    except OSError:
+        return None
+
+
+def import_app():
+    """This function imports the app.
+
+    Returns:
+        [Float]: Time of the import, in seconds.
+    """
+    start = time.perf_counter()
+    import flaskr.run  # noqa: F401
+
+    return time.perf_counter() - start
+
+
+def first_question():
+    """This function answers a first question with the test client of the
+    app.
+
+    Returns:
+        [Tuple]: Contains the time of the answer, in seconds, and its status
+        code, or the name of the error raised by the app.
+    """
+    from benchmarks.data import MESSAGE
+    from benchmarks.suite import FakeSession
+    from flaskr.run import app
+
+    start = time.perf_counter()
+    with mock.patch('flaskr.models.get_session', return_value=FakeSession()):
+        try:
+            status = app.test_client().post(
+                '/form', data={'user_text': MESSAGE}).status_code
+        except Exception as error:
+            status = error.__class__.__name__
+
+    return time.perf_counter() - start, status
+
+
+def run_worker(preloaded):
+    """This function runs a worker: it imports the app if the master didn't,
+    then answers a first question.
+
+    Args:
+        preloaded (Boolean): True if the master has imported the app.
+
+    Returns:
+        [Dict]: Contains the times, in seconds, and the memory, in bytes.
+    """
+    from flaskr.startup import resident_memory
+
+    import_seconds = 0.0 if preloaded else import_app()
+    answer_seconds, status = first_question()
+
+    return {"import": import_seconds, "first_question": answer_seconds,
+            "status": status, "rss": resident_memory(),
+            "private": private_memory()}
+
+
+def run(workers, preload):
+    """This function forks the workers and collects their reports.
+
+    Args:
+        workers (Int): Number of workers.
+        preload (Boolean): Import the app and preload its state in the
+        master.
+
+    Returns:
+        [Tuple]: Contains the report of the master and the report of each
+        worker.
+    """
+    master = {"import": 0.0, "preload": {}}
+    if preload:
+        master["import"] = import_app()
+        from flaskr.startup import preload as preload_state
+        master["preload"] = preload_state()
+
+    reports = []
+    for number in range(workers):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            try:
+                os.close(read_fd)
+                with os.fdopen(write_fd, 'w') as pipe:
+                    json.dump(run_worker(preload), pipe)
+            finally:
+                os._exit(0)
+
+        os.close(write_fd)
+        with os.fdopen(read_fd) as pipe:
+            reports.append(json.load(pipe))
+        os.waitpid(pid, 0)
+
+    return master, reports
+
+
+def report(master, reports):
+    """This function get the report of a run.
+
+    Args:
+        master (Dict): Report of the master.
+        reports (List): Report of each worker.
+
+    Returns:
+        [String]: Report.
+    """
+    def mebibytes(value):
+        return "    n/a" if value is None else f"{value / 2 ** 20:6.1f}M"
+
+    lines = [f"master: import={master['import'] * 1000:.0f}ms " + " ".join(
+        f"{name}={seconds * 1000:.0f}ms"
+        for name, seconds in master['preload'].items())]
+    for number, worker in enumerate(reports):
+        lines.append(
+            f"worker {number}: import={worker['import'] * 1000:6.0f}ms  "
+            f"first question={worker['first_question'] * 1000:6.0f}ms "
+            f"({worker['status']})  rss={mebibytes(worker['rss'])}  "
+            f"private={mebibytes(worker['private'])}")
+
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """This function runs the benchmark and prints its report."""
+    parser = argparse.ArgumentParser(
+        description="Measure the cold start of the workers of the app.")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--preload', action='store_true',
+                        help="import and preload the app before the fork")
+    args = parser.parse_args(argv)
+
+    if 'flaskr.models' in sys.modules:
+        parser.error("the app must not be imported before the benchmark")
+
+    print(report(*run(args.workers, args.preload)))
+
+
+if __name__ == '__main__':
+    main()
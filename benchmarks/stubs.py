@@ -0,0 +1,316 @@
+"""Local stand-ins for the google geocoding api and the media wiki api.
+
+The stubs answer the requests the app sends, with a configurable latency,
+error rate and size of the extracts, so the app can be load tested without
+using the quota of the google api. Both apis are served by the same server:
+
+    GOOGLE.URL:     http://127.0.0.1:8001/maps/api/geocode/json
+    MEDIA_WIKI.URL: http://127.0.0.1:8001/w/api.php
+
+Set these urls in configuration/config.yml before starting the app. The
+latency of each api follows a log-normal distribution given by its median
+and its sigma. GET /_stats returns the number of requests, the number of
+errors and the latencies served by each stage of the pipeline.
+
+Usage:
+    python -m benchmarks.stubs --port 8001 --google-latency 40 \
+        --wiki-latency 80 --error-rate 0.01 --extract-size 20000
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks.data import make_extract
+
+GOOGLE_PATH = "/maps/api/geocode/json"
+WIKI_PATH = "/w/api.php"
+FIRST_PAGE_ID = 51281575
+
+
+class Upstream:
+    def __init__(self, median, sigma, error_rate):
+        """Constructor of the class Upstream.
+
+        Args:
+            median (Float): Median latency, in milliseconds.
+            sigma (Float): Sigma of the log-normal distribution of latency.
+            error_rate (Float): Rate of the requests answered with an error.
+        """
+        self.median = median
+        self.sigma = sigma
+        self.error_rate = error_rate
+
+    def delay(self):
+        """This method get the latency of a request.
+
+        Returns:
+            [Float]: Latency, in seconds.
+        """
+        if self.median <= 0:
+            return 0.0
+        return random.lognormvariate(math.log(self.median),
+                                     self.sigma) / 1000
+
+    def fails(self):
+        """This method tells if a request is answered with an error.
+
+        Returns:
+            [Boolean]: True if the request fails.
+        """
+        return random.random() < self.error_rate
+
+
+class Stats:
+    def __init__(self):
+        """Constructor of the class Stats."""
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage, latency, error):
+        """This method records a request served by the stubs.
+
+        Args:
+            stage (String): Stage of the pipeline.
+            latency (Float): Latency served, in seconds.
+            error (Boolean): True if the request failed.
+        """
+        with self._lock:
+            stats = self._stages.setdefault(
+                stage, {"requests": 0, "errors": 0, "latencies": []})
+            stats["requests"] += 1
+            stats["errors"] += error
+            stats["latencies"].append(latency)
+
+    def snapshot(self):
+        """This method get the stats of each stage.
+
+        Returns:
+            [Dict]: Contains the number of requests, the number of errors and
+            the latencies of each stage.
+        """
+        with self._lock:
+            return {stage: {"requests": stats["requests"],
+                            "errors": stats["errors"],
+                            "latencies": list(stats["latencies"])}
+                    for stage, stats in self._stages.items()}
+
+    def clear(self):
+        """This method forgets the recorded requests."""
+        with self._lock:
+            self._stages.clear()
+
+
+def geocode(params):
+    """This function get the answer of the google api.
+
+    Args:
+        params (Dict): Parameters of the request.
+
+    Returns:
+        [Dict]: Data of the answer.
+    """
+    address = params.get("address", "")
+    seed = sum(map(ord, address))
+    return {"results": [
+        {"formatted_address": f"{seed % 100} Cité Paradis, 75010 Paris, "
+                              "France",
+         "geometry": {"location": {"lat": 48.8 + seed % 100 / 1000,
+                                   "lng": 2.3 + seed % 97 / 1000}}}],
+        "status": "OK"}
+
+
+def page(page_id, extract, distance):
+    """This function get a page of the answer of the media wiki api.
+
+    Args:
+        page_id (Int): Page id.
+        extract (String): Extract of the page, or None to leave it out.
+        distance (Float): Distance of the page, in metres.
+
+    Returns:
+        [Dict]: Data of the page.
+    """
+    data = {"pageid": page_id,
+            "lastrevid": 1,
+            "coordinates": [{"dist": distance}],
+            "fullurl": f"https://fr.wikipedia.org/?curid={page_id}"}
+    if extract is not None:
+        data["extract"] = extract
+
+    return data
+
+
+def wiki(params, extract, pages):
+    """This function get the answer of the media wiki api, for a geosearch,
+    a geosearch with the extracts of the pages, or a page. The extracts are
+    cut at "exchars" characters and the geosearches at their limit, as the
+    api does. As the api without "exintro", a geosearch with the extracts
+    gives the extract of a single page, the first by page id.
+
+    Args:
+        params (Dict): Parameters of the request.
+        extract (String): Extract of the pages.
+        pages (Int): Number of pages near a point.
+
+    Returns:
+        [Tuple]: Contains the name of the stage and the data of the answer.
+    """
+    if params.get("list") == "geosearch":
+        pages = min(pages, int(params.get("gslimit", pages)))
+        return "geosearch", {"query": {"geosearch": [
+            {"pageid": FIRST_PAGE_ID + number, "dist": 100.0 * number}
+            for number in range(pages)]}}
+
+    if len(extract) > int(params.get("exchars", len(extract))):
+        extract = extract[:int(params["exchars"])] + "…"
+
+    if params.get("generator") == "geosearch":
+        pages = min(pages, int(params.get("ggslimit", pages)))
+        return "geosearch_pages", {"query": {"pages": {
+            str(FIRST_PAGE_ID + number): page(
+                FIRST_PAGE_ID + number, extract if number == 0 else None,
+                100.0 * number)
+            for number in range(pages)}}}
+
+    page_id = int(params.get("pageids", FIRST_PAGE_ID))
+    return "page", {"query": {"pages": {
+        str(page_id): page(page_id, extract, 0.0)}}}
+
+
+def make_handler(google, media_wiki, extract, pages, stats):
+    """This function creates the handler of the requests of the stubs.
+
+    Args:
+        google (Upstream): Behaviour of the google api.
+        media_wiki (Upstream): Behaviour of the media wiki api.
+        extract (String): Extract of the pages.
+        pages (Int): Number of pages near a point.
+        stats (Stats): Stats of the served requests.
+
+    Returns:
+        [Class]: Handler of the requests.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def handle(self):
+            try:
+                super().handle()
+            except (BrokenPipeError, ConnectionResetError):
+                # The app stops reading a page once it has its first section.
+                pass
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            params = {key: values[-1]
+                      for key, values in parse_qs(url.query).items()}
+
+            if url.path == "/_stats":
+                return self.send(200, stats.snapshot())
+            if url.path == GOOGLE_PATH:
+                upstream = google
+                stage, data = "geocode", geocode(params)
+            elif url.path == WIKI_PATH:
+                upstream = media_wiki
+                stage, data = wiki(params, extract, pages)
+            else:
+                return self.send(404, {"error": "not found"})
+
+            delay = upstream.delay()
+            time.sleep(delay)
+            error = upstream.fails()
+            stats.add(stage, delay, error)
+            if error:
+                return self.send(503, {"error": "unavailable"})
+
+            self.send(200, data)
+
+        def do_DELETE(self):
+            if urlsplit(self.path).path != "/_stats":
+                return self.send(404, {"error": "not found"})
+            stats.clear()
+            self.send(200, {})
+
+        def send(self, status, data):
+            body = json.dumps(data).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def make_server(host, port, google, media_wiki, extract_size=20000,
+                pages=3):
+    """This function creates the server of the stubs.
+
+    Args:
+        host (String): Host of the server.
+        port (Int): Port of the server, 0 for any free port.
+        google (Upstream): Behaviour of the google api.
+        media_wiki (Upstream): Behaviour of the media wiki api.
+        extract_size (Int, optional): Size of the extracts, in characters.
+        pages (Int, optional): Number of pages near a point.
+
+    Returns:
+        [ThreadingHTTPServer]: Server, not started.
+    """
+    extract = make_extract(sections=max(2, extract_size // 950),
+                           paragraphs=1)[:extract_size]
+    handler = make_handler(google, media_wiki, extract, pages, Stats())
+
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    """This function starts the stubs."""
+    parser = argparse.ArgumentParser(
+        description="Serve local stand-ins for the google and media wiki "
+                    "apis.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--google-latency', type=float, default=40,
+                        help="median latency of the google api, in ms")
+    parser.add_argument('--wiki-latency', type=float, default=80,
+                        help="median latency of the media wiki api, in ms")
+    parser.add_argument('--sigma', type=float, default=0.5,
+                        help="sigma of the log-normal latencies")
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help="rate of the requests answered with a 503")
+    parser.add_argument('--extract-size', type=int, default=20000,
+                        help="size of the extracts, in characters")
+    parser.add_argument('--pages', type=int, default=3,
+                        help="number of pages near a point")
+    args = parser.parse_args(argv)
+
+    server = make_server(
+        args.host, args.port,
+        Upstream(args.google_latency, args.sigma, args.error_rate),
+        Upstream(args.wiki_latency, args.sigma, args.error_rate),
+        args.extract_size, args.pages)
+    host, port = server.server_address[:2]
+    print(f"GOOGLE.URL:     http://{host}:{port}{GOOGLE_PATH}")
+    print(f"MEDIA_WIKI.URL: http://{host}:{port}{WIKI_PATH}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
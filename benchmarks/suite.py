@@ -0,0 +1,289 @@
+"""Micro-benchmarks of the parser and of the pipeline of the app.
+
+Every benchmark is timed with timeit and reported as the best time of one
+call. The results can be saved as a baseline, and a later run can be compared
+with this baseline: the benchmarks slower than the baseline by more than the
+threshold are reported as regressions, and the command exits with status 1.
+The apis are replaced by canned responses, so no request leaves the machine.
+
+Usage:
+    python -m benchmarks.suite run [--save benchmarks/baseline.json]
+    python -m benchmarks.suite compare [benchmarks/baseline.json]
+                                       [--threshold 0.1]
+"""
+import argparse
+import json
+import platform
+import sys
+import timeit
+
+from unittest import mock
+
+from benchmarks.data import MESSAGE, QUESTIONS, make_extract
+from flaskr import models
+from flaskr.models import Parser
+from flaskr.sections import PageReader, SectionScanner
+from flaskr.utils import (parse_data_from_user, parse_data_from_wiki,
+                          treat_data_from_user)
+
+DEFAULT_BASELINE = "benchmarks/baseline.json"
+DEFAULT_THRESHOLD = 0.1
+
+EXTRACT = make_extract()
+
+GOOGLE_DATA = {"results": [
+    {"formatted_address": "7 Cité Paradis, 75010 Paris, France",
+     "geometry": {"location": {"lat": 48.874847, "lng": 2.350487}}}],
+    "status": "OK"}
+
+WIKI_DATA = {"query": {"pages": {"51281575": {
+    "pageid": 51281575,
+    "coordinates": [{"dist": 138}],
+    "lastrevid": 1,
+    "extract": EXTRACT,
+    "fullurl": "https://fr.wikipedia.org/wiki/Cit%C3%A9_Paradis"}}}}
+
+WIKI_TEXT = json.dumps(WIKI_DATA)
+CHUNK_SIZE = 8192
+
+
+class FakeResponse:
+    def __init__(self, data):
+        """Constructor of the class FakeResponse.
+
+        Args:
+            data (Dict): Data of the response.
+        """
+        self.status_code = 200
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+class FakeSession:
+    """Session which answers the requests with canned responses."""
+
+    def get(self, url, params=None, **kwargs):
+        if 'address' in params:
+            return FakeResponse(GOOGLE_DATA)
+        return FakeResponse(WIKI_DATA)
+
+
+def parser_method(name, message):
+    """This function get a benchmark of a method of the Parser.
+
+    Args:
+        name (String): Name of the method.
+        message (String): Message of the parser.
+
+    Returns:
+        [Function]: Calls the method on a new parser.
+    """
+    def benchmark():
+        getattr(Parser(message), name)()
+
+    return benchmark
+
+
+def read_page():
+    """This function reads the response of a page chunk by chunk, until its
+    first section."""
+    reader = PageReader(SectionScanner(limit=1))
+    for start in range(0, len(WIKI_TEXT), CHUNK_SIZE):
+        reader.feed(WIKI_TEXT[start:start + CHUNK_SIZE])
+    reader.close()
+
+
+def tokenizer(name):
+    """This function get a benchmark of a tokenizer, which tokenizes each of
+    the normalized questions.
+
+    Args:
+        name (String): Name of the tokenizer, in `models.TOKENIZERS`.
+
+    Returns:
+        [Function]: Tokenizes the questions.
+    """
+    questions = [Parser(question).normalize() for question in QUESTIONS]
+
+    def benchmark():
+        for question in questions:
+            models.TOKENIZERS[name](question)
+
+    return benchmark
+
+
+def treat_cold():
+    """This function treats a question with empty caches."""
+    for cache in (models.geocode_cache, models.geosearch_cache,
+                  models.page_cache):
+        cache.clear()
+    treat_data_from_user(MESSAGE)
+
+
+def treat_warm():
+    """This function treats a question answered by the caches."""
+    treat_data_from_user(MESSAGE)
+
+
+BENCHMARKS = {
+    "parser.set_lowercase": parser_method("set_lowercase", MESSAGE * 40),
+    "parser.remove_accents": parser_method("remove_accents", MESSAGE * 40),
+    "parser.remove_apostrof": parser_method("remove_apostrof", MESSAGE * 40),
+    "parser.remove_hyphen": parser_method("remove_hyphen", MESSAGE * 40),
+    "parser.remove_stop_words": parser_method("remove_stop_words",
+                                              MESSAGE * 40),
+    "parser.normalize": parser_method("normalize", MESSAGE * 40),
+    "parser.extract_questions": parser_method(
+        "extract_questions", Parser(MESSAGE * 40).normalize()),
+    "parser.split_sections": parser_method("split_sections", EXTRACT),
+    "parser.get_section": parser_method("get_section", EXTRACT),
+    "sections.read_page": read_page,
+    "tokenize.regex": tokenizer("regex"),
+    "tokenize.nltk": tokenizer("nltk"),
+    "utils.parse_data_from_user": lambda: parse_data_from_user(MESSAGE),
+    "utils.parse_data_from_wiki": lambda: parse_data_from_wiki(EXTRACT),
+    "utils.treat_data_from_user.cold": treat_cold,
+    "utils.treat_data_from_user.warm": treat_warm,
+}
+
+
+def measure(function, repeat=5):
+    """This function get the best time of one call of a function.
+
+    Args:
+        function (Function): Function to be timed.
+        repeat (Int, optional): Number of timings.
+
+    Returns:
+        [Float]: Time of one call, in seconds.
+    """
+    timer = timeit.Timer(function)
+    number, seconds = timer.autorange()
+    timings = [seconds] + timer.repeat(repeat=repeat - 1, number=number)
+
+    return min(timings) / number
+
+
+def run(names=None):
+    """This function runs the benchmarks, with the apis replaced by canned
+    responses.
+
+    Args:
+        names (List, optional): Names of the benchmarks. Defaults to all.
+
+    Returns:
+        [Dict]: Contains the time of one call of each benchmark, in seconds.
+        The benchmarks which can't run (missing NLTK data...) are skipped.
+    """
+    results = {}
+    with mock.patch('flaskr.models.get_session', return_value=FakeSession()):
+        for name in names or BENCHMARKS:
+            try:
+                results[name] = measure(BENCHMARKS[name])
+            except LookupError as error:
+                print(f"{name}: skipped ({error.__class__.__name__})",
+                      file=sys.stderr)
+
+    return results
+
+
+def compare(baseline, results, threshold=DEFAULT_THRESHOLD):
+    """This function compares the results of a run with a baseline.
+
+    Args:
+        baseline (Dict): Time of one call of each benchmark, in seconds.
+        results (Dict): Time of one call of each benchmark, in seconds.
+        threshold (Float, optional): Slowdown above which a benchmark is a
+        regression, 0.1 for 10 %.
+
+    Returns:
+        [List]: Contains a tuple (name, baseline, result, ratio, regression)
+        for each benchmark of both runs.
+    """
+    rows = []
+    for name in results:
+        if name not in baseline:
+            continue
+        ratio = results[name] / baseline[name]
+        rows.append((name, baseline[name], results[name], ratio,
+                     ratio > 1 + threshold))
+
+    return rows
+
+
+def save(path, results):
+    """This function saves the results of a run as a baseline.
+
+    Args:
+        path (String): Path of the baseline file.
+        results (Dict): Time of one call of each benchmark, in seconds.
+    """
+    with open(path, 'w', encoding='utf-8') as baseline_file:
+        json.dump({"python": platform.python_version(),
+                   "machine": platform.machine(),
+                   "benchmarks": results}, baseline_file, indent=2,
+                  sort_keys=True)
+
+
+def load(path):
+    """This function loads a baseline.
+
+    Args:
+        path (String): Path of the baseline file.
+
+    Returns:
+        [Dict]: Time of one call of each benchmark, in seconds.
+    """
+    with open(path, encoding='utf-8') as baseline_file:
+        return json.load(baseline_file)["benchmarks"]
+
+
+def main(argv=None):
+    """This function runs the benchmarks, saves them or compares them with a
+    baseline.
+
+    Returns:
+        [Int]: Exit status, 1 if a regression is found.
+    """
+    parser = argparse.ArgumentParser(
+        description="Run the micro-benchmarks of the app.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help="run the benchmarks")
+    run_parser.add_argument('--save', metavar='PATH',
+                            help="save the results as a baseline")
+    compare_parser = commands.add_parser(
+        'compare', help="compare a run with a baseline")
+    compare_parser.add_argument('baseline', nargs='?',
+                                default=DEFAULT_BASELINE)
+    compare_parser.add_argument('--threshold', type=float,
+                                default=DEFAULT_THRESHOLD,
+                                help="slowdown reported as a regression")
+    for command_parser in (run_parser, compare_parser):
+        command_parser.add_argument('-k', dest='names', action='append',
+                                    choices=sorted(BENCHMARKS),
+                                    help="run only this benchmark")
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        results = run(args.names)
+        for name, seconds in results.items():
+            print(f"{name:<34} {seconds * 1e6:12.1f} us")
+        if args.save:
+            save(args.save, results)
+            print(f"baseline saved to {args.save}")
+        return 0
+
+    baseline = load(args.baseline)
+    rows = compare(baseline, run(args.names), args.threshold)
+    for name, before, after, ratio, regression in rows:
+        flag = "REGRESSION" if regression else ""
+        print(f"{name:<34} {before * 1e6:12.1f} us {after * 1e6:12.1f} us "
+              f"{ratio:6.2f}x {flag}")
+
+    return 1 if any(row[4] for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
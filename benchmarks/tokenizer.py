@@ -0,0 +1,116 @@
+"""Benchmark of the tokenizers of the questions.
+
+Each tokenizer of `flaskr.models.TOKENIZERS` is run in a new process, the
+way a worker tokenizes its first question. The report gives, for each
+tokenizer, the time and the memory of the first tokenization, which imports
+NLTK and loads its punkt model for the "nltk" tokenizer, then the time of
+one tokenization of a question, over the normalized questions of
+`benchmarks.data.QUESTIONS`.
+
+Usage:
+    python -m benchmarks.tokenizer [--tokenizers regex nltk]
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+import timeit
+import tracemalloc
+
+
+def measure(name):
+    """This function measures a tokenizer in the current process.
+
+    Args:
+        name (String): Name of the tokenizer.
+
+    Returns:
+        [Dict]: Contains the times, in seconds, and the memory, in bytes, or
+        the name of the error raised by the tokenizer.
+    """
+    from benchmarks.data import QUESTIONS
+    from flaskr.models import TOKENIZERS, Parser
+    from flaskr.startup import resident_memory
+
+    tokenize = TOKENIZERS[name]
+    questions = [Parser(question).normalize() for question in QUESTIONS]
+
+    rss = resident_memory()
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        tokenize(questions[0])
+    except LookupError as error:
+        return {"error": error.__class__.__name__}
+    first = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    timer = timeit.Timer(lambda: [tokenize(question)
+                                  for question in questions])
+    number, _ = timer.autorange()
+    seconds = min(timer.repeat(repeat=5, number=number)) / number
+
+    return {"first": first, "peak": peak, "rss": resident_memory() - rss,
+            "question": seconds / len(questions)}
+
+
+def run(names):
+    """This function measures each tokenizer in a new process.
+
+    Args:
+        names (List): Names of the tokenizers.
+
+    Returns:
+        [Dict]: Contains the report of each tokenizer.
+    """
+    reports = {}
+    for name in names:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.tokenizer", "--child", name],
+            capture_output=True, text=True, check=True)
+        reports[name] = json.loads(output.stdout)
+
+    return reports
+
+
+def report(reports):
+    """This function get the report of a run.
+
+    Args:
+        reports (Dict): Report of each tokenizer.
+
+    Returns:
+        [String]: Report.
+    """
+    lines = []
+    for name, result in reports.items():
+        if "error" in result:
+            lines.append(f"{name:6}: skipped ({result['error']})")
+            continue
+        lines.append(
+            f"{name:6}: first={result['first'] * 1000:7.1f}ms  "
+            f"peak={result['peak'] / 2 ** 20:6.2f}MiB  "
+            f"rss=+{result['rss'] / 2 ** 20:6.2f}MiB  "
+            f"per question={result['question'] * 1e6:7.1f}us")
+
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """This function runs the benchmark and prints its report."""
+    parser = argparse.ArgumentParser(
+        description="Measure the tokenizers of the questions.")
+    parser.add_argument('--tokenizers', nargs='+', default=["regex", "nltk"])
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(measure(args.child)))
+    else:
+        print(report(run(args.tokenizers)))
+
+
+if __name__ == '__main__':
+    main()
@@ -3,19 +3,30 @@
 The configuration is read from a YAML file and saved in a module-global
 variable.
 """
+import os
+
 import yaml
 
 value = {}  # Global var, not constant
+_loaded = set()
 
 
-def load(config_path):
+def load(config_path, reload=False):
     """Loads a configuration file into a module-global variable.
 
     The module-global variable is a dict named `value`. If several files are
-    loaded sequentially, the dict is updated (not overwritten).
+    loaded sequentially, the dict is updated (not overwritten). A file already
+    loaded is not read again, so the modules which need the configuration can
+    all load it at import time.
 
     Args:
         config_path (str): path of the YAML configuration file.
+        reload (bool, optional): read the file even if it is already loaded.
     """
+    path = os.path.abspath(config_path)
+    if path in _loaded and not reload:
+        return
+
     with open(config_path, 'r') as config_file:
         value.update(yaml.load(config_file, Loader=yaml.FullLoader))
+    _loaded.add(path)
@@ -0,0 +1,423 @@
+"""Module for the asynchronous version of the pipeline.
+
+The async api classes share the payloads, the caches and the getters of the
+api classes from `flaskr.models`; only the requests are sent with aiohttp,
+so one worker can keep many questions in flight. Every method which sends a
+request, directly or through another method, is overridden by a coroutine,
+so no inherited method calls a coroutine without awaiting it.
+"""
+import asyncio
+import logging
+import time
+
+import aiohttp
+
+import configuration.config as config
+
+from flaskr import deadline, models
+from flaskr.gazetteer import get_gazetteer
+from flaskr.geoindex import find_nearest_page_id
+from flaskr.models import (GeocodeResult, GoogleApi, WikiApi, breakers,
+                           geocode_cache, geosearch_cache, page_cache,
+                           record_call)
+from flaskr.utils import build_response, parse_data_from_user
+
+_client_session = None
+_client_loop = None
+
+
+def get_client_session():
+    """This function get the aiohttp session of the running event loop.
+
+    Returns:
+        [ClientSession]: Session shared by the async api classes.
+    """
+    global _client_session, _client_loop
+
+    loop = asyncio.get_running_loop()
+    if (_client_session is None or _client_session.closed
+            or _client_loop is not loop):
+        connector = aiohttp.TCPConnector(
+            limit=config.value['HTTP']['ASYNC_LIMIT'])
+        _client_session = aiohttp.ClientSession(connector=connector)
+        _client_loop = loop
+
+    return _client_session
+
+
+async def close_client_session():
+    """This function closes the aiohttp session of the event loop."""
+    global _client_session
+
+    if _client_session is not None and not _client_session.closed:
+        await _client_session.close()
+    _client_session = None
+
+
+async def fetch_json(url, params):
+    """This function send a GET request and decode the JSON response, within
+    the time left before the deadline of the question. While the circuit of
+    the api is open, no request is sent and a probe is started instead.
+
+    Args:
+        url (String): Url endpoint for the api.
+        params (Dict): Parameters of the request.
+
+    Returns:
+        [JSON]: Response from the request, or None if the request failed.
+    """
+    breaker = breakers.get(url)
+    if breaker is not None and not breaker.allow():
+        breaker.probe(models.fetch_json, url, params)
+        return None
+
+    timeout = deadline.get_timeout()
+    if timeout <= 0:
+        logging.error("No time left for a request to %s", url)
+        return None
+
+    params = {key: value for key, value in params.items() if value is not None}
+    start = time.monotonic()
+    try:
+        async with get_client_session().get(
+                url, params=params,
+                timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            if response.status != 200:
+                record_call(url, response.status, start)
+                return None
+            data = await response.json(content_type=None)
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        logging.error("Bad request", exc_info=True)
+        record_call(url, "error", start)
+        return None
+    except ValueError:
+        logging.error("Bad response", exc_info=True)
+        record_call(url, response.status, start)
+        return None
+
+    record_call(url, response.status, start)
+    return data
+
+
+class AsyncGoogleApi(GoogleApi):
+    async def send_request(self, place):
+        """This method send a request on the google api end point. The
+        responses with the status OK or ZERO_RESULTS are cached by place.
+
+        Args:
+            place (String): place to be sent to the api.
+
+        Returns:
+            [GeocodeResult]: Result of the request, or None.
+        """
+        cache_key = place.strip()
+        result = geocode_cache.get(cache_key)
+        if result is None:
+            result = await self._fetch(place)
+            if result is not None:
+                return result
+            result = geocode_cache.get_stale(cache_key)
+        if result is None:
+            return None
+
+        self._result = result
+        return result
+
+    async def _fetch(self, place):
+        """This method send the request for a place and caches its result.
+
+        Args:
+            place (String): place to be sent to the api.
+
+        Returns:
+            [GeocodeResult]: Result of the request, or None.
+        """
+        data = await fetch_json(self.url, self._build_payload(place))
+        if data is None:
+            return None
+
+        self._result = GeocodeResult.from_json(data)
+        self._cache_data(place.strip())
+
+        return self._result
+
+
+class AsyncWikiApi(WikiApi):
+    async def send_geosearch_request(self, latitude, longitude):
+        """This method send a request on the wiki api end point. The request is
+        based on coordinates. The responses are cached by cell of a grid.
+
+        Args:
+            latitude (Int): Latitude of the place.
+            longitude (Int): Longitude of the place.
+
+        Returns:
+            [List]: Ids of the pages near the coordinates, the nearest page
+            first, or None if the request failed.
+        """
+        cache_key = self._get_cell(latitude, longitude)
+        if cache_key is not None:
+            cached = geosearch_cache.get(cache_key)
+            if cached is not None:
+                self._page_ids = cached
+                return cached
+
+        data = await fetch_json(
+            self.url, self._build_geosearch_payload(latitude, longitude))
+        if data is None:
+            page_ids = None
+            if cache_key is not None:
+                page_ids = geosearch_cache.get_stale(cache_key)
+            if page_ids is not None:
+                self._page_ids = page_ids
+            return page_ids
+
+        self._set_data(data)
+        self._cache_geosearch(cache_key)
+        return self._page_ids
+
+    async def send_pageids_request(self, pageids, trimmed=None):
+        """This method send a request on the wiki api end point. The request is
+        based on the page_id of the wiki page.
+
+        Args:
+            pageids (Int): id.
+            trimmed (Boolean, optional): Get only the beginning of the
+            extract. Defaults to MEDIA_WIKI.EXTRACT.TRIMMED.
+
+        Returns:
+            [WikiPage]: Page of the response, or None if the request failed.
+        """
+        if trimmed is None:
+            trimmed = config.value['MEDIA_WIKI']['EXTRACT']['TRIMMED']
+
+        data = await fetch_json(
+            self.url, self._build_pageids_payload(pageids, trimmed))
+        if data is None:
+            return None
+
+        self._set_data(data)
+        self._trimmed = trimmed
+        return self._find_page(pageids)
+
+    async def send_geosearch_pages_request(self, latitude, longitude):
+        """This method send a request on the wiki api end point. The request
+        gets the pages near the coordinates with their url and their extract.
+
+        Args:
+            latitude (Int): Latitude of the place.
+            longitude (Int): Longitude of the place.
+
+        Returns:
+            [List]: Ids of the pages near the coordinates, the nearest page
+            first, or None if the request failed.
+        """
+        data = await fetch_json(
+            self.url, self._build_geosearch_pages_payload(latitude, longitude))
+        if data is None:
+            return None
+
+        self._set_data(data)
+        self._trimmed = True
+        return self._page_ids
+
+    async def get_page(self, page_id):
+        """This method get a wikipedia page already split into sections, from
+        the page cache or from the api.
+
+        Args:
+            page_id (Int): Page id.
+
+        Returns:
+            [WikiPage]: Contains the url, the revision and the sections of
+            the page, or None if the page can't be fetched.
+        """
+        page = page_cache.get(page_id)
+        if page is not None:
+            return page
+
+        page = await self._fetch_page(page_id)
+        if page is None:
+            page = page_cache.get_stale(page_id)
+
+        return page
+
+    async def _fetch_page(self, page_id):
+        """This method send the request for a page and caches the page split
+        into sections. If the trimmed extract is too short to hold a whole
+        section, the whole extract is requested.
+
+        Args:
+            page_id (Int): Page id.
+
+        Returns:
+            [WikiPage]: Contains the url, the revision and the first section
+            of the page, or None if the page can't be fetched.
+        """
+        if config.value['MEDIA_WIKI']['EXTRACT']['TRIMMED']:
+            await self.send_pageids_request(page_id, trimmed=True)
+            page = self._cache_page(page_id)
+            if page is not None or not self.is_truncated(page_id):
+                return page
+
+        return await self._stream_page(page_id)
+
+    async def _stream_page(self, page_id):
+        """This method requests the whole extract of a page and caches the
+        page. The response is read at once, aiohttp doesn't stream it into
+        the section scanner.
+
+        Args:
+            page_id (Int): Page id.
+
+        Returns:
+            [WikiPage]: Contains the url, the revision and the first section
+            of the page, or None if the page can't be fetched.
+        """
+        if await self.send_pageids_request(page_id, trimmed=False) is None:
+            return None
+
+        return self._cache_page(page_id)
+
+    async def get_candidate_pages(self, latitude, longitude):
+        """This method get the pages near the coordinates, the nearest page
+        first.
+
+        Args:
+            latitude (Int): Latitude of the place.
+            longitude (Int): Longitude of the place.
+
+        Yields:
+            [Tuple]: Contains the page id and the page split into sections.
+        """
+        for page_id in await self.find_candidate_ids(latitude, longitude):
+            yield page_id, await AsyncWikiApi().get_page(page_id)
+
+    async def find_candidate_ids(self, latitude, longitude):
+        """This method get the ids of the pages near the coordinates, the
+        nearest page first, from the geosearch cache or from the api.
+
+        Args:
+            latitude (Int): Latitude of the place.
+            longitude (Int): Longitude of the place.
+
+        Returns:
+            [List]: Page ids, empty without coordinates.
+        """
+        cell = self._get_cell(latitude, longitude)
+        if cell is None:
+            return []
+
+        cache_key = ("pages",) + cell
+        page_ids = geosearch_cache.get(cache_key)
+
+        if page_ids is None:
+            page_ids = await self._fetch_candidates(latitude, longitude,
+                                                    cache_key)
+        if not page_ids:
+            page_ids = geosearch_cache.get_stale(cache_key)
+
+        return page_ids or []
+
+    async def _fetch_candidates(self, latitude, longitude, cache_key):
+        """This method send the geosearch pages request and caches its pages
+        and their ids.
+
+        Args:
+            latitude (Int): Latitude of the place.
+            longitude (Int): Longitude of the place.
+            cache_key (Tuple): Cell of the grid which contains the place.
+
+        Returns:
+            [List]: Page ids, the nearest page first.
+        """
+        await self.send_geosearch_pages_request(latitude, longitude)
+
+        return self._cache_candidates(cache_key)
+
+
+async def treat_data_from_user(data):
+    """This function treat the data send by the user, without blocking the
+    event loop while the apis answer.
+
+    Args:
+        data (String): Contains the sentence introduced by the user
+        in the form.
+
+    Returns:
+        [Dict]: Contains the data from the google api and
+        media wiki api + messages that will be shown to the
+        user.
+    """
+    with deadline.scope(config.value['DEADLINE']['TIMEOUT']):
+        message = parse_data_from_user(data)
+        google_api_data = await get_data_from_google_api(message)
+        page = None
+
+        if (google_api_data.get_status() == 'OK'):
+            page, page_id = await get_data_from_wiki_api(google_api_data)
+
+        response = build_response(google_api_data, page)
+
+    return response.formatted_response()
+
+
+async def get_data_from_google_api(data):
+    """This function creates an async google api Object and send a request to
+    the api endpoint, unless the place is found in the local gazetteer.
+
+    Returns:
+        [Object]: AsyncGoogleApi contains data from api google.
+    """
+    gazetteer = get_gazetteer()
+    if gazetteer is not None:
+        place = gazetteer.lookup(data)
+        if place is not None:
+            return AsyncGoogleApi.from_location(*place)
+
+    google_api = AsyncGoogleApi()
+    await google_api.send_request(data)
+
+    return google_api
+
+
+async def get_data_from_wiki_api(data):
+    """This function get the wikipedia page near the place found by the google
+    api.
+
+    Args:
+        data (GoogleApi): Contains the response from the google map api.
+
+    Returns:
+        [Tuple]: Contains the page split into sections and the id of the
+        page. The page is None if there is no page near the place.
+    """
+    latitude = data.get_latitude()
+    longitude = data.get_longitude()
+
+    page_id = find_nearest_page_id(latitude, longitude)
+    if page_id is not None:
+        return await AsyncWikiApi().get_page(page_id), page_id
+
+    if config.value['MEDIA_WIKI']['COMBINED_LOOKUP']:
+        nearest = (None, None)
+        async for page_id, page in AsyncWikiApi().get_candidate_pages(
+                latitude, longitude):
+            if page is None:
+                continue
+            if page.sections:
+                return page, page_id
+            if nearest[0] is None:
+                nearest = (page, page_id)
+        return nearest
+
+    geosearch_data = AsyncWikiApi()
+    await geosearch_data.send_geosearch_request(latitude, longitude)
+
+    page_id = geosearch_data.get_page_id()
+    if page_id is None:
+        return None, None
+
+    page = await AsyncWikiApi().get_page(page_id)
+
+    return page, page_id
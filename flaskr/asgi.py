@@ -0,0 +1,131 @@
+"""ASGI entry point of the app.
+
+The POST requests on '/form' are treated by the asynchronous pipeline; the
+other routes are served by the flask app. Run it with an ASGI worker, for
+example: gunicorn -k uvicorn.workers.UvicornWorker flaskr.asgi:app
+"""
+import io
+import json
+
+from asgiref.wsgi import WsgiToAsgi
+from werkzeug.formparser import parse_form_data
+
+from flaskr.aio import close_client_session, treat_data_from_user
+from flaskr.run import app as flask_app
+
+wsgi_app = WsgiToAsgi(flask_app)
+
+
+async def app(scope, receive, send):
+    """This function dispatches an ASGI connection.
+
+    Args:
+        scope (Dict): Connection scope.
+        receive (Coroutine): Receives the events of the client.
+        send (Coroutine): Sends the events to the client.
+    """
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+    elif (scope['type'] == 'http' and scope['path'] == '/form'
+            and scope['method'] == 'POST'):
+        await form(scope, receive, send)
+    else:
+        await wsgi_app(scope, receive, send)
+
+
+async def lifespan(receive, send):
+    """This function handles the startup and the shutdown of the worker.
+
+    Args:
+        receive (Coroutine): Receives the lifespan events.
+        send (Coroutine): Sends the lifespan events.
+    """
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await close_client_session()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def form(scope, receive, send):
+    """This function get the data from the question-form and answers with the
+    asynchronous pipeline.
+
+    Args:
+        scope (Dict): Connection scope.
+        receive (Coroutine): Receives the events of the client.
+        send (Coroutine): Sends the events to the client.
+    """
+    body = await read_body(receive)
+    user_text = get_form_field(scope, body, 'user_text')
+
+    if user_text is None:
+        await send_json(send, 400, {"error": "user_text is missing"})
+        return
+
+    response = await treat_data_from_user(user_text)
+    await send_json(send, 200, response)
+
+
+async def read_body(receive):
+    """This function reads the whole body of the request.
+
+    Args:
+        receive (Coroutine): Receives the events of the client.
+
+    Returns:
+        [Bytes]: Body of the request.
+    """
+    body = b''
+    more_body = True
+    while more_body:
+        message = await receive()
+        body += message.get('body', b'')
+        more_body = message.get('more_body', False)
+
+    return body
+
+
+def get_form_field(scope, body, name):
+    """This function get a field of a url encoded or multipart form.
+
+    Args:
+        scope (Dict): Connection scope.
+        body (Bytes): Body of the request.
+        name (String): Name of the field.
+
+    Returns:
+        [String]: Value of the field, or None.
+    """
+    headers = {key.decode('latin-1'): value.decode('latin-1')
+               for key, value in scope['headers']}
+    environ = {
+        'REQUEST_METHOD': 'POST',
+        'CONTENT_TYPE': headers.get('content-type', ''),
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': io.BytesIO(body)
+    }
+    stream, form_data, files = parse_form_data(environ)
+
+    return form_data.get(name)
+
+
+async def send_json(send, status, data):
+    """This function sends a JSON response.
+
+    Args:
+        send (Coroutine): Sends the events to the client.
+        status (Int): Status code of the response.
+        data (Dict): Data of the response.
+    """
+    body = json.dumps(data).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'),
+                    (b'content-length', str(len(body)).encode('latin-1'))]
+    })
+    await send({'type': 'http.response.body', 'body': body})
@@ -0,0 +1,123 @@
+"""Module for the circuit breakers of the upstream apis.
+
+A circuit breaker watches the last calls to an api. When too many of them
+fail or are too slow, the circuit opens and the calls fail at once instead of
+waiting for the api. After a while, a single probe is run in the background;
+the circuit closes again if the probe succeeds.
+"""
+import contextvars
+import logging
+import threading
+import time
+
+from collections import deque
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+_probing = contextvars.ContextVar('probing', default=None)
+
+
+class CircuitBreaker:
+    def __init__(self, name, settings):
+        """Constructor of the class CircuitBreaker.
+
+        Args:
+            name (String): Name of the api, used in the logs.
+            settings (Dict): Contains WINDOW, MIN_CALLS, ERROR_RATE,
+            SLOW_CALL and OPEN_TIME.
+        """
+        self.name = name
+        self.min_calls = settings['MIN_CALLS']
+        self.error_rate = settings['ERROR_RATE']
+        self.slow_call = settings['SLOW_CALL']
+        self.open_time = settings['OPEN_TIME']
+        self.state = CLOSED
+        self._calls = deque(maxlen=settings['WINDOW'])
+        self._opened_at = 0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """This method tells if a call to the api can be sent. Only the probe
+        can call the api while the circuit is not closed.
+
+        Returns:
+            [Boolean]: True if the call can be sent.
+        """
+        return self.state == CLOSED or _probing.get() is self
+
+    def record(self, success, latency):
+        """This method records the outcome of a call to the api. A slow call
+        counts as a failure.
+
+        Args:
+            success (Boolean): True if the api answered.
+            latency (Float): Duration of the call, in seconds.
+        """
+        failure = not success or latency > self.slow_call
+
+        with self._lock:
+            if self.state == HALF_OPEN:
+                if _probing.get() is not self:
+                    return
+                if failure:
+                    self._open()
+                else:
+                    logging.warning("Circuit of the %s api closed", self.name)
+                    self.state = CLOSED
+                    self._calls.clear()
+                return
+
+            self._calls.append(failure)
+            if (self.state == CLOSED and len(self._calls) >= self.min_calls
+                    and sum(self._calls) >= self.error_rate * len(
+                        self._calls)):
+                self._open()
+
+    def probe(self, function, *args):
+        """This method starts the probe in a thread, if the circuit has been
+        open long enough and no probe is running. The probe is the only call
+        allowed to reach the api until the circuit closes.
+
+        Args:
+            function (Function): Function which calls the api.
+            *args: Arguments of the function.
+
+        Returns:
+            [Boolean]: True if the probe has been started.
+        """
+        with self._lock:
+            if (self.state != OPEN
+                    or time.monotonic() < self._opened_at + self.open_time):
+                return False
+            self.state = HALF_OPEN
+
+        thread = threading.Thread(target=self._run_probe,
+                                  args=(function,) + args, daemon=True)
+        thread.start()
+        return True
+
+    def _run_probe(self, function, *args):
+        _probing.set(self)
+        try:
+            function(*args)
+        except Exception:
+            logging.error("Probe of the %s api failed", self.name,
+                          exc_info=True)
+        finally:
+            with self._lock:
+                if self.state == HALF_OPEN:
+                    self._open()
+
+    def _open(self):
+        logging.warning("Circuit of the %s api open", self.name)
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._calls.clear()
+
+    def reset(self):
+        """This method closes the circuit and forgets the last calls."""
+        with self._lock:
+            self.state = CLOSED
+            self._calls.clear()
@@ -0,0 +1,148 @@
+"""Module for caching the responses of the upstream apis.
+
+The caches are kept in memory, per process. Each entry has its own time to
+live and the least recently used entry is evicted when the cache is full.
+An expired entry can be kept a while longer as a stale entry, served only
+when its api is unavailable.
+
+The geosearch results are keyed on a cell of a fixed size grid, so that
+points a few metres apart share the same entry.
+"""
+import math
+import threading
+import time
+
+from collections import OrderedDict
+
+METRES_PER_DEGREE = 111320
+
+
+class TTLCache:
+    def __init__(self, max_size, ttl, stale_ttl=0):
+        """Constructor of the class TTLCache.
+
+        Args:
+            max_size (Int): Maximum number of entries kept in the cache.
+            ttl (Int): Default time to live of an entry, in seconds.
+            stale_ttl (Int, optional): Time an expired entry is kept as a
+            stale entry, in seconds. Defaults to 0.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """This method get a value from the cache. An expired entry counts as
+        a miss, and is removed once it is too old to be served stale.
+
+        Args:
+            key (Hashable): Key of the entry.
+
+        Returns:
+            [Object]: The cached value or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            value, expires_at = entry
+            now = time.monotonic()
+            if expires_at <= now:
+                if expires_at + self.stale_ttl <= now:
+                    del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def get_stale(self, key):
+        """This method get a value from the cache, even if it has expired, as
+        long as it is not too old to be served stale.
+
+        Args:
+            key (Hashable): Key of the entry.
+
+        Returns:
+            [Object]: The cached value or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            value, expires_at = entry
+            if expires_at + self.stale_ttl <= time.monotonic():
+                del self._entries[key]
+                return None
+
+            return value
+
+    def set(self, key, value, ttl=None):
+        """This method put a value into the cache. The least recently used
+        entry is evicted if the cache is full.
+
+        Args:
+            key (Hashable): Key of the entry.
+            value (Object): Value to be cached.
+            ttl (Int, optional): Time to live of this entry, in seconds.
+            Defaults to the ttl of the cache.
+        """
+        if self.max_size <= 0:
+            return
+
+        if ttl is None:
+            ttl = self.ttl
+
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """This method removes all the entries of the cache."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def make_cache(settings):
+    """This function creates a cache from a section of the configuration file.
+
+    Args:
+        settings (Dict): Contains MAX_SIZE, TTL and optionally STALE_TTL.
+
+    Returns:
+        [TTLCache]: Empty cache.
+    """
+    return TTLCache(settings['MAX_SIZE'], settings['TTL'],
+                    settings.get('STALE_TTL', 0))
+
+
+def quantize_coordinates(latitude, longitude, cell_size):
+    """This function get the cell of the grid which contains a point. The
+    width of a cell in degrees of longitude grows with the latitude so that
+    the cells keep the same size in metres.
+
+    Args:
+        latitude (Float): Latitude of the point.
+        longitude (Float): Longitude of the point.
+        cell_size (Int): Size of a cell, in metres.
+
+    Returns:
+        [Tuple]: Row and column of the cell.
+    """
+    latitude_step = cell_size / METRES_PER_DEGREE
+    row = math.floor(latitude / latitude_step)
+
+    row_latitude = math.radians((row + 0.5) * latitude_step)
+    longitude_step = cell_size / (
+        METRES_PER_DEGREE * max(math.cos(row_latitude), 1e-6))
+    column = math.floor(longitude / longitude_step)
+
+    return row, column
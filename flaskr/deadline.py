@@ -0,0 +1,107 @@
+"""Module for the time budget of a question.
+
+A deadline is started when a question arrives and is carried in a context
+variable, so every request to the apis made for this question gets the
+remaining budget as its timeout, without passing it through every call.
+"""
+import contextlib
+import contextvars
+import time
+
+import configuration.config as config
+
+_current = contextvars.ContextVar('deadline', default=None)
+
+
+class Deadline:
+    def __init__(self, seconds):
+        """Constructor of the class Deadline.
+
+        Args:
+            seconds (Float): Budget, in seconds.
+        """
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        """This method get the time left before the deadline.
+
+        Returns:
+            [Float]: Time left, in seconds. 0 if the deadline has passed.
+        """
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        """This method tells if the deadline has passed.
+
+        Returns:
+            [Boolean]: True if there is no time left.
+        """
+        return self.remaining() <= 0
+
+
+@contextlib.contextmanager
+def scope(seconds):
+    """This context manager starts a deadline for the code of its block.
+
+    Args:
+        seconds (Float): Budget, in seconds.
+
+    Yields:
+        [Deadline]: The deadline.
+    """
+    deadline = Deadline(seconds)
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def new_context(seconds):
+    """This function creates a context with a new deadline. The code run with
+    `context.run` gets this deadline, which is useful for a generator whose
+    steps don't run in a single block.
+
+    Args:
+        seconds (Float): Budget, in seconds.
+
+    Returns:
+        [Context]: Copy of the current context with the deadline.
+    """
+    context = contextvars.copy_context()
+    context.run(_current.set, Deadline(seconds))
+
+    return context
+
+
+def current():
+    """This function get the deadline of the current context.
+
+    Returns:
+        [Deadline]: The deadline, or None.
+    """
+    return _current.get()
+
+
+def get_timeout():
+    """This function get the timeout of a request to an api: the time left
+    before the current deadline, or the default timeout without deadline.
+
+    Returns:
+        [Float]: Timeout, in seconds.
+    """
+    deadline = _current.get()
+    if deadline is None:
+        return config.value['DEADLINE']['TIMEOUT']
+
+    return deadline.remaining()
+
+
+def expired():
+    """This function tells if the deadline of the current context has passed.
+
+    Returns:
+        [Boolean]: True if there is a deadline and no time left.
+    """
+    deadline = _current.get()
+    return deadline is not None and deadline.expired()
@@ -0,0 +1,208 @@
+"""Module for the local gazetteer, checked before the google api.
+
+The gazetteer is loaded from a GeoNames-style file into two indexes: a hash
+of the normalized names, and a prefix trie of their words used to find a
+name inside a question. A question that the gazetteer resolves gets its
+coordinates without any request.
+"""
+import csv
+import logging
+import re
+import threading
+
+import configuration.config as config
+
+from flaskr.models import Parser, detect_stems, stem
+
+COUNTRIES = {'FR': 'France', 'BE': 'Belgique', 'CH': 'Suisse',
+             'LU': 'Luxembourg', 'MC': 'Monaco', 'CA': 'Canada'}
+
+# Columns of the GeoNames "geoname" table.
+GEONAMES_COLUMNS = ('geonameid', 'name', 'asciiname', 'alternatenames',
+                    'latitude', 'longitude', 'feature_class',
+                    'feature_code', 'country_code', 'cc2', 'admin1_code',
+                    'admin2_code', 'admin3_code', 'admin4_code',
+                    'population')
+
+_END = ''
+
+
+def tokenize_name(name):
+    """This function normalizes a name the same way as the message of the
+    user, and split it into words.
+
+    Args:
+        name (String): Name of a place.
+
+    Returns:
+        [Tuple]: Words of the name.
+    """
+    return tuple(re.findall(r"[a-z0-9]+", Parser(name).normalize()))
+
+
+class Gazetteer:
+    def __init__(self):
+        """Constructor of the class Gazetteer."""
+        self._names = {}
+        self._trie = {}
+
+    def __len__(self):
+        return len(self._names)
+
+    def add(self, name, formatted_address, latitude, longitude,
+            population=0):
+        """This method add a place to the gazetteer. If two places have the
+        same name, the most populated one is kept.
+
+        Args:
+            name (String): Name of the place.
+            formatted_address (String): Address of the place.
+            latitude (Float): Latitude of the place.
+            longitude (Float): Longitude of the place.
+            population (Int, optional): Population of the place.
+        """
+        tokens = tokenize_name(name)
+        if not tokens:
+            return
+
+        key = " ".join(tokens)
+        current = self._names.get(key)
+        if current is not None and current[3] >= population:
+            return
+
+        self._names[key] = (formatted_address, latitude, longitude,
+                            population)
+
+        node = self._trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node[_END] = key
+
+    def lookup(self, text):
+        """This method get the place named in a question. The whole question
+        is looked up first; otherwise the longest name found in the question
+        is kept, if the other words of the question are only question words
+        like "adresse" or "trouver".
+
+        Args:
+            text (String): Question parsed from the message of the user.
+
+        Returns:
+            [Tuple]: Contains the formatted address, the latitude and the
+            longitude of the place, or None.
+        """
+        tokens = tokenize_name(text)
+        if not tokens:
+            return None
+
+        entry = self._names.get(" ".join(tokens))
+        if entry is not None:
+            return entry[:3]
+
+        best = None
+        for start in range(len(tokens)):
+            node = self._trie
+            for end in range(start, len(tokens)):
+                node = node.get(tokens[end])
+                if node is None:
+                    break
+                if _END in node and (best is None
+                                     or end - start > best[1] - best[0]):
+                    best = (start, end, node[_END])
+
+        if best is None:
+            return None
+
+        start, end, key = best
+        question_words = detect_stems.get()
+        others = tokens[:start] + tokens[end + 1:]
+        if any(stem(token) not in question_words for token in others):
+            return None
+
+        return self._names[key][:3]
+
+    @classmethod
+    def load(cls, path):
+        """This class method creates a gazetteer from a file. A '.csv' file
+        has a header with the columns name, latitude, longitude and
+        optionally formatted_address, alternatenames and population. Any
+        other file is read as a GeoNames tab separated dump.
+
+        Args:
+            path (String): Path of the file.
+
+        Returns:
+            [Gazetteer]: Gazetteer which contains the places of the file.
+        """
+        gazetteer = cls()
+        with open(path, encoding='utf-8', newline='') as data_file:
+            if path.endswith('.csv'):
+                rows = csv.DictReader(data_file)
+            else:
+                rows = csv.DictReader(data_file, fieldnames=GEONAMES_COLUMNS,
+                                      delimiter='\t', quoting=csv.QUOTE_NONE)
+
+            for row in rows:
+                gazetteer._add_row(row)
+
+        return gazetteer
+
+    def _add_row(self, row):
+        """This method add a place from a row of a file, under its name and
+        its alternate names.
+
+        Args:
+            row (Dict): Row of the file.
+        """
+        try:
+            name = row['name']
+            latitude = float(row['latitude'])
+            longitude = float(row['longitude'])
+            population = int(row.get('population') or 0)
+        except (KeyError, TypeError, ValueError):
+            logging.warning("Bad row in the gazetteer: %s", row.get('name'))
+            return
+
+        formatted_address = row.get('formatted_address')
+        if not formatted_address:
+            country = row.get('country_code') or ''
+            formatted_address = ", ".join(
+                part for part in (name, COUNTRIES.get(country, country))
+                if part)
+
+        names = [name, row.get('asciiname')]
+        names += (row.get('alternatenames') or '').split(',')
+        for name in names:
+            if name:
+                self.add(name, formatted_address, latitude, longitude,
+                         population)
+
+
+_gazetteer = None
+_loaded = False
+_lock = threading.Lock()
+
+
+def get_gazetteer():
+    """This function get the gazetteer of the process, loaded on first use
+    from the file set in GAZETTEER.PATH.
+
+    Returns:
+        [Gazetteer]: Gazetteer, or None if no file is configured or if the
+        file can't be read. A file which can't be read isn't read again.
+    """
+    global _gazetteer, _loaded
+
+    if not _loaded:
+        with _lock:
+            if not _loaded:
+                path = config.value.get('GAZETTEER', {}).get('PATH')
+                try:
+                    if path:
+                        _gazetteer = Gazetteer.load(path)
+                except (OSError, ValueError, csv.Error):
+                    logging.error("Can't read the gazetteer", exc_info=True)
+                finally:
+                    _loaded = True
+
+    return _gazetteer
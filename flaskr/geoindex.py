@@ -0,0 +1,289 @@
+"""Module for the local index of the geotagged wikipedia articles.
+
+The index answers "the nearest page within the radius" without a request to
+the media wiki api. It is built once from a dump of the coordinates of the
+articles (page id, latitude, longitude) into a compact file of arrays, which
+is memory-mapped, so the workers share it and nothing is parsed at boot.
+
+File layout, little-endian:
+    header: magic, version, cell size in degrees, number of points,
+            number of cells
+    cell keys (int64, sorted), cell offsets (int64, number of cells + 1),
+    page ids (int64), latitudes (float64), longitudes (float64)
+
+Usage:
+    python -m flaskr.geoindex coordinates.csv geoindex.bin
+"""
+import argparse
+import bisect
+import csv
+import logging
+import math
+import mmap
+import struct
+import sys
+import threading
+
+from array import array
+
+import configuration.config as config
+
+from flaskr.cache import METRES_PER_DEGREE
+
+MAGIC = b'GPGI'
+VERSION = 1
+HEADER = struct.Struct('<4sIdqq')
+DEFAULT_CELL_SIZE = 0.01
+
+
+def cell_of(latitude, longitude, cell_size):
+    """This function get the key of the cell which contains a point.
+
+    Args:
+        latitude (Float): Latitude of the point.
+        longitude (Float): Longitude of the point.
+        cell_size (Float): Size of a cell, in degrees.
+
+    Returns:
+        [Int]: Key of the cell.
+    """
+    return cell_key(math.floor(latitude / cell_size),
+                    math.floor(longitude / cell_size))
+
+
+def cell_key(row, column):
+    """This function get the key of a cell from its row and its column.
+
+    Args:
+        row (Int): Row of the cell.
+        column (Int): Column of the cell.
+
+    Returns:
+        [Int]: Key of the cell.
+    """
+    return (row << 32) + (column + (1 << 31))
+
+
+def distance(latitude1, longitude1, latitude2, longitude2):
+    """This function get the distance between two points, with the
+    equirectangular approximation, precise enough at the scale of the radius.
+
+    Returns:
+        [Float]: Distance in metres.
+    """
+    x = math.radians(longitude2 - longitude1) * math.cos(
+        math.radians((latitude1 + latitude2) / 2))
+    y = math.radians(latitude2 - latitude1)
+    return math.hypot(x, y) * METRES_PER_DEGREE * 180 / math.pi
+
+
+def build_index(points, path, cell_size=DEFAULT_CELL_SIZE):
+    """This function writes the index file of a list of points.
+
+    Args:
+        points (Iterable): Contains tuples (page id, latitude, longitude).
+        path (String): Path of the index file.
+        cell_size (Float, optional): Size of a cell, in degrees.
+
+    Returns:
+        [Int]: Number of points in the index.
+    """
+    points = sorted(
+        (cell_of(latitude, longitude, cell_size), page_id, latitude,
+         longitude)
+        for page_id, latitude, longitude in points)
+
+    keys = array('q')
+    offsets = array('q')
+    for position, point in enumerate(points):
+        if not keys or keys[-1] != point[0]:
+            keys.append(point[0])
+            offsets.append(position)
+    offsets.append(len(points))
+
+    with open(path, 'wb') as index_file:
+        index_file.write(HEADER.pack(MAGIC, VERSION, cell_size, len(points),
+                                     len(keys)))
+        for values in (keys, offsets,
+                       array('q', (point[1] for point in points)),
+                       array('d', (point[2] for point in points)),
+                       array('d', (point[3] for point in points))):
+            if sys.byteorder == 'big':
+                values.byteswap()
+            values.tofile(index_file)
+
+    return len(points)
+
+
+class GeoIndex:
+    def __init__(self, path):
+        """Constructor of the class GeoIndex. The file is memory-mapped.
+
+        Args:
+            path (String): Path of the index file.
+
+        Raises:
+            ValueError: If the file is not an index file, or is truncated.
+        """
+        with open(path, 'rb') as index_file:
+            self._map = mmap.mmap(index_file.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+
+        try:
+            magic, version, self.cell_size, points, cells = \
+                HEADER.unpack_from(self._map)
+        except struct.error:
+            raise ValueError(f"{path} is not a geo index file")
+        if magic != MAGIC or version != VERSION or sys.byteorder == 'big':
+            raise ValueError(f"{path} is not a geo index file")
+        if len(self._map) != HEADER.size + 8 * (2 * cells + 1 + 3 * points):
+            raise ValueError(f"{path} is truncated")
+
+        view = memoryview(self._map)
+        offset = HEADER.size
+
+        def take(count, code):
+            nonlocal offset
+            size = count * 8
+            values = view[offset:offset + size].cast(code)
+            offset += size
+            return values
+
+        self._keys = take(cells, 'q')
+        self._offsets = take(cells + 1, 'q')
+        self._page_ids = take(points, 'q')
+        self._latitudes = take(points, 'd')
+        self._longitudes = take(points, 'd')
+
+    def __len__(self):
+        return len(self._page_ids)
+
+    def nearest(self, latitude, longitude, radius):
+        """This method get the page nearest to a point, within a radius.
+
+        Args:
+            latitude (Float): Latitude of the point.
+            longitude (Float): Longitude of the point.
+            radius (Float): Radius, in metres.
+
+        Returns:
+            [Tuple]: Contains the page id and its distance in metres, or None
+            if no page is within the radius.
+        """
+        cell_metres = self.cell_size * METRES_PER_DEGREE
+        rows = math.ceil(radius / cell_metres)
+        columns = math.ceil(radius / (
+            cell_metres * max(math.cos(math.radians(latitude)), 1e-6)))
+        row = math.floor(latitude / self.cell_size)
+        column = math.floor(longitude / self.cell_size)
+
+        best = None
+        for current_row in range(row - rows, row + rows + 1):
+            for current_column in range(column - columns,
+                                        column + columns + 1):
+                key = cell_key(current_row, current_column)
+                position = bisect.bisect_left(self._keys, key)
+                if (position == len(self._keys)
+                        or self._keys[position] != key):
+                    continue
+
+                for point in range(self._offsets[position],
+                                   self._offsets[position + 1]):
+                    point_distance = distance(
+                        latitude, longitude, self._latitudes[point],
+                        self._longitudes[point])
+                    if point_distance <= radius and (
+                            best is None or point_distance < best[1]):
+                        best = (self._page_ids[point], point_distance)
+
+        return best
+
+
+_geo_index = None
+_loaded = False
+_lock = threading.Lock()
+
+
+def get_geo_index():
+    """This function get the geo index of the process, opened on first use
+    from the file set in GEO_INDEX.PATH.
+
+    Returns:
+        [GeoIndex]: Geo index, or None if no file is configured or if the
+        file can't be opened. A file which can't be opened isn't opened
+        again.
+    """
+    global _geo_index, _loaded
+
+    if not _loaded:
+        with _lock:
+            if not _loaded:
+                path = config.value.get('GEO_INDEX', {}).get('PATH')
+                try:
+                    if path:
+                        _geo_index = GeoIndex(path)
+                except (OSError, ValueError, struct.error):
+                    logging.error("Can't open the geo index", exc_info=True)
+                finally:
+                    _loaded = True
+
+    return _geo_index
+
+
+def find_nearest_page_id(latitude, longitude):
+    """This function get the id of the page nearest to a point from the geo
+    index, within the geosearch radius.
+
+    Args:
+        latitude (Float): Latitude of the point.
+        longitude (Float): Longitude of the point.
+
+    Returns:
+        [Int]: Page id, or None if there is no index or no page near.
+    """
+    geo_index = get_geo_index()
+    if geo_index is None or latitude is None or longitude is None:
+        return None
+
+    result = geo_index.nearest(latitude, longitude,
+                               config.value['MEDIA_WIKI']['GS_RADIUS'])
+    if result is None:
+        return None
+
+    return result[0]
+
+
+def read_points(path):
+    """This function reads the points of a dump. The dump is a CSV file with
+    the columns page id, latitude and longitude, with or without header.
+
+    Args:
+        path (String): Path of the dump.
+
+    Yields:
+        [Tuple]: Contains the page id, the latitude and the longitude.
+    """
+    with open(path, encoding='utf-8', newline='') as dump_file:
+        for row in csv.reader(dump_file):
+            try:
+                yield int(row[0]), float(row[1]), float(row[2])
+            except (IndexError, ValueError):
+                continue
+
+
+def main(argv=None):
+    """This function builds an index file from a dump of coordinates."""
+    parser = argparse.ArgumentParser(
+        description="Build the geo index of the wikipedia articles.")
+    parser.add_argument('dump', help="CSV file: page id, latitude, longitude")
+    parser.add_argument('index', help="path of the index file")
+    parser.add_argument('--cell-size', type=float, default=DEFAULT_CELL_SIZE,
+                        help="size of a cell, in degrees")
+    args = parser.parse_args(argv)
+
+    count = build_index(read_points(args.dump), args.index, args.cell_size)
+    print(f"{count} pages written to {args.index}")
+
+
+if __name__ == '__main__':
+    main()
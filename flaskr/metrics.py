@@ -0,0 +1,478 @@
+"""Module for the metrics of the app.
+
+The duration of each stage of the pipeline and of each request to the apis
+is recorded in histograms, and the status codes of the apis in counters. The
+duration of a stage doesn't include the stages nested in it, so the stages of
+a request add up to at most its total. The stages of the current request are
+also kept in a context variable, to be sent back in a Server-Timing header.
+
+The metrics are kept in memory, per process, and exposed in the text format
+of Prometheus. Under gunicorn each worker also writes its metrics to a file
+of METRICS.DIRECTORY, and /metrics adds up the files of all the workers, so
+a scrape reaching any worker sees the same counters. The files of the
+workers gone are merged in an archive by the master, so the counters never
+go back.
+"""
+import bisect
+import contextlib
+import contextvars
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+
+from urllib.parse import urlsplit
+
+import configuration.config as config
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+_timings = contextvars.ContextVar('timings', default=None)
+_timings_lock = threading.Lock()
+_nested = contextvars.ContextVar('nested', default=None)
+
+ARCHIVE = "archive.json"
+
+_flusher = {"pid": None, "dirty": False}
+_flusher_lock = threading.Lock()
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, help_text, label_names):
+        """Constructor of the class Metric.
+
+        Args:
+            name (String): Name of the metric.
+            help_text (String): Description of the metric.
+            label_names (Tuple): Names of the labels.
+        """
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _labels(self, labels, extra=()):
+        pairs = list(zip(self.label_names, labels)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(
+            '{}="{}"'.format(name, str(value).replace('\\', '\\\\')
+                             .replace('"', '\\"').replace('\n', '\\n'))
+            for name, value in pairs) + "}"
+
+    def snapshot(self):
+        """This method get a copy of the recorded values.
+
+        Returns:
+            [Dict]: Value of each tuple of labels.
+        """
+        with self._lock:
+            return {labels: self._copy(value)
+                    for labels, value in self._values.items()}
+
+    def render(self, values=None):
+        """This method get the metric in the text format of Prometheus.
+
+        Args:
+            values (Dict, optional): Values to render instead of the recorded
+            ones, as returned by snapshot.
+
+        Returns:
+            [List]: Lines of the metric.
+        """
+        lines = [f"# HELP {self.name} {self.help_text}",
+                 f"# TYPE {self.name} {self.kind}"]
+        if values is None:
+            values = self.snapshot()
+        for labels, value in sorted(values.items()):
+            lines.extend(self._render_value(labels, value))
+
+        return lines
+
+    def clear(self):
+        """This method forgets the recorded values."""
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels):
+        """This method adds one to the counter of the labels.
+
+        Args:
+            *labels: Values of the labels.
+        """
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + 1
+
+    def get(self, *labels):
+        """This method get the counter of the labels.
+
+        Returns:
+            [Int]: Value of the counter.
+        """
+        return self._values.get(labels, 0)
+
+    def merge(self, value, other):
+        """This method adds up two values of the counter.
+
+        Returns:
+            [Int]: Sum of the values.
+        """
+        return value + other
+
+    def _copy(self, value):
+        return value
+
+    def _render_value(self, labels, value):
+        return [f"{self.name}_total{self._labels(labels)} {value}"]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, label_names, buckets=BUCKETS):
+        """Constructor of the class Histogram.
+
+        Args:
+            name (String): Name of the metric.
+            help_text (String): Description of the metric.
+            label_names (Tuple): Names of the labels.
+            buckets (Tuple, optional): Upper bounds of the buckets.
+        """
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        """This method records a value.
+
+        Args:
+            value (Float): Value, in seconds.
+            *labels: Values of the labels.
+        """
+        with self._lock:
+            counts, total = self._values.get(
+                labels, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._values[labels] = (counts, total + value)
+
+    def count(self, *labels):
+        """This method get the number of values recorded for the labels.
+
+        Returns:
+            [Int]: Number of values.
+        """
+        counts, total = self._values.get(labels, ((), 0.0))
+        return sum(counts)
+
+    def merge(self, value, other):
+        """This method adds up two values of the histogram.
+
+        Returns:
+            [Tuple]: Sum of the counts of each bucket, and sum of the totals.
+        """
+        return ([count + other_count
+                 for count, other_count in zip(value[0], other[0])],
+                value[1] + other[1])
+
+    def _copy(self, value):
+        counts, total = value
+        return list(counts), total
+
+    def _render_value(self, labels, value):
+        counts, total = value
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + ("+Inf",), counts):
+            cumulative += count
+            lines.append(f"{self.name}_bucket"
+                         f"{self._labels(labels, [('le', bound)])} "
+                         f"{cumulative}")
+        lines.append(f"{self.name}_sum{self._labels(labels)} {total}")
+        lines.append(f"{self.name}_count{self._labels(labels)} {cumulative}")
+
+        return lines
+
+
+stage_seconds = Histogram(
+    "grandpy_stage_seconds",
+    "Duration of the stages of the pipeline, without their nested stages.",
+    ("stage",))
+upstream_seconds = Histogram(
+    "grandpy_upstream_seconds", "Duration of the requests to the apis.",
+    ("host",))
+upstream_responses = Counter(
+    "grandpy_upstream_responses", "Responses of the apis by status.",
+    ("host", "status"))
+
+METRICS = (stage_seconds, upstream_seconds, upstream_responses)
+
+
+@contextlib.contextmanager
+def stage(name):
+    """This context manager times a stage of the pipeline. The duration,
+    without the stages nested in this one, is recorded in the histogram of
+    the stages and added to the timings of the current request.
+
+    Args:
+        name (String): Name of the stage.
+    """
+    parent = _nested.get()
+    nested = [0.0]
+    _nested.set(nested)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        _nested.set(parent)
+        with _timings_lock:
+            if parent is not None:
+                parent[0] += elapsed
+            duration = max(0.0, elapsed - nested[0])
+        stage_seconds.observe(duration, name)
+        _changed()
+        timings = _timings.get()
+        if timings is not None:
+            with _timings_lock:
+                timings[name] = timings.get(name, 0.0) + duration
+
+
+@contextlib.contextmanager
+def request_timings():
+    """This context manager collects the timings of the stages run in its
+    block.
+
+    Yields:
+        [Dict]: Contains the duration of each stage, in seconds, and the
+        total duration once the block is done.
+    """
+    timings = {}
+    token = _timings.set(timings)
+    start = time.perf_counter()
+    try:
+        yield timings
+    finally:
+        timings["total"] = time.perf_counter() - start
+        _timings.reset(token)
+
+
+def context_timings(context):
+    """This function collects the timings of the stages run with
+    `context.run`, which is useful for a generator whose steps don't run in a
+    single block.
+
+    Args:
+        context (Context): Context of the stages.
+
+    Returns:
+        [Dict]: Contains the duration of each stage, in seconds.
+    """
+    timings = {}
+    context.run(_timings.set, timings)
+
+    return timings
+
+
+def run_stage(name, function, *args):
+    """This function runs a function as a stage of the pipeline.
+
+    Args:
+        name (String): Name of the stage.
+        function (Function): Function to run.
+        *args: Arguments of the function.
+
+    Returns:
+        [Object]: Result of the function.
+    """
+    with stage(name):
+        return function(*args)
+
+
+def observe_upstream(url, status, duration):
+    """This function records a request to an api.
+
+    Args:
+        url (String): Url of the request.
+        status (Object): Status code, or name of the error.
+        duration (Float): Duration, in seconds.
+    """
+    host = urlsplit(url).netloc
+    upstream_seconds.observe(duration, host)
+    upstream_responses.inc(host, str(status))
+    _changed()
+
+
+def server_timing(timings):
+    """This function get the Server-Timing header of the timings of a
+    request.
+
+    Args:
+        timings (Dict): Contains the duration of each stage, in seconds.
+
+    Returns:
+        [String]: Value of the header, durations in milliseconds.
+    """
+    return ", ".join(f"{name};dur={duration * 1000:.1f}"
+                     for name, duration in timings.items())
+
+
+def _directory():
+    return config.value.get('METRICS', {}).get('DIRECTORY')
+
+
+def _changed():
+    """This function marks the metrics to be written to the directory, and
+    starts the thread writing them in this process if needed."""
+    if not _directory():
+        return
+    _flusher["dirty"] = True
+    if _flusher["pid"] == os.getpid():
+        return
+    with _flusher_lock:
+        if _flusher["pid"] != os.getpid():
+            _flusher["pid"] = os.getpid()
+            threading.Thread(target=_flush, name="metrics-flush",
+                             daemon=True).start()
+
+
+def _flush():
+    while True:
+        time.sleep(config.value.get('METRICS', {}).get('FLUSH_INTERVAL', 1))
+        if _flusher["dirty"]:
+            _flusher["dirty"] = False
+            dump()
+
+
+def _read(path):
+    try:
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+    return {name: {tuple(labels): value for labels, value in values}
+            for name, values in data.items()}
+
+
+def _write(path, values):
+    data = {name: [[list(labels), value]
+                   for labels, value in metric_values.items()]
+            for name, metric_values in values.items()}
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w", encoding="utf-8") as file:
+        json.dump(data, file)
+    os.replace(temporary, path)
+
+
+def _merge(values, other):
+    for metric in METRICS:
+        metric_values = values.setdefault(metric.name, {})
+        for labels, value in other.get(metric.name, {}).items():
+            if labels in metric_values:
+                value = metric.merge(metric_values[labels], value)
+            metric_values[labels] = value
+
+    return values
+
+
+def prepare(directory=None):
+    """This function creates the directory where the workers write their
+    metrics, or empties it, and keeps it in the configuration. It's called in
+    the gunicorn master before the workers are forked.
+
+    Args:
+        directory (String, optional): Directory, a new temporary one when
+        None.
+
+    Returns:
+        [String]: Directory.
+    """
+    if directory is None:
+        directory = tempfile.mkdtemp(prefix="grandpy-metrics-")
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, "*.json")):
+        os.remove(path)
+    config.value.setdefault('METRICS', {})['DIRECTORY'] = directory
+
+    return directory
+
+
+def dump():
+    """This function writes the metrics of this process to its file in the
+    directory, if any."""
+    directory = _directory()
+    if not directory:
+        return
+    _write(os.path.join(directory, f"{os.getpid()}.json"),
+           {metric.name: metric.snapshot() for metric in METRICS})
+
+
+def archive(pid):
+    """This function merges the file of a worker gone in the archive of the
+    directory and removes it, so its counters are kept. It's called in the
+    gunicorn master.
+
+    Args:
+        pid (Int): Process id of the worker.
+    """
+    directory = _directory()
+    if not directory:
+        return
+    path = os.path.join(directory, f"{pid}.json")
+    if not os.path.exists(path):
+        return
+    archive_path = os.path.join(directory, ARCHIVE)
+    _write(archive_path, _merge(_read(archive_path), _read(path)))
+    os.remove(path)
+
+
+def collect():
+    """This function adds up the metrics of all the workers of the directory.
+    Without a directory, the metrics are those of this process.
+
+    Returns:
+        [Dict]: Values of each metric, by name.
+    """
+    directory = _directory()
+    if not directory:
+        return {metric.name: metric.snapshot() for metric in METRICS}
+    dump()
+    values = {}
+    for path in sorted(glob.glob(os.path.join(directory, "*.json"))):
+        _merge(values, _read(path))
+
+    return values
+
+
+def render():
+    """This function get all the metrics in the text format of Prometheus.
+
+    Returns:
+        [String]: Metrics.
+    """
+    values = collect()
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render(values.get(metric.name, {})))
+
+    return "\n".join(lines) + "\n"
+
+
+def clear():
+    """This function forgets all the recorded metrics."""
+    for metric in METRICS:
+        metric.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    # A forked worker starts with no metrics of its own, so the values
+    # recorded by the master are not counted once per worker.
+    os.register_at_fork(after_in_child=clear)
@@ -1,64 +1,492 @@
-import json
+import functools
 import logging
-import os
 import random
 import re
+import time
 
 import requests
-from nltk.stem import SnowballStemmer
-from nltk.tokenize import word_tokenize
 from unidecode import unidecode
 
 import configuration.config as config
 
 from os import environ
 
+from flaskr import deadline, metrics, resources
+from flaskr.breaker import CircuitBreaker
+from flaskr.cache import make_cache, quantize_coordinates
+from flaskr.sections import PageReader, SectionScanner
+from flaskr.session import get_session
+from flaskr.singleflight import SingleFlight
+
 config.load('./configuration/config.yml')
 
+geocode_cache = make_cache(config.value['GOOGLE']['CACHE'])
+geosearch_cache = make_cache(config.value['MEDIA_WIKI']['GEOSEARCH_CACHE'])
+page_cache = make_cache(config.value['MEDIA_WIKI']['PAGE_CACHE'])
+
+breakers = {
+    config.value['GOOGLE']['URL']: CircuitBreaker(
+        "google", config.value['CIRCUIT_BREAKER']),
+    config.value['MEDIA_WIKI']['URL']: CircuitBreaker(
+        "media wiki", config.value['CIRCUIT_BREAKER'])}
+
+
+@functools.lru_cache(maxsize=None)
+def get_stemmer():
+    """This function get the french stemmer of NLTK. NLTK takes longer to
+    import than the rest of the app, so it is imported on the first call
+    only.
+
+    Returns:
+        [SnowballStemmer]: French stemmer.
+    """
+    from nltk.stem import SnowballStemmer
+
+    return SnowballStemmer("french")
+
+
+WORD_PATTERN = re.compile(r"\w+(?:['\-]\w+)*|[^\w\s]")
+
+
+def regex_tokenize(text):
+    """This function split a text into words and punctuation marks with a
+    compiled regex. For the questions, a sentence of words, apostrophes,
+    hyphens and punctuation marks, it gives the words of the tokenizer of
+    NLTK without loading its punkt model.
+
+    Args:
+        text (String): Text.
+
+    Returns:
+        [List]: Words and punctuation marks of the text.
+    """
+    return WORD_PATTERN.findall(text)
+
+
+def nltk_tokenize(text):
+    """This function split a text into words with the tokenizer of NLTK,
+    imported on the first call only. The first call also loads the punkt
+    model.
+
+    Args:
+        text (String): Text.
+
+    Returns:
+        [List]: Words and punctuation marks of the text.
+    """
+    from nltk.tokenize import word_tokenize as nltk_word_tokenize
+
+    return nltk_word_tokenize(text)
+
+
+TOKENIZERS = {"regex": regex_tokenize, "nltk": nltk_tokenize}
+
+
+def word_tokenize(text):
+    """This function split a text into words with the tokenizer set in
+    PARSER.TOKENIZER.
+
+    Args:
+        text (String): Text.
+
+    Returns:
+        [List]: Words and punctuation marks of the text.
+    """
+    return TOKENIZERS[config.value['PARSER']['TOKENIZER']](text)
+
+
+def _stem(word):
+    """This function get the stem of a french word.
+
+    Args:
+        word (String): Word.
+
+    Returns:
+        [String]: Stem of the word.
+    """
+    return get_stemmer().stem(word)
+
+
+stem = functools.lru_cache(
+    maxsize=config.value['PARSER']['STEM_CACHE_SIZE'])(_stem)
+
+detect_stems = resources.Resource(
+    'detect_word.json', lambda words: frozenset(stem(w) for w in words))
+
+
+class NormalizationTable(dict):
+    """Translation table which puts a character to lowercase, removes its
+    accent and replaces apostrophes and hyphens with spaces. The characters
+    missing from the table are translated on first use, and kept up to
+    MAX_CODE, so the table stays bounded whatever the questions."""
+
+    MAX_CODE = 0xFFFF
+
+    def __missing__(self, code):
+        value = unidecode(chr(code).lower())
+        value = value.replace("'", " ").replace("-", " ")
+        if code <= self.MAX_CODE:
+            self[code] = value
+        return value
+
+
+normalization_table = NormalizationTable()
+for code in range(0x250):
+    normalization_table[code]
+
+flights = SingleFlight()
+
+
+def coalesce(key, function, *args):
+    """This function runs a call to an api, unless an identical call is
+    already running; in that case it waits for it, within the time left
+    before the deadline of the question.
+
+    Args:
+        key (Hashable): Key of the call.
+        function (Function): Function to be called.
+        *args: Arguments of the function.
+
+    Returns:
+        [Object]: Result of the function, or None if the running call didn't
+        finish in time.
+    """
+    try:
+        return flights.do(key, function, *args,
+                          timeout=deadline.get_timeout())
+    except TimeoutError:
+        logging.error("Timeout while waiting for %s", key)
+        return None
+
+
+def fetch_json(url, payload, reader=None):
+    """This function send a request with the shared session and decode the
+    JSON response. The timeout of the request is the time left before the
+    deadline of the question.
+
+    While the circuit of the api is open, no request is sent and a probe is
+    started in the background instead.
+
+    Args:
+        url (String): Url endpoint for the api.
+        payload (Dict): Parameters of the request.
+        reader (PageReader, optional): Reader of the response, fed with its
+        body chunk by chunk instead of decoding it at once.
+
+    Returns:
+        [JSON]: Response from the request, or None if the request failed.
+    """
+    breaker = breakers.get(url)
+    if breaker is not None and not breaker.allow():
+        breaker.probe(fetch_json, url, payload)
+        return None
+
+    timeout = deadline.get_timeout()
+    if timeout <= 0:
+        logging.error("No time left for a request to %s", url)
+        return None
+
+    start = time.monotonic()
+    try:
+        response = get_session().get(url, params=payload, timeout=timeout,
+                                     stream=reader is not None)
+    except requests.exceptions.Timeout:
+        logging.error("Timeout error", exc_info=True)
+        record_call(url, "timeout", start)
+        return None
+    except requests.exceptions.TooManyRedirects:
+        logging.error("Bad url", exc_info=True)
+        record_call(url, "redirects", start)
+        return None
+    except requests.exceptions.RequestException:
+        logging.error("Bad request", exc_info=True)
+        record_call(url, "error", start)
+        return None
+
+    if reader is not None:
+        return read_stream(url, response, reader, start)
+
+    record_call(url, response.status_code, start)
+
+    if response.status_code == 200:
+        return response.json()
+    else:
+        return None
+
+
+def read_stream(url, response, reader, start):
+    """This function feeds the body of a streamed response to a reader, chunk
+    by chunk, until the reader is done.
+
+    Args:
+        url (String): Url endpoint for the api.
+        response (Response): Streamed response.
+        reader (PageReader): Reader of the response.
+        start (Float): Time the call started, from time.monotonic.
+
+    Returns:
+        [JSON]: Response decoded by the reader, or None if the request
+        failed.
+    """
+    try:
+        if response.status_code != 200:
+            record_call(url, response.status_code, start)
+            return None
+
+        response.encoding = response.encoding or "utf-8"
+        chunk_size = config.value['MEDIA_WIKI']['EXTRACT']['CHUNK_SIZE']
+        for chunk in response.iter_content(chunk_size, decode_unicode=True):
+            if deadline.expired():
+                logging.error("No time left to read %s", url)
+                record_call(url, "timeout", start)
+                return None
+            reader.feed(chunk)
+            if reader.done:
+                break
+        data = reader.close()
+    except requests.exceptions.RequestException:
+        logging.error("Bad request", exc_info=True)
+        record_call(url, "error", start)
+        return None
+    except ValueError:
+        logging.error("Bad response", exc_info=True)
+        record_call(url, response.status_code, start)
+        return None
+    finally:
+        response.close()
+
+    record_call(url, response.status_code, start)
+    return data
+
+
+def record_call(url, status, start):
+    """This function records the outcome of a call to an api in the metrics
+    and in the circuit breaker of the api.
+
+    Args:
+        url (String): Url endpoint for the api.
+        status (Object): Status code, or name of the error.
+        start (Float): Time the call started, from time.monotonic.
+    """
+    duration = time.monotonic() - start
+    metrics.observe_upstream(url, status, duration)
+
+    breaker = breakers.get(url)
+    if breaker is not None:
+        breaker.record(isinstance(status, int) and status < 500
+                       and status != 429, duration)
+
+
+class GeocodeResult:
+    __slots__ = ("status", "formatted_address", "latitude", "longitude")
+
+    def __init__(self, status="", formatted_address="", latitude=None,
+                 longitude=None):
+        """Constructor of the class GeocodeResult. It holds the first result
+        of a response of the google api.
+
+        Args:
+            status (String, optional): Status of the response.
+            formatted_address (String, optional): Address of the place.
+            latitude (Float, optional): Latitude of the place.
+            longitude (Float, optional): Longitude of the place.
+        """
+        self.status = status
+        self.formatted_address = formatted_address
+        self.latitude = latitude
+        self.longitude = longitude
+
+    @classmethod
+    def from_json(cls, data):
+        """This class method reads a response of the google api in a single
+        pass.
+
+        Args:
+            data (JSON): Response from the request.
+
+        Returns:
+            [GeocodeResult]: Contains the status and the first result. The
+            status is UNKNOWN_ERROR if the first result of a response OK
+            can't be read.
+        """
+        status = data.get('status', "") if isinstance(data, dict) else ""
+        if status != 'OK':
+            return cls(status)
+
+        try:
+            result = data['results'][0]
+            location = result['geometry']['location']
+            return cls(status, result.get('formatted_address', ""),
+                       float(location['lat']), float(location['lng']))
+        except (AttributeError, IndexError, KeyError, TypeError,
+                ValueError):
+            logging.error("Can't read the response of the google api",
+                          exc_info=True)
+            return cls("UNKNOWN_ERROR")
+
+    def with_status(self, status):
+        """This method copies the result with another status.
+
+        Args:
+            status (String): Status of the copy.
+
+        Returns:
+            [GeocodeResult]: Copy of the result.
+        """
+        return GeocodeResult(status, self.formatted_address, self.latitude,
+                             self.longitude)
+
+
+# Keys of a page read by WikiPage.from_json, besides its extract.
+PAGE_KEYS = ("fullurl", "lastrevid")
+
+
+class WikiPage:
+    __slots__ = ("page_id", "url", "revision", "distance", "extract",
+                 "sections")
+
+    def __init__(self, page_id, url=None, revision=None, distance=None,
+                 extract=None, sections=None):
+        """Constructor of the class WikiPage. It holds a page of a response
+        of the media wiki api, or a page of the page cache, split into
+        sections and without its extract.
+
+        Args:
+            page_id (Int): Page id.
+            url (String, optional): Url of the page.
+            revision (Int, optional): Id of the last revision of the page.
+            distance (Float, optional): Distance from the place, in metres.
+            extract (String, optional): Text of the page.
+            sections (List, optional): Contains (title, body) tuples.
+        """
+        self.page_id = page_id
+        self.url = url
+        self.revision = revision
+        self.distance = distance
+        self.extract = extract
+        self.sections = sections
+
+    @classmethod
+    def from_json(cls, page_id, data):
+        """This class method reads a page of a response of the media wiki
+        api.
+
+        Args:
+            page_id (Int): Page id.
+            data (Dict): Data of the page.
+
+        Returns:
+            [WikiPage]: Contains the data of the page.
+        """
+        try:
+            distance = data['coordinates'][0]['dist']
+        except (KeyError, IndexError, TypeError):
+            distance = data.get('dist')
+
+        return cls(page_id, data.get('fullurl'), data.get('lastrevid'),
+                   distance, data.get('extract'))
+
 
 class GoogleApi:
     def __init__(self):
         """Constructor of the class GoogleApi."""
         self.url = config.value['GOOGLE']['URL']
         self.api_key = environ.get('GOOGLE_API_KEY')
-        self._data = []
+        self._result = GeocodeResult()
 
     def send_request(self, place):
-        """This method send a request on the google api end point.
+        """This method send a request on the google api end point. The
+        responses with the status OK or ZERO_RESULTS are cached by place, and
+        the identical requests sent at the same time are sent only once.
 
         Args:
             place (String): place to be sent to the api.
 
-        Raises:
-            SystemExit: If exception is raised.
+        Returns:
+            [GeocodeResult]: Result of the request, or None.
+        """
+        cache_key = place.strip()
+        result = geocode_cache.get(cache_key)
+        if result is None:
+            result = coalesce(("geocode", cache_key), self._fetch, place)
+        if result is None:
+            result = geocode_cache.get_stale(cache_key)
+        if result is None:
+            return None
+
+        self._result = result
+        return result
+
+    def _fetch(self, place):
+        """This method send the request for a place and caches its result.
+
+        Args:
+            place (String): place to be sent to the api.
 
         Returns:
-            [JSON]: Response from the request. Contains the data.
+            [GeocodeResult]: Result of the request, or None.
         """
-        payload = {'address': place, 'key': self.api_key}
-        try:
-            response = requests.get(self.url, params=payload)
-        except requests.exceptions.Timeout:
-            logging.error("Timeout error", exc_info=True)
-        except requests.exceptions.TooManyRedirects:
-            logging.error("Bad url", exc_info=True)
-        except requests.exceptions.RequestException as e:
-            logging.error("Bad request", exc_info=True)
-            raise SystemExit(e)
-        
-        if response.status_code == 200:
-            self._data = response.json()
-            return response.json()
-        else:
+        data = fetch_json(self.url, self._build_payload(place))
+        if data is None:
             return None
 
+        self._result = GeocodeResult.from_json(data)
+        self._cache_data(place.strip())
+
+        return self._result
+
+    @classmethod
+    def from_location(cls, formatted_address, latitude, longitude):
+        """This class method creates a google api Object from a place found
+        without request, with the data the api would have sent.
+
+        Args:
+            formatted_address (String): Address of the place.
+            latitude (Float): Latitude of the place.
+            longitude (Float): Longitude of the place.
+
+        Returns:
+            [GoogleApi]: Contains the data of the place.
+        """
+        google_api = cls()
+        google_api._result = GeocodeResult("OK", formatted_address, latitude,
+                                           longitude)
+
+        return google_api
+
+    def _build_payload(self, place):
+        """This method build the parameters of the request for a place.
+
+        Args:
+            place (String): place to be sent to the api.
+
+        Returns:
+            [Dict]: Parameters of the request.
+        """
+        return {'address': place, 'key': self.api_key}
+
+    def _cache_data(self, cache_key):
+        """This method put the result into the geocode cache. A ZERO_RESULTS
+        answer is kept for a shorter time than a successful one.
+
+        Args:
+            cache_key (String): Place sent to the api.
+        """
+        status = self.get_status()
+        if status == 'OK':
+            geocode_cache.set(cache_key, self._result)
+        elif status == 'ZERO_RESULTS':
+            geocode_cache.set(
+                cache_key, self._result,
+                config.value['GOOGLE']['CACHE']['NEGATIVE_TTL'])
+
     def get_data(self):
-        """This method get the data gathered from the api request.
+        """This method get the result gathered from the api request.
 
         Returns:
-            [JSON]: Response from the request. Contains the data.
+            [GeocodeResult]: Result of the request.
         """
-        return self._data
+        return self._result
 
     def get_formatted_address(self):
         """This method get the address of the place.
@@ -66,15 +494,7 @@ class GoogleApi:
         Returns:
             [String]: Address.
         """
-        formatted_address = ""
-        try:
-            if self.get_data():
-                formatted_address = self.get_data(
-                )['results'][0]['formatted_address']
-        except KeyError:
-            logging.error("Can't get formatted addresss", exc_info=True)
-
-        return formatted_address
+        return self._result.formatted_address
 
     def get_latitude(self):
         """This method get the latitude of a place.
@@ -82,15 +502,7 @@ class GoogleApi:
         Returns:
             [Int]: Represents the latitude.
         """
-        latitude = None
-        try:
-            if self.get_data():
-                latitude = self.get_data(
-                )['results'][0]['geometry']['location']['lat']
-        except KeyError:
-            logging.error("Can't get latitude", exc_info=True)
-
-        return latitude
+        return self._result.latitude
 
     def get_longitude(self):
         """This method get the longitude of a place.
@@ -98,15 +510,7 @@ class GoogleApi:
         Returns:
             [Int]: Represents the longitude.
         """
-        longitude = None
-        try:
-            if self.get_data():
-                longitude = self.get_data(
-                )['results'][0]['geometry']['location']['lng']
-        except KeyError:
-            logging.error("Can't get longitude", exc_info=True)
-
-        return longitude
+        return self._result.longitude
 
     def get_status(self):
         """This method get the status of the data.
@@ -114,130 +518,249 @@ class GoogleApi:
         Returns:
             [String]: Status is: OK or NOT OK
         """
-        status = ""
-
-        try:
-            if self.get_data():
-                status = self.get_data(
-                )['status']
-        except KeyError:
-            logging.error("Can't get status", exc_info=True)
-
-        return status
+        return self._result.status
 
     def set_status(self, new_status):
-        """This method modifies the status of the data."""
-        try:
-            if self.get_data():
-                self.get_data()['status'] = new_status
-        except KeyError:
-            logging.error("Can't get status", exc_info=True)
+        """This method modifies the status of the data. The result is copied,
+        so a result shared with the geocode cache keeps its status."""
+        self._result = self._result.with_status(new_status)
 
 
 class WikiApi:
     def __init__(self):
         """Constructor of the class WikiApi."""
         self.url = config.value['MEDIA_WIKI']['URL']
-        self._data = []
+        self._pages = {}
+        self._page_ids = None
+        self._trimmed = False
 
     def send_geosearch_request(self, latitude, longitude):
         """This method send a request on the wiki api end point. The request is
-        based on coordinates.
+        based on coordinates. The responses are cached by cell of a grid, so
+        the points close to each other share the same response, and the
+        requests for a cell sent at the same time are sent only once.
 
         Args:
             latitude (Int): Latitude of the place.
             longitude (Int): Longitude of the place.
 
-        Raises:
-            SystemExit: If exception is raised.
+        Returns:
+            [List]: Ids of the pages near the coordinates, the nearest page
+            first, or None if the request failed.
+        """
+        cache_key = self._get_cell(latitude, longitude)
+        if cache_key is not None:
+            cached = geosearch_cache.get(cache_key)
+            if cached is not None:
+                self._page_ids = cached
+                return cached
+
+        data = coalesce(
+            ("geosearch", cache_key), fetch_json, self.url,
+            self._build_geosearch_payload(latitude, longitude))
+        if data is None:
+            page_ids = None
+            if cache_key is not None:
+                page_ids = geosearch_cache.get_stale(cache_key)
+            if page_ids is not None:
+                self._page_ids = page_ids
+            return page_ids
+
+        self._set_data(data)
+        self._cache_geosearch(cache_key)
+        return self._page_ids
+
+    @staticmethod
+    def _get_cell(latitude, longitude):
+        """This method get the cell of the grid used as cache key for a
+        geosearch. The size of a cell follows MEDIA_WIKI.GS_RADIUS.
+
+        Args:
+            latitude (Int): Latitude of the place.
+            longitude (Int): Longitude of the place.
 
         Returns:
-            [JSON]: Response from the request. Contains the data.
+            [Tuple]: Row and column of the cell, or None without coordinates.
         """
-        payload = {
+        if latitude is None or longitude is None:
+            return None
+
+        media_wiki = config.value['MEDIA_WIKI']
+        return quantize_coordinates(
+            latitude, longitude,
+            media_wiki['GS_RADIUS']
+            / media_wiki['GEOSEARCH_CACHE']['CELLS_PER_RADIUS'])
+
+    @staticmethod
+    def _build_geosearch_payload(latitude, longitude):
+        """This method build the parameters of a geosearch request.
+
+        Args:
+            latitude (Int): Latitude of the place.
+            longitude (Int): Longitude of the place.
+
+        Returns:
+            [Dict]: Parameters of the request.
+        """
+        return {
             "action": "query",
             "format": "json",
             "list": "geosearch",
                     "gscoord": f"{latitude}|{longitude}",
-                    "gsradius": "1000",
+                    "gsradius": f"{config.value['MEDIA_WIKI']['GS_RADIUS']}",
                     "gslimit": "1"}
 
-        try:
-            response = requests.get(self.url, params=payload)
-        except requests.exceptions.Timeout:
-            logging.error("Timeout error")
-        except requests.exceptions.TooManyRedirects:
-            logging.error("Bad url")
-        except requests.exceptions.RequestException as e:
-            logging.error("Bad request")
-            raise SystemExit(e)
-
-        if response.status_code == 200:
-            self._data = response.json()
-            return response.json()
+    def _cache_geosearch(self, cache_key):
+        """This method put the page ids of a geosearch into the geosearch
+        cache.
+
+        Args:
+            cache_key (Tuple): Cell of the grid which contains the place.
+        """
+        if cache_key is not None and self._page_ids is not None:
+            geosearch_cache.set(cache_key, self._page_ids)
+
+    def _set_data(self, data):
+        """This method reads a response of the api in a single pass into
+        records of its pages and the ids of the pages, the nearest page
+        first. The response itself isn't kept.
+
+        Args:
+            data (JSON): Response from the request.
+        """
+        query = data.get('query') if isinstance(data, dict) else None
+        if not isinstance(query, dict):
+            self._pages, self._page_ids = {}, None
+            return
+
+        self._pages = {}
+        for page_id, page in query.get('pages', {}).items():
+            self._pages[int(page_id)] = WikiPage.from_json(int(page_id), page)
+
+        if 'geosearch' in query:
+            self._page_ids = [page['pageid'] for page in query['geosearch']]
         else:
-            return None
+            self._page_ids = [page.page_id for page in sorted(
+                self._pages.values(),
+                key=lambda page: (page.distance is None, page.distance or 0))]
 
-    def send_pageids_request(self, pageids):
+    def send_pageids_request(self, pageids, trimmed=None):
         """This method send a request on the wiki api end point. The request is
         based on the page_id of the wiki page.
 
         Args:
             pageids (Int): id.
-
-        Raises:
-            SystemExit: If exception is raised.
+            trimmed (Boolean, optional): Get only the beginning of the
+            extract. Defaults to MEDIA_WIKI.EXTRACT.TRIMMED.
 
         Returns:
-            [JSON]: Response from the request. Contains the data.
+            [WikiPage]: Page of the response, or None if the request failed.
         """
+        if trimmed is None:
+            trimmed = config.value['MEDIA_WIKI']['EXTRACT']['TRIMMED']
 
-        payload = {
+        data = coalesce(("pageids", pageids, trimmed), fetch_json, self.url,
+                        self._build_pageids_payload(pageids, trimmed))
+        if data is None:
+            return None
+
+        self._set_data(data)
+        self._trimmed = trimmed
+        return self._find_page(pageids)
+
+    @staticmethod
+    def _build_pageids_payload(pageids, trimmed=False):
+        """This method build the parameters of a page id request.
+
+        Args:
+            pageids (Int): id.
+            trimmed (Boolean, optional): Get only the beginning of the
+            extract.
+
+        Returns:
+            [Dict]: Parameters of the request.
+        """
+        return {
             "action": "query",
             "format": "json",
             "prop": "extracts|info|",
             "inprop": "url",
             "pageids": f"{pageids}",
-            "explaintext": "True"}
+            **WikiApi._build_extract_params(trimmed)}
 
-        try:
-            response = requests.get(self.url, params=payload)
-        except requests.exceptions.Timeout:
-            logging.error("Timeout error")
-        except requests.exceptions.TooManyRedirects:
-            logging.error("Bad url")
-        except requests.exceptions.RequestException as e:
-            logging.error("Bad request")
-            raise SystemExit(e)
-
-        if response.status_code == 200:
-            self._data = response.json()
-            return response.json()
-        else:
-            return None
+    @staticmethod
+    def _build_extract_params(trimmed):
+        """This method build the parameters of the extracts. The sections are
+        marked with "== title ==" as the parser expects, the text is sent as
+        UTF-8 instead of escaped characters, and a trimmed extract stops at
+        MEDIA_WIKI.EXTRACT.MAX_CHARS characters.
+
+        Args:
+            trimmed (Boolean): Get only the beginning of the extract.
+
+        Returns:
+            [Dict]: Parameters of the request.
+        """
+        params = {
+            "explaintext": "True",
+            "exsectionformat": "wiki",
+            "utf8": "1"}
+        if trimmed:
+            params["exchars"] = (
+                f"{config.value['MEDIA_WIKI']['EXTRACT']['MAX_CHARS']}")
+
+        return params
+
+    def is_truncated(self, page_id):
+        """This method tells if the extract of a page from the data has been
+        cut by the character limit of a trimmed request.
+
+        Args:
+            page_id (Int): Page id.
+
+        Returns:
+            [Boolean]: True if the extract is not the whole text of the page.
+        """
+        extract = self.get_extract(page_id)
+        if not self._trimmed or extract is None:
+            return False
+
+        return (len(extract) >= config.value['MEDIA_WIKI']['EXTRACT'][
+            'MAX_CHARS'] or extract.endswith(("…", "...")))
 
     def get_data(self):
-        """This method get the data gathered from the api request.
+        """This method get the pages gathered from the api request.
 
         Returns:
-            [JSON]: Response from the request. Contains the data.
+            [Dict]: Records of the pages, by page id.
         """
-        return self._data
+        return self._pages
+
+    def _find_page(self, page_id):
+        """This method get the record of a page from the data.
+
+        Args:
+            page_id (Int): Page id.
+
+        Returns:
+            [WikiPage]: Record of the page, or None.
+        """
+        try:
+            return self._pages.get(int(page_id))
+        except (TypeError, ValueError):
+            return None
 
     def get_page_id(self):
-        """This method get the page id from the data.
+        """This method get the id of the nearest page from the data.
 
         Returns:
             [Int]: Page id.
         """
-        wiki_data = self.get_data()
-        try:
-            page_id = wiki_data['query']['geosearch'][0]['pageid']
-        except Exception:
-            logging.error("Can't get page id", exc_info=True)
-            page_id = None
+        if not self._page_ids:
+            logging.error("Can't get page id")
+            return None
 
-        return page_id
+        return self._page_ids[0]
 
     def get_extract(self, page_id):
         """This method get the extraction text from wikipedia.
@@ -248,14 +771,8 @@ class WikiApi:
         Returns:
             [String]: Contains the text extracted.
         """
-        wiki_data = self.get_data()
-        try:
-            extract = wiki_data['query']['pages'][f"{page_id}"]['extract']
-        except KeyError:
-            logging.error("Can't get extract", exc_info=True)
-            extract = None
-
-        return extract
+        page = self._find_page(page_id)
+        return page.extract if page is not None else None
 
     def get_wiki_url(self, page_id):
         """This method get the url from the wikipedia page.
@@ -266,14 +783,253 @@ class WikiApi:
         Returns:
             [String]: url.
         """
-        fullurl = None
-        wiki_data = self.get_data()
-        try:
-            fullurl = wiki_data['query']['pages'][f"{page_id}"]['fullurl']
-        except KeyError:
-            logging.error("Can't get extract", exc_info=True)
+        page = self._find_page(page_id)
+        return page.url if page is not None else None
+
+    def get_revision(self, page_id):
+        """This method get the id of the last revision of the wikipedia page.
+
+        Args:
+            page_id (Int): Page id.
+
+        Returns:
+            [Int]: Revision id.
+        """
+        page = self._find_page(page_id)
+        return page.revision if page is not None else None
+
+    def get_page(self, page_id):
+        """This method get a wikipedia page already split into sections. The
+        pages are cached by page id, so a cached page needs neither a request
+        nor a parsing of the extract, and a page asked for by several threads
+        at the same time is fetched once.
+
+        Args:
+            page_id (Int): Page id.
+
+        Returns:
+            [WikiPage]: Contains the url, the revision and the sections of
+            the page, or None if the page can't be fetched.
+        """
+        page = page_cache.get(page_id)
+        if page is not None:
+            return page
+
+        page = coalesce(("page", page_id), self._fetch_page, page_id)
+        if page is None:
+            page = page_cache.get_stale(page_id)
+
+        return page
+
+    def _fetch_page(self, page_id):
+        """This method send the request for a page and caches the page split
+        into sections. If the trimmed extract is too short to hold a whole
+        section, the whole extract is streamed.
+
+        Args:
+            page_id (Int): Page id.
+
+        Returns:
+            [WikiPage]: Contains the url, the revision and the first section
+            of the page, or None if the page can't be fetched.
+        """
+        if config.value['MEDIA_WIKI']['EXTRACT']['TRIMMED']:
+            self.send_pageids_request(page_id)
+            page = self._cache_page(page_id)
+            if page is not None or not self.is_truncated(page_id):
+                return page
+
+        return self._stream_page(page_id)
+
+    def _stream_page(self, page_id):
+        """This method streams the extract of a page into the section scanner
+        and caches the page. The reading stops once the first section is
+        found, if the keys of the page came before the extract.
+
+        Args:
+            page_id (Int): Page id.
+
+        Returns:
+            [WikiPage]: Contains the url, the revision and the first section
+            of the page, or None if the page can't be fetched.
+        """
+        scanner = SectionScanner(limit=1)
+        data = fetch_json(self.url, self._build_pageids_payload(page_id),
+                          PageReader(scanner, keys=PAGE_KEYS))
+        if data is None:
+            return None
+
+        self._set_data(data)
+        self._trimmed = False
+        if self.get_extract(page_id) is None:
+            return None
 
-        return fullurl
+        return self._store_page(page_id, scanner.sections)
+
+    def _cache_page(self, page_id):
+        """This method get the first section of the extract of a page from
+        the data and put the page into the page cache. A section is only
+        found once the "==" after its body is read, so the character limit
+        of a trimmed extract can't cut it.
+
+        Args:
+            page_id (Int): Page id.
+
+        Returns:
+            [WikiPage]: Contains the url, the revision and the first section
+            of the page, or None if the data has no extract for this page, or
+            if the extract is truncated before the end of its first section.
+        """
+        extract = self.get_extract(page_id)
+        if extract is None:
+            return None
+
+        with metrics.stage("sections"):
+            sections = Parser(extract).split_sections(limit=1)
+
+        if not sections and self.is_truncated(page_id):
+            return None
+
+        return self._store_page(page_id, sections)
+
+    def _store_page(self, page_id, sections):
+        """This method put a page from the data into the page cache, without
+        its extract.
+
+        Args:
+            page_id (Int): Page id.
+            sections (List): Contains (title, body) tuples.
+
+        Returns:
+            [WikiPage]: Contains the url, the revision and the sections of
+            the page.
+        """
+        page = WikiPage(page_id, self.get_wiki_url(page_id),
+                        self.get_revision(page_id), sections=sections)
+        page_cache.set(page_id, page)
+
+        return page
+
+    def send_geosearch_pages_request(self, latitude, longitude):
+        """This method send a request on the wiki api end point. The request
+        gets the pages near the coordinates with their url and their extract,
+        in a single round trip.
+
+        Args:
+            latitude (Int): Latitude of the place.
+            longitude (Int): Longitude of the place.
+
+        Returns:
+            [List]: Ids of the pages near the coordinates, the nearest page
+            first, or None if the request failed.
+        """
+        data = fetch_json(
+            self.url, self._build_geosearch_pages_payload(latitude, longitude))
+        if data is None:
+            return None
+
+        self._set_data(data)
+        self._trimmed = True
+        return self._page_ids
+
+    @staticmethod
+    def _build_geosearch_pages_payload(latitude, longitude):
+        """This method build the parameters of a geosearch pages request.
+        The extract is trimmed; the api sends it for a single page, so
+        MEDIA_WIKI.GS_LIMIT keeps only the nearest page by default.
+
+        Args:
+            latitude (Int): Latitude of the place.
+            longitude (Int): Longitude of the place.
+
+        Returns:
+            [Dict]: Parameters of the request.
+        """
+        return {
+            "action": "query",
+            "format": "json",
+            "generator": "geosearch",
+            "ggscoord": f"{latitude}|{longitude}",
+            "ggsradius": f"{config.value['MEDIA_WIKI']['GS_RADIUS']}",
+            "ggslimit": f"{config.value['MEDIA_WIKI']['GS_LIMIT']}",
+            "prop": "extracts|info|coordinates",
+            "inprop": "url",
+            "exlimit": "max",
+            "codistancefrompoint": f"{latitude}|{longitude}",
+            **WikiApi._build_extract_params(trimmed=True)}
+
+    def get_candidate_ids(self):
+        """This method get the ids of the pages from the data of a geosearch
+        pages request, the nearest page first.
+
+        Returns:
+            [List]: Page ids.
+        """
+        return list(self._page_ids or [])
+
+    def find_candidate_ids(self, latitude, longitude):
+        """This method get the ids of the pages near the coordinates, the
+        nearest page first, from the geosearch cache or from the api. The
+        identical lookups made at the same time are sent only once.
+
+        Args:
+            latitude (Int): Latitude of the place.
+            longitude (Int): Longitude of the place.
+
+        Returns:
+            [List]: Page ids, empty without coordinates.
+        """
+        cell = self._get_cell(latitude, longitude)
+        if cell is None:
+            return []
+
+        cache_key = ("pages",) + cell
+        page_ids = geosearch_cache.get(cache_key)
+
+        if page_ids is None:
+            page_ids = coalesce(cache_key, self._fetch_candidates,
+                                latitude, longitude, cache_key)
+        if not page_ids:
+            page_ids = geosearch_cache.get_stale(cache_key)
+
+        return page_ids or []
+
+    def _fetch_candidates(self, latitude, longitude, cache_key):
+        """This method send the geosearch pages request and caches its pages
+        and their ids.
+
+        Args:
+            latitude (Int): Latitude of the place.
+            longitude (Int): Longitude of the place.
+            cache_key (Tuple): Cell of the grid which contains the place.
+
+        Returns:
+            [List]: Page ids, the nearest page first.
+        """
+        self.send_geosearch_pages_request(latitude, longitude)
+
+        return self._cache_candidates(cache_key)
+
+    def _cache_candidates(self, cache_key):
+        """This method put the pages whose extract is in the data of a
+        geosearch pages request into the page cache, and their ids into the
+        geosearch cache.
+
+        Args:
+            cache_key (Tuple): Cell of the grid which contains the place.
+
+        Returns:
+            [List]: Page ids, the nearest page first.
+        """
+        page_ids = self.get_candidate_ids()
+        for page_id in page_ids:
+            if self.get_extract(page_id) is not None:
+                self._cache_page(page_id)
+
+        if self._page_ids is not None:
+            geosearch_cache.set(cache_key, page_ids)
+
+        return page_ids
 
 
 class Parser:
@@ -300,6 +1056,26 @@ class Parser:
         self.message = unidecode(self.message)
         return self.message
 
+    def normalize(self):
+        """This method put the string to lowercase, removes the accents, the
+        apostrofes, the hyphens and the stop words, in a single translation
+        of the string. The result is the same as the one of set_lowercase,
+        remove_accents, remove_apostrof, remove_hyphen and remove_stop_words.
+
+        Returns:
+            [String]: Contains the normalized string.
+        """
+        self.message = self.message.translate(normalization_table)
+        try:
+            stop_words = resources.stop_words.get()
+            self.message = " ".join(
+                [word for word in self.message.split()
+                 if word not in stop_words])
+        except Exception:
+            logging.error("Can't open fr.json", exc_info=True)
+
+        return self.message
+
     def extract_questions(self):
         """This method extracts questions from a string and return one
         question.
@@ -333,9 +1109,7 @@ class Parser:
 
         message = self.message.split()
         try:
-            with open(os.path.join('flaskr', 'static', 'fr.json'),
-                      encoding='utf-8') as json_file:
-                stop_words = json.load(json_file)
+            stop_words = resources.stop_words.get()
 
             result = [word for word in message if word not in stop_words]
             self.message = " ".join(result)
@@ -373,24 +1147,19 @@ class Parser:
             [String]: One question.
         """
         result = ""
-        stemmer = SnowballStemmer("french")
+        stem_words = frozenset()
         try:
-            with open(os.path.join('flaskr', 'static', 'detect_word.json'),
-                      encoding='utf-8') as json_file:
-                words = json.load(json_file)
+            stem_words = detect_stems.get()
         except Exception:
             logging.error("Can't open detect_word.json", exc_info=True)
 
-        stem_words = [stemmer.stem(w) for w in words]
-
         similarity = 0
         for sentence in question_list:
             token_sentence = word_tokenize(sentence)
-            stem_sentence = [stemmer.stem(s) for s in token_sentence]
-            intersection = [
-                value for value in stem_sentence if value in stem_words]
+            intersection = sum(
+                1 for s in token_sentence if stem(s) in stem_words)
 
-            if len(intersection) > similarity:
+            if intersection > similarity:
                 result = sentence
 
         return result
@@ -401,48 +1170,47 @@ class Parser:
         Returns:
             [String]: One section the wikipedia page.
         """
-        regex = r"""(?<=(\={2}))(.*?)(?=(\={2}))"""
-        result = []
-        try:
-            matches = re.finditer(regex, self.message, re.DOTALL)
+        self.message = self.format_section(self.split_sections(limit=1))
 
-            for matchNum, match in enumerate(matches):
-                result.append(match.group())
-            result = [element.strip() for element in result]
+        return self.message
 
-        except AttributeError:
-            logging.error("AttributeError")
+    def split_sections(self, limit=None):
+        """This method split the wikipedia page into sections. Each section is
+        a pair of consecutive non empty parts of the page separated with "=",
+        in the order of the page. The page is read once, and no further than
+        the last section asked for.
 
-        self.message = self._format_section(result)
+        Args:
+            limit (Int, optional): Number of sections to get. Defaults to all
+            the sections.
 
-        return self.message
+        Returns:
+            [List]: Contains (title, body) tuples without section separator.
+        """
+        scanner = SectionScanner(limit)
+        try:
+            scanner.feed(self.message)
+        except TypeError:
+            logging.error("Can't split the page into sections")
+
+        return scanner.sections
 
-    def _format_section(self, result_section):
-        """This method removes section separator from the wikipedia page.
+    @staticmethod
+    def format_section(sections):
+        """This method format the first section of the wikipedia page.
          Format: Section title: Content.
 
         Args:
-            result_section (String): Contains the wikipedia page with a section
-            separated with "=".
+            sections (List): Contains (title, body) tuples.
 
         Returns:
             [String]: Contains the text without section separator.
         """
-        text = ""
-        i = 0
-        while (i < len(result_section)-1):
-            if (result_section[i] != '') and (result_section[i+1] != ''):
-                if (result_section[i][0] == '='):
-                    result_section[i] = result_section[i][1:]
-
-                if (result_section[i+1][0] == '='):
-                    result_section[i+1] = result_section[i+1][1:]
-
-                text = result_section[i] + " : " + result_section[i+1]
-                break
-            i += 1
+        if not sections:
+            return ""
 
-        return text
+        title, body = sections[0]
+        return title + " : " + body
 
 
 class Message:
@@ -459,9 +1227,7 @@ class Message:
             [Message]: Object which contains a bunch of answers.
         """
         try:
-            with open(os.path.join('flaskr', 'static', 'answers.json'),
-                      encoding='utf-8') as json_file:
-                return cls(json.load(json_file))
+            return cls(resources.answers.get())
         except Exception:
             logging.error("Can't open answers.json", exc_info=True)
 
@@ -486,6 +1252,16 @@ class Message:
         message = random.choice(self.data['message_for_error'])
         return message
 
+    def get_message_for_story_unavailable(self):
+        """This method get a message that will be send if the story can't be
+        found in time.
+
+        Returns:
+            [String]: Message.
+        """
+        message = random.choice(self.data['message_for_story_unavailable'])
+        return message
+
 
 class Response:
     def __init__(self, status, latitude, longitude, url,
@@ -0,0 +1,215 @@
+"""Module for the profiling of single requests.
+
+A view decorated with `profiled` runs under cProfile when the request has
+the profiling header, or at random at the sampling rate. The stats are
+written to the profiling directory twice: as a pstats file, to be read with
+the pstats module or snakeviz, and as collapsed stacks, to be drawn with
+flamegraph.pl or speedscope. The files are named after the id of the
+request, sent back in the X-Profile-Id header. The body of a streamed
+response is profiled while it is sent, and its stats are written once it is
+done.
+
+When PROFILING.ENABLED is false, the decorator returns the view unchanged.
+"""
+import cProfile
+import functools
+import logging
+import os
+import pstats
+import random
+import re
+import uuid
+
+from flask import make_response, request
+
+import configuration.config as config
+
+REQUEST_ID = re.compile(r'^[A-Za-z0-9_.-]{1,64}$')
+MIN_SECONDS = 1e-6
+
+
+def profiled(view_function):
+    """This decorator profiles the requests of a view.
+
+    Args:
+        view_function (Function): View to be profiled.
+
+    Returns:
+        [Function]: The view itself if the profiling is disabled.
+    """
+    settings = config.value.get('PROFILING', {})
+    if not settings.get('ENABLED'):
+        return view_function
+
+    @functools.wraps(view_function)
+    def wrapper(*args, **kwargs):
+        if not should_profile(settings):
+            return view_function(*args, **kwargs)
+
+        profile = cProfile.Profile()
+        response = make_response(
+            profile.runcall(view_function, *args, **kwargs))
+
+        request_id = get_request_id()
+        if response.is_streamed:
+            response.response = profile_stream(
+                profile, response.response, settings['DIRECTORY'],
+                request_id)
+            response.headers['X-Profile-Id'] = request_id
+        elif save_profile(profile, settings['DIRECTORY'], request_id):
+            response.headers['X-Profile-Id'] = request_id
+
+        return response
+
+    return wrapper
+
+
+def profile_stream(profile, body, directory, request_id):
+    """This generator profiles the body of a streamed response while it is
+    sent, and writes the stats once it is done.
+
+    Args:
+        profile (Profile): Profile of the request.
+        body (Iterable): Body of the response.
+        directory (String): Directory of the profiles.
+        request_id (String): Id of the request.
+
+    Yields:
+        [Object]: Chunks of the body.
+    """
+    done = object()
+    chunks = iter(body)
+    try:
+        while True:
+            chunk = profile.runcall(next, chunks, done)
+            if chunk is done:
+                return
+            yield chunk
+    finally:
+        save_profile(profile, directory, request_id)
+
+
+def save_profile(profile, directory, request_id):
+    """This function writes the stats of a profile, and logs the error if
+    they can't be written.
+
+    Returns:
+        [Bool]: True if the stats are written.
+    """
+    try:
+        write_profile(profile, directory, request_id)
+    except OSError:
+        logging.error("Can't write the profile", exc_info=True)
+        return False
+
+    return True
+
+
+def should_profile(settings):
+    """This function tells if the current request is profiled.
+
+    Args:
+        settings (Dict): Contains HEADER and SAMPLE_RATE.
+
+    Returns:
+        [Boolean]: True if the request has the profiling header or is
+        sampled.
+    """
+    if request.headers.get(settings['HEADER']):
+        return True
+
+    return random.random() < settings['SAMPLE_RATE']
+
+
+def get_request_id():
+    """This function get the id of the current request, from the
+    X-Request-Id header if it is safe in a file name, or a new id.
+
+    Returns:
+        [String]: Id of the request.
+    """
+    request_id = request.headers.get('X-Request-Id', '')
+    if REQUEST_ID.match(request_id):
+        return request_id
+
+    return uuid.uuid4().hex
+
+
+def write_profile(profile, directory, request_id):
+    """This function writes the stats of a profile as a pstats file and as
+    collapsed stacks.
+
+    Args:
+        profile (Profile): Profile of the request.
+        directory (String): Directory of the profiles.
+        request_id (String): Id of the request.
+
+    Returns:
+        [Tuple]: Paths of the pstats file and of the collapsed stacks.
+    """
+    os.makedirs(directory, exist_ok=True)
+    stats_path = os.path.join(directory, f"{request_id}.pstats")
+    collapsed_path = os.path.join(directory, f"{request_id}.collapsed")
+
+    profile.dump_stats(stats_path)
+    with open(collapsed_path, 'w', encoding='utf-8') as collapsed_file:
+        for stack, microseconds in collapse(pstats.Stats(profile).stats):
+            collapsed_file.write(f"{stack} {microseconds}\n")
+
+    return stats_path, collapsed_path
+
+
+def frame_name(function):
+    """This function get the name of a function in a collapsed stack.
+
+    Args:
+        function (Tuple): File, line and name of the function.
+
+    Returns:
+        [String]: Name of the frame.
+    """
+    filename, line, name = function
+    if filename == '~':
+        return name.replace(';', ',')
+
+    return f"{name} ({os.path.basename(filename)}:{line})".replace(';', ',')
+
+
+def collapse(stats):
+    """This function rebuilds the stacks of a profile from its call graph.
+    cProfile keeps only the calls between two functions, so the time of a
+    function called from several stacks is shared between them in
+    proportion to the time of each call. The stacks shorter than a
+    microsecond are dropped.
+
+    Args:
+        stats (Dict): Stats of a pstats.Stats object.
+
+    Returns:
+        [List]: Contains tuples (stack, self time in microseconds).
+    """
+    callees = {}
+    for function, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((function, edge))
+
+    lines = {}
+
+    def walk(function, stack, fraction):
+        stack = stack + (frame_name(function),)
+        key = ";".join(stack)
+        lines[key] = lines.get(key, 0) + stats[function][2] * fraction
+
+        for callee, edge in callees.get(function, ()):
+            callee_time = stats[callee][3]
+            if (frame_name(callee) in stack
+                    or fraction * edge[3] < MIN_SECONDS):
+                continue
+            walk(callee, stack, min(1.0, fraction * edge[3] / callee_time))
+
+    for function, (_, _, _, _, callers) in stats.items():
+        if not callers:
+            walk(function, (), 1.0)
+
+    return [(stack, int(seconds * 1e6))
+            for stack, seconds in lines.items() if seconds >= MIN_SECONDS]
@@ -0,0 +1,97 @@
+"""Module for the static resources of the app.
+
+The JSON files of 'flaskr/static' used by the parser and the messages are
+loaded once per process, into frozen structures ready to be queried. If
+RESOURCES.AUTO_RELOAD is set in the configuration, a file is loaded again
+when its modification time changes.
+"""
+import json
+import os
+import threading
+import weakref
+
+from types import MappingProxyType
+
+import configuration.config as config
+
+STATIC_DIR = os.path.join('flaskr', 'static')
+
+_registry = weakref.WeakSet()
+
+
+class Resource:
+    def __init__(self, filename, build):
+        """Constructor of the class Resource.
+
+        Args:
+            filename (String): Name of the JSON file in 'flaskr/static'.
+            build (Function): Turns the JSON data into the frozen structure.
+        """
+        self.path = os.path.join(STATIC_DIR, filename)
+        self.build = build
+        self._value = None
+        self._mtime = None
+        self._lock = threading.Lock()
+        _registry.add(self)
+
+    def get(self):
+        """This method get the structure built from the file. The file is read
+        on the first call only, or again if it changed and the auto reload is
+        enabled.
+
+        Raises:
+            OSError: If the file can't be read.
+            ValueError: If the file is not valid JSON.
+
+        Returns:
+            [Object]: Frozen structure.
+        """
+        value = self._value
+        if value is not None and not self._auto_reload():
+            return value
+
+        mtime = os.stat(self.path).st_mtime
+        if value is not None and mtime == self._mtime:
+            return value
+
+        with self._lock:
+            if self._value is None or self._mtime != mtime:
+                with open(self.path, encoding='utf-8') as json_file:
+                    self._value = self.build(json.load(json_file))
+                self._mtime = mtime
+
+            return self._value
+
+    def clear(self):
+        """This method forgets the loaded structure."""
+        with self._lock:
+            self._value = None
+            self._mtime = None
+
+    @staticmethod
+    def _auto_reload():
+        return config.value.get('RESOURCES', {}).get('AUTO_RELOAD', False)
+
+
+def freeze_answers(data):
+    """This function freezes the answers of the bot.
+
+    Args:
+        data (Dict): Contains a list of answers for each kind of message.
+
+    Returns:
+        [MappingProxyType]: Read only mapping of tuples of answers.
+    """
+    return MappingProxyType(
+        {key: tuple(answers) for key, answers in data.items()})
+
+
+stop_words = Resource('fr.json', frozenset)
+detect_words = Resource('detect_word.json', tuple)
+answers = Resource('answers.json', freeze_answers)
+
+
+def clear():
+    """This function forgets all the loaded resources."""
+    for resource in _registry:
+        resource.clear()
@@ -0,0 +1,376 @@
+"""Module for the incremental reading of wikipedia extracts.
+
+The extract of a long article can weigh hundreds of kilobytes while the story
+only needs its first section. The scanner reads the extract piece by piece,
+keeps only the part of the text it hasn't split yet, and stops as soon as it
+has the sections it was asked for. The page reader feeds it straight from
+the chunks of the JSON response of the api, so the extract is never held in
+memory as a whole.
+"""
+import json
+import re
+
+DELIMITER = "=="
+HIGH_SURROGATE = re.compile(r"\\u[dD][89abAB][0-9a-fA-F]{2}")
+
+
+class SectionScanner:
+    def __init__(self, limit=None):
+        """Constructor of the class SectionScanner.
+
+        Args:
+            limit (Int, optional): Number of sections after which the scanner
+            stops. Defaults to no limit.
+        """
+        self.limit = limit
+        self.sections = []
+        self._buffer = ""
+        self._offset = 0
+        self._position = 0
+        self._start = None
+        self._search = 0
+        self._empty_at = None
+        self._previous = None
+
+    @property
+    def done(self):
+        """True once the scanner has the sections it was asked for."""
+        return self.limit is not None and len(self.sections) >= self.limit
+
+    def feed(self, text):
+        """This method reads the next piece of the extract. A part of the
+        extract is a text between two "==", as found by the regex
+        (?<===)(.*?)(?===); a section is a pair of consecutive non empty
+        parts.
+
+        Args:
+            text (String): Next piece of the extract.
+
+        Returns:
+            [Boolean]: True once the scanner has the sections it was asked
+            for; the next pieces can be dropped.
+        """
+        if self.done:
+            return True
+
+        self._buffer += text
+        while not self.done:
+            if self._start is None:
+                found = self._buffer.find(
+                    DELIMITER, max(0, self._position - 2 - self._offset))
+                if found == -1:
+                    self._trim(len(self._buffer) - 1)
+                    break
+                self._start = found + 2 + self._offset
+                self._search = self._start
+
+            if self._start == self._empty_at:
+                self._search = max(self._search, self._start + 1)
+
+            end = self._buffer.find(DELIMITER, self._search - self._offset)
+            if end == -1:
+                self._search = max(self._search,
+                                   self._offset + len(self._buffer) - 1)
+                self._trim(self._start - 2 - self._offset)
+                break
+
+            end += self._offset
+            self._add_part(self._buffer[self._start - self._offset:
+                                        end - self._offset])
+            self._empty_at = self._start if end == self._start else None
+            self._position = end
+            self._start = None
+
+        if self.done:
+            self._buffer = ""
+        return self.done
+
+    def _trim(self, keep_from):
+        keep_from = max(0, keep_from)
+        self._buffer = self._buffer[keep_from:]
+        self._offset += keep_from
+
+    def _add_part(self, part):
+        part = part.strip()
+        title = self._previous
+        self._previous = part
+        if not title or not part:
+            return
+
+        if title[0] == '=':
+            title = title[1:]
+        if part[0] == '=':
+            part = part[1:]
+        self.sections.append((title, part))
+
+
+class JsonStringReader:
+    def __init__(self):
+        """Constructor of the class JsonStringReader. It decodes the
+        characters of a JSON string, after its opening quote, piece by
+        piece."""
+        self.closed = False
+        self._pending = ""
+
+    def feed(self, raw):
+        """This method decodes the next piece of the JSON string.
+
+        Args:
+            raw (String): Next piece of the JSON text.
+
+        Returns:
+            [Tuple]: Contains the decoded text and the rest of the JSON text
+            after the closing quote, or None if the string goes on.
+        """
+        raw = self._pending + raw
+        self._pending = ""
+
+        quote = find_closing_quote(raw)
+        if quote != -1:
+            self.closed = True
+            return decode(raw[:quote]), raw[quote + 1:]
+
+        cut = safe_cut(raw)
+        self._pending = raw[cut:]
+        return decode(raw[:cut]), None
+
+    def skip(self, raw):
+        """This method skips the next piece of the JSON string without
+        decoding it.
+
+        Args:
+            raw (String): Next piece of the JSON text.
+
+        Returns:
+            [String]: The rest of the JSON text after the closing quote, or
+            None if the string goes on.
+        """
+        raw = self._pending + raw
+        quote = find_closing_quote(raw)
+        if quote != -1:
+            self._pending = ""
+            self.closed = True
+            return raw[quote + 1:]
+
+        ends_in_escape = count_backslashes(raw, len(raw)) % 2
+        self._pending = "\\" if ends_in_escape else ""
+        return None
+
+
+def find_closing_quote(raw):
+    """This function find the quote which closes a JSON string.
+
+    Args:
+        raw (String): Characters of the string, after its opening quote.
+
+    Returns:
+        [Int]: Index of the closing quote, or -1.
+    """
+    quote = raw.find('"')
+    while quote != -1:
+        if count_backslashes(raw, quote) % 2 == 0:
+            return quote
+        quote = raw.find('"', quote + 1)
+
+    return -1
+
+
+def count_backslashes(raw, end):
+    """This function counts the backslashes just before a position.
+
+    Args:
+        raw (String): Characters of a JSON string.
+        end (Int): Position.
+
+    Returns:
+        [Int]: Number of backslashes.
+    """
+    start = end
+    while start > 0 and raw[start - 1] == "\\":
+        start -= 1
+
+    return end - start
+
+
+def safe_cut(raw):
+    """This function get the end of the part of a piece of a JSON string
+    which can be decoded on its own: the piece can't end in an escape
+    sequence, or between the two halves of a surrogate pair.
+
+    Args:
+        raw (String): Characters of the string, without its closing quote.
+
+    Returns:
+        [Int]: Index where the piece can be cut.
+    """
+    backslash = raw.rfind("\\")
+    if backslash == -1 or count_backslashes(raw, backslash) % 2 == 1:
+        return len(raw)
+
+    escape = raw[backslash:]
+    if (escape[1:2] in ("", "u") and backslash >= 6
+            and HIGH_SURROGATE.match(raw, backslash - 6)
+            and count_backslashes(raw, backslash - 6) % 2 == 0):
+        cut = backslash - 6
+    else:
+        cut = backslash
+
+    if len(escape) < 2 or (escape[1] == "u" and len(escape) < 6):
+        return cut
+    if HIGH_SURROGATE.fullmatch(escape):
+        return backslash
+
+    return len(raw)
+
+
+def decode(raw):
+    """This function decodes the characters of a JSON string.
+
+    Args:
+        raw (String): Characters of the string, without quotes.
+
+    Returns:
+        [String]: Decoded text.
+    """
+    if "\\" not in raw:
+        return raw
+
+    return json.loads(f'"{raw}"')
+
+
+class PageReader:
+    def __init__(self, scanner, keys=None):
+        """Constructor of the class PageReader. It reads the JSON response of
+        a page request piece by piece: the extract is sent to the scanner,
+        the rest of the response is kept to be decoded at the end.
+
+        Args:
+            scanner (SectionScanner): Scanner of the extract.
+            keys (Tuple, optional): Keys of the response needed besides the
+            extract. Once the scanner is done, the rest of the response isn't
+            needed if these keys came before the extract. Defaults to the
+            whole response.
+        """
+        self.scanner = scanner
+        self.keys = keys
+        self._outer = []
+        self._tail = ""
+        self._string = None
+
+    @property
+    def done(self):
+        """True once the rest of the response isn't needed: the scanner is
+        done while the extract is read, and the keys came before it."""
+        if self.keys is None or self._string is None or not self.scanner.done:
+            return False
+
+        outer = "".join(self._outer)
+        return all(f'"{key}"' in outer for key in self.keys)
+
+    def feed(self, chunk):
+        """This method reads the next chunk of the response.
+
+        Args:
+            chunk (String): Next chunk of the JSON text.
+        """
+        while chunk:
+            if self._string is not None:
+                if self.scanner.done:
+                    rest = self._string.skip(chunk)
+                else:
+                    text, rest = self._string.feed(chunk)
+                    self.scanner.feed(text)
+                if rest is None:
+                    return
+                self._string = None
+                self._outer.append('"')
+                chunk = rest
+                continue
+
+            text = self._tail + chunk
+            start = find_extract(text)
+            if start == -1:
+                keep = max(0, len(text) - 32)
+                self._outer.append(text[:keep])
+                self._tail = text[keep:]
+                return
+
+            self._outer.append(text[:start])
+            self._tail = ""
+            self._string = JsonStringReader()
+            chunk = text[start:]
+
+    def close(self):
+        """This method decodes the response, once every chunk is read or
+        once the reader is done. The extract is replaced with an empty
+        string.
+
+        Returns:
+            [JSON]: Response without the extract.
+
+        Raises:
+            ValueError: If the response is not a whole JSON text.
+        """
+        if self._string is not None:
+            if not self.done:
+                raise ValueError("Response ends in the extract")
+            return json.loads(close_json("".join(self._outer) + '"'))
+
+        return json.loads("".join(self._outer) + self._tail)
+
+
+def close_json(text):
+    """This function closes the objects and the arrays left open in a JSON
+    text cut just after a value.
+
+    Args:
+        text (String): Beginning of a JSON text.
+
+    Returns:
+        [String]: JSON text.
+    """
+    closers = []
+    in_string = escaped = False
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            closers.append("}" if char == "{" else "]")
+        elif char in "}]":
+            closers.pop()
+
+    return text + "".join(reversed(closers))
+
+
+def find_extract(text):
+    """This function find the start of the value of an "extract" key.
+
+    Args:
+        text (String): JSON text.
+
+    Returns:
+        [Int]: Index of the first character of the value, after its opening
+        quote, or -1.
+    """
+    key = text.find('"extract"')
+    while key != -1:
+        position = key + len('"extract"')
+        rest = text[position:].lstrip()
+        if rest.startswith(":"):
+            rest = rest[1:].lstrip()
+            if rest.startswith('"'):
+                return len(text) - len(rest) + 1
+            if not rest:
+                return -1
+        elif not rest:
+            return -1
+        key = text.find('"extract"', key + 1)
+
+    return -1
@@ -0,0 +1,113 @@
+"""Module for the http session shared by the upstream apis.
+
+Each worker process owns one requests session, so the connections to the
+google api and to the media wiki api are kept alive and reused from one
+request to another. The session is created again after a fork.
+"""
+import logging
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError, ReadTimeoutError, ResponseError
+from urllib3.util.retry import Retry
+
+import configuration.config as config
+
+from flaskr import deadline
+
+_session = None
+_session_pid = None
+_lock = threading.Lock()
+
+
+class DeadlineRetry(Retry):
+    """Retry policy which doesn't retry under a deadline. urllib3 gives each
+    attempt the timeout of the first one, the time left before the deadline
+    when the request was sent, so each retry could take this whole budget
+    again."""
+
+    def increment(self, method=None, url=None, response=None, error=None,
+                  _pool=None, _stacktrace=None):
+        """This method get the retry policy of the next attempt, or raises
+        the error of the request when it must not be retried. A response
+        which isn't retried is given back as it is.
+
+        Args:
+            method (String, optional): Method of the request.
+            url (String, optional): Url of the request.
+            response (HTTPResponse, optional): Response of the request.
+            error (Exception, optional): Error of the request.
+
+        Returns:
+            [DeadlineRetry]: Retry policy of the next attempt.
+        """
+        if deadline.current() is not None:
+            if isinstance(error, ReadTimeoutError):
+                raise error
+            raise MaxRetryError(_pool, url, error or ResponseError(
+                f"no retry under a deadline (status {response.status})"
+                if response is not None else "no retry under a deadline"))
+
+        return super().increment(method, url, response, error, _pool,
+                                 _stacktrace)
+
+
+def create_session(settings):
+    """This function creates a session with a pool of keep-alive connections
+    and a retry policy. Nothing is retried under a deadline, and the last
+    response is given back instead of an error once the retries are spent.
+
+    Args:
+        settings (Dict): Contains POOL_CONNECTIONS, POOL_MAXSIZE, KEEP_ALIVE,
+        RETRIES and BACKOFF_FACTOR.
+
+    Returns:
+        [Session]: New session.
+    """
+    retry = DeadlineRetry(total=settings['RETRIES'],
+                          backoff_factor=settings['BACKOFF_FACTOR'],
+                          status_forcelist=(502, 503, 504),
+                          raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=settings['POOL_CONNECTIONS'],
+                          pool_maxsize=settings['POOL_MAXSIZE'],
+                          max_retries=retry)
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    if not settings['KEEP_ALIVE']:
+        session.headers['Connection'] = 'close'
+
+    return session
+
+
+def get_session():
+    """This function get the session of the current process.
+
+    Returns:
+        [Session]: Session shared by the upstream apis.
+    """
+    global _session, _session_pid
+
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _lock:
+            if _session is None or _session_pid != pid:
+                _session = create_session(config.value['HTTP'])
+                _session_pid = pid
+
+    return _session
+
+
+def warm_up():
+    """This function opens the connections to the upstream apis, so the first
+    request of the worker doesn't pay the TLS handshake."""
+    session = get_session()
+    for url in (config.value['GOOGLE']['URL'],
+                config.value['MEDIA_WIKI']['URL']):
+        try:
+            session.head(url, timeout=config.value['HTTP']['WARM_UP_TIMEOUT'])
+        except requests.exceptions.RequestException:
+            logging.warning("Can't warm up the connection to %s", url)
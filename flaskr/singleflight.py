@@ -0,0 +1,71 @@
+"""Module for the coalescing of identical concurrent calls.
+
+When several threads ask for the same key at the same time, only the first
+one runs the call; the other ones wait for it and get the same result. The
+load on the upstream apis then grows with the number of distinct questions
+instead of the number of requests.
+"""
+import threading
+
+
+class _Call:
+    def __init__(self):
+        """Constructor of the class _Call."""
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        """Constructor of the class SingleFlight."""
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, function, *args, timeout=None):
+        """This method runs a function, unless a call with the same key is
+        already running; in that case it waits for this call and returns its
+        result.
+
+        Args:
+            key (Hashable): Key of the call.
+            function (Function): Function to be called.
+            *args: Arguments of the function.
+            timeout (Float, optional): Maximum time to wait for the running
+            call, in seconds. Defaults to no limit.
+
+        Raises:
+            Exception: The exception raised by the function, in every caller.
+            TimeoutError: If the running call doesn't finish in time.
+
+        Returns:
+            [Object]: Result of the function.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            if not call.done.wait(timeout):
+                raise TimeoutError(f"Call {key!r} still running")
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function(*args)
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+    def __len__(self):
+        return len(self._calls)
@@ -0,0 +1,109 @@
+"""Module for the cold start of the app.
+
+When STARTUP.PRELOAD is set, gunicorn imports the app once in its master
+process, and `preload` loads there what each worker would otherwise load on
+its first request: the stemmer, the tokenizer, the JSON resources, the
+gazetteer and the geo index. The workers forked afterwards
+share these pages copy-on-write. The loaded objects are then moved out of
+the generations of the garbage collector, whose passes in a worker would
+otherwise write to every one of them and copy their pages.
+
+The time of each step and the resident memory of each process are logged at
+boot, to follow the cost of a cold start.
+"""
+import gc
+import logging
+import os
+import resource
+import sys
+import time
+
+from flaskr import models, resources
+from flaskr.gazetteer import get_gazetteer
+from flaskr.geoindex import get_geo_index
+
+
+def load_tokenizer():
+    """This function loads the data of the tokenizer set in
+    PARSER.TOKENIZER, on its first tokenization."""
+    models.word_tokenize("GrandPy")
+
+
+def load_resources():
+    """This function loads the JSON resources of the parser and the
+    messages."""
+    for resource_file in (resources.stop_words, resources.detect_words,
+                          resources.answers, models.detect_stems):
+        resource_file.get()
+
+
+STEPS = (
+    ("stemmer", models.get_stemmer),
+    ("tokenizer", load_tokenizer),
+    ("resources", load_resources),
+    ("gazetteer", get_gazetteer),
+    ("geo_index", get_geo_index),
+)
+
+
+def preload(freeze=True):
+    """This function loads the state shared by the workers. A step which
+    fails is logged and left to the first request of each worker.
+
+    Args:
+        freeze (Boolean, optional): Move the loaded objects out of the
+        generations of the garbage collector.
+
+    Returns:
+        [Dict]: Contains the duration of each step, in seconds.
+    """
+    timings = {}
+    for name, step in STEPS:
+        start = time.perf_counter()
+        try:
+            step()
+        except (LookupError, OSError, ValueError):
+            logging.warning("Can't preload the %s", name, exc_info=True)
+        timings[name] = time.perf_counter() - start
+
+    if freeze:
+        gc.collect()
+        gc.freeze()
+
+    return timings
+
+
+def resident_memory():
+    """This function get the resident memory of the current process.
+
+    Returns:
+        [Int]: Resident memory, in bytes. The peak resident memory where
+        /proc is not available.
+    """
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def describe(label, seconds, timings=None):
+    """This function get the line logged at the boot of a process.
+
+    Args:
+        label (String): Name of the process.
+        seconds (Float): Time taken by the boot, in seconds.
+        timings (Dict, optional): Contains the duration of each step, in
+        seconds.
+
+    Returns:
+        [String]: Pid, boot time, resident memory and steps.
+    """
+    line = (f"{label} pid={os.getpid()} boot={seconds * 1000:.0f}ms "
+            f"rss={resident_memory() / 2 ** 20:.1f}MiB")
+    if timings:
+        line += " " + " ".join(f"{name}={duration * 1000:.0f}ms"
+                               for name, duration in timings.items())
+
+    return line
@@ -13,6 +13,56 @@ function send_data_to_backend(url, data) {
         .catch(error => console.log(error));
 }
 
+function stream_data_from_backend(url, data, on_event) {
+
+    return fetch(url, {
+        method: "POST",
+        body: data
+    })
+        .then(response => {
+            let reader = response.body.getReader();
+            let decoder = new TextDecoder();
+            let buffer = "";
+
+            function read() {
+                return reader.read().then(({ done, value }) => {
+                    if (done) {
+                        return;
+                    }
+                    buffer += decoder.decode(value, { stream: true });
+
+                    let events = buffer.split("\n\n");
+                    buffer = events.pop();
+                    events.forEach(event => dispatch_event(event, on_event));
+
+                    return read();
+                });
+            }
+
+            return read();
+        })
+        .catch(error => console.log(error));
+}
+
+function dispatch_event(event, on_event) {
+
+    let name = "message";
+    let data = "";
+
+    event.split("\n").forEach(line => {
+        if (line.startsWith("event: ")) {
+            name = line.slice(7);
+        }
+        else if (line.startsWith("data: ")) {
+            data += line.slice(6);
+        }
+    });
+
+    if (data !== "") {
+        on_event(name, JSON.parse(data));
+    }
+}
+
 function add_question_to_chat(question) {
     let newDiv = document.createElement("div");
     let newP = document.createElement("p");
@@ -113,31 +163,32 @@ form.addEventListener('submit', function (event) {
 
         add_question_to_chat(question);
         document.getElementById('loader').style.display = 'block';
-        send_data_to_backend("/form", new FormData(form))
-            .then(response => {
-                
-                let status = response["status"];
+        stream_data_from_backend("/form/stream", new FormData(form),
+            (event, response) => {
 
-                if (status == "OK") {
+                if (event == "address") {
                     let lat = response["latitude"];
                     let lng = response["longitude"];
-                    let url = response["url"];
                     let message_for_address = response["message_for_address"];
-                    let message_for_story = response["message_for_story"]
-                    console.log(response);
                     add_answer_to_chat(message_for_address, null);
-                    add_answer_to_chat(message_for_story, url);
                     scroll_down();
 
                     displayMap(lat, lng);
-                    
                 }
-                else {
+                else if (event == "story") {
+                    let url = response["url"];
+                    let message_for_story = response["message_for_story"];
+                    add_answer_to_chat(message_for_story, url);
+                    scroll_down();
+                }
+                else if (event == "error") {
                     let message_for_error = response["message_for_error"];
                     add_answer_to_chat(message_for_error, null);
+                    scroll_down();
                 }
-                document.getElementById('loader').style.display = 'None';            
-
+            })
+            .then(() => {
+                document.getElementById('loader').style.display = 'None';
             });
             
     }
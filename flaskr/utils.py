@@ -1,9 +1,20 @@
+import contextvars
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+import configuration.config as config
+
+from flaskr import deadline, metrics
+from flaskr.gazetteer import get_gazetteer
+from flaskr.geoindex import find_nearest_page_id
 from flaskr.models import GoogleApi, WikiApi, Response, Parser, Message
 
 
 def treat_data_from_user(data):
     """This function treat the data send by the user. The data come from the
-    form.
+    form. The requests to the apis share the budget DEADLINE.TIMEOUT; if it
+    runs out before the story is found, the address is answered alone.
 
     Args:
         data (String): Contains the sentence introduced by the user
@@ -15,48 +26,155 @@ def treat_data_from_user(data):
         user.
     """
 
-    message = parse_data_from_user(data)
-    google_api_data = get_data_from_google_api(message)
-    
-    if (google_api_data.get_status() == 'OK'):
-        wiki_api_data, page_id = get_data_from_wiki_api(google_api_data)
-        
-        if (page_id is not None):
-
-            extract_text_from_wiki = wiki_api_data.get_extract(page_id)
-
-            data_wiki = parse_data_from_wiki(extract_text_from_wiki)
-            response_address = get_message_for_adress(
-            ) + " " + google_api_data.get_formatted_address()
-
-            response = Response(google_api_data.get_status(),
-                                google_api_data.get_latitude(),
-                                google_api_data.get_longitude(),
-                                wiki_api_data.get_wiki_url(page_id),
-                                response_address,
-                                data_wiki,
-                                None)
-        else:
-            response = Response(google_api_data.get_status(),
-                            None,
-                            None,
-                            None,
-                            None,
-                            None,
-                            get_message_for_error())
-
-    else:
-        response = Response(google_api_data.get_status(),
-                            None,
-                            None,
-                            None,
-                            None,
-                            None,
-                            get_message_for_error())
+    with deadline.scope(config.value['DEADLINE']['TIMEOUT']):
+        with metrics.stage("parse"):
+            message = parse_data_from_user(data)
+        with metrics.stage("geocode"):
+            google_api_data = get_data_from_google_api(message)
+        page = None
+
+        if (google_api_data.get_status() == 'OK'):
+            page, page_id = get_data_from_wiki_api(google_api_data)
+
+        with metrics.stage("format"):
+            response = build_response(google_api_data, page)
 
     return response.formatted_response()
 
 
+def stream_data_from_user(data):
+    """This function treat the data send by the user and yields each part of
+    the answer as soon as it is ready: the address first, then the story,
+    and last the duration of each stage.
+
+    Args:
+        data (String): Contains the sentence introduced by the user
+        in the form.
+
+    Yields:
+        [Tuple]: Contains the name of the event and its data: "address"
+        with the status, the coordinates and the message for the address,
+        "story" with the url and the message for the story, or "error" with
+        the status and the message for the error, then "timing" with the
+        durations in the format of the Server-Timing header.
+    """
+    context = deadline.new_context(config.value['DEADLINE']['TIMEOUT'])
+    timings = metrics.context_timings(context)
+    start = time.perf_counter()
+
+    yield from stream_events(context, data)
+
+    timings["total"] = time.perf_counter() - start
+    yield "timing", {"server_timing": metrics.server_timing(timings)}
+
+
+def stream_events(context, data):
+    """This function yields the events of stream_data_from_user, running
+    each step with its deadline and timings.
+
+    Args:
+        context (Context): Context with the deadline and the timings.
+        data (String): Contains the sentence introduced by the user
+        in the form.
+
+    Yields:
+        [Tuple]: Contains the name of the event and its data.
+    """
+    message = context.run(metrics.run_stage, "parse",
+                          parse_data_from_user, data)
+    google_api_data = context.run(metrics.run_stage, "geocode",
+                                  get_data_from_google_api, message)
+    status = google_api_data.get_status()
+
+    if (status != 'OK'):
+        yield "error", {"status": status,
+                        "message_for_error": get_message_for_error()}
+        return
+
+    yield "address", context.run(metrics.run_stage, "format",
+                                 format_address, google_api_data)
+
+    page, page_id = context.run(get_data_from_wiki_api, google_api_data)
+    if page is None and context.run(deadline.expired):
+        yield "story", {"url": None,
+                        "message_for_story":
+                        get_message_for_story_unavailable()}
+        return
+    if page is None:
+        yield "error", {"status": status,
+                        "message_for_error": get_message_for_error()}
+        return
+
+    yield "story", {"url": page.url,
+                    "message_for_story": context.run(
+                        metrics.run_stage, "format",
+                        Parser.format_section, page.sections)}
+
+
+def format_address(google_api_data):
+    """This function get the data of the "address" event.
+
+    Args:
+        google_api_data (GoogleApi): Contains data from api google.
+
+    Returns:
+        [Dict]: Contains the status, the coordinates and the message for
+        the address.
+    """
+    return {"status": google_api_data.get_status(),
+            "latitude": google_api_data.get_latitude(),
+            "longitude": google_api_data.get_longitude(),
+            "message_for_address": get_message_for_adress(
+            ) + " " + google_api_data.get_formatted_address()}
+
+
+def build_response(google_api_data, page):
+    """This function builds the response from the data of the google api and
+    the wikipedia page. If the page is missing because the deadline has
+    passed, the response gives the address without the story.
+
+    Args:
+        google_api_data (GoogleApi): Contains data from api google.
+        page (WikiPage): Wikipedia page split into sections, or None.
+
+    Returns:
+        [Response]: Contains the data from the google api and
+        media wiki api + messages that will be shown to the
+        user.
+    """
+    if (page is None and google_api_data.get_status() == 'OK'
+            and deadline.expired()):
+        return Response(google_api_data.get_status(),
+                        google_api_data.get_latitude(),
+                        google_api_data.get_longitude(),
+                        None,
+                        get_message_for_adress(
+                        ) + " " + google_api_data.get_formatted_address(),
+                        get_message_for_story_unavailable(),
+                        None)
+
+    if page is None:
+        return Response(google_api_data.get_status(),
+                        None,
+                        None,
+                        None,
+                        None,
+                        None,
+                        get_message_for_error())
+
+    data_wiki = Parser.format_section(page.sections)
+    response_address = get_message_for_adress(
+    ) + " " + google_api_data.get_formatted_address()
+
+    return Response(google_api_data.get_status(),
+                    google_api_data.get_latitude(),
+                    google_api_data.get_longitude(),
+                    page.url,
+                    response_address,
+                    data_wiki,
+                    None)
+
+
 def parse_data_from_user(data):
     """This function creates a parser with a string data. It applies the
     methods from the Parser class to clean the string.
@@ -69,11 +187,7 @@ def parse_data_from_user(data):
         [String]: Contains only one questions that comes from the message.
     """
     parser = Parser(data)
-    parser.set_lowercase()
-    parser.remove_accents()
-    parser.remove_apostrof()
-    parser.remove_hyphen()
-    parser.remove_stop_words()
+    parser.normalize()
     parser.extract_questions()
 
     return parser.message
@@ -96,11 +210,17 @@ def parse_data_from_wiki(data):
 
 def get_data_from_google_api(data):
     """This method creates a google api Object and send a request to the api
-    endpoint.
+    endpoint, unless the place is found in the local gazetteer.
 
     Returns:
         [Object]: GoogleApi contains data from api google.
     """
+    gazetteer = get_gazetteer()
+    if gazetteer is not None:
+        place = gazetteer.lookup(data)
+        if place is not None:
+            return GoogleApi.from_location(*place)
+
     google_api = GoogleApi()
     google_api.send_request(data)
 
@@ -115,21 +235,158 @@ def get_data_from_wiki_api(data):
         data (JSON): Contains the response from the google map api.
 
     Returns:
-        [Tuple]: Contains the response from the wiki api and the id
-        of the page.
+        [Tuple]: Contains the page split into sections and the id of the
+        page. The page is None if there is no page near the place.
     """
-    latitude = data.get_latitude()
-    longitude = data.get_longitude()
+    point = (data.get_latitude(), data.get_longitude())
+    with metrics.stage("geosearch"):
+        candidates = {point: find_page_ids(*point)}
+
+    return select_pages(candidates, get_pages)[point]
+
+
+def find_page_ids(latitude, longitude):
+    """This method get the ids of the candidate pages near a place, the
+    nearest page first. The local geo index is checked before the api.
+
+    Args:
+        latitude (Int): Latitude of the place.
+        longitude (Int): Longitude of the place.
+
+    Returns:
+        [List]: Page ids.
+    """
+    page_id = find_nearest_page_id(latitude, longitude)
+    if page_id is not None:
+        return [page_id]
+
+    if config.value['MEDIA_WIKI']['COMBINED_LOOKUP']:
+        return WikiApi().find_candidate_ids(latitude, longitude)
 
     geosearch_data = WikiApi()
     geosearch_data.send_geosearch_request(latitude, longitude)
 
     page_id = geosearch_data.get_page_id()
+    if page_id is None:
+        return []
 
-    pageids_data = WikiApi()
-    pageids_data.send_pageids_request(page_id)
+    return [page_id]
 
-    return pageids_data, page_id
+
+def get_pages(page_ids):
+    """This method get wikipedia pages split into sections.
+
+    Args:
+        page_ids (Iterable): Page ids.
+
+    Returns:
+        [Dict]: Contains the page of each page id, or None.
+    """
+    with metrics.stage("extract"):
+        return {page_id: WikiApi().get_page(page_id) for page_id in page_ids}
+
+
+def select_pages(candidates, fetch_pages):
+    """This method get, for each place, the nearest page which has a usable
+    section. If no page has a section, the nearest page is kept. The pages
+    are fetched in rounds, so the pages farther away are fetched only when
+    the nearer ones have no section, and a page wanted by several places is
+    fetched once per round.
+
+    Args:
+        candidates (Dict): Contains the candidate page ids of each place, the
+        nearest page first.
+        fetch_pages (Function): Get the pages of a set of page ids.
+
+    Returns:
+        [Dict]: Contains a tuple (page, page id) for each place. The page is
+        None if there is no page near the place.
+    """
+    selected = {}
+    nearest = {}
+    position = dict.fromkeys(candidates, 0)
+    pending = list(candidates)
+
+    while pending:
+        wanted = {candidates[place][position[place]]
+                  for place in pending if candidates[place]}
+        pages = fetch_pages(wanted)
+
+        next_pending = []
+        for place in pending:
+            if not candidates[place]:
+                selected[place] = (None, None)
+                continue
+
+            page_id = candidates[place][position[place]]
+            page = pages[page_id]
+            if page is not None and page.sections:
+                selected[place] = (page, page_id)
+                continue
+            if page is not None and place not in nearest:
+                nearest[place] = (page, page_id)
+
+            position[place] += 1
+            if position[place] < len(candidates[place]):
+                next_pending.append(place)
+            else:
+                selected[place] = nearest.get(place, (None, None))
+
+        pending = next_pending
+
+    return selected
+
+
+def treat_batch_from_user(data):
+    """This function treat a batch of questions. The identical addresses and
+    the identical pages are requested once, and the requests to the apis are
+    sent concurrently. The requests to the apis share the budget
+    DEADLINE.BATCH_TIMEOUT.
+
+    Args:
+        data (List): Contains the sentences of the batch.
+
+    Returns:
+        [List]: Contains the formatted response of each sentence, in the
+        order of the batch.
+    """
+    messages = [parse_data_from_user(sentence) for sentence in data]
+
+    with deadline.scope(config.value['DEADLINE']['BATCH_TIMEOUT']), \
+            ThreadPoolExecutor(
+                max_workers=config.value['BATCH']['MAX_WORKERS']) as executor:
+
+        def map_unique(function, keys):
+            unique_keys = list(dict.fromkeys(keys))
+            futures = [executor.submit(contextvars.copy_context().run,
+                                       function, key)
+                       for key in unique_keys]
+            return dict(zip(unique_keys,
+                            (future.result() for future in futures)))
+
+        google_api_data = map_unique(get_data_from_google_api, messages)
+
+        points = {message: (google_api.get_latitude(),
+                            google_api.get_longitude())
+                  for message, google_api in google_api_data.items()
+                  if google_api.get_status() == 'OK'}
+        candidates = map_unique(lambda point: find_page_ids(*point),
+                                points.values())
+
+        selected = select_pages(
+            candidates,
+            lambda page_ids: map_unique(
+                lambda page_id: WikiApi().get_page(page_id), page_ids))
+
+        responses = []
+        for message in messages:
+            page = None
+            if message in points:
+                page, page_id = selected[points[message]]
+            response = build_response(google_api_data[message], page)
+            responses.append(response.formatted_response())
+
+    return responses
 
 
 def get_message_for_adress():
@@ -153,6 +410,17 @@ def get_message_for_error():
     return data_message.get_message_for_error()
 
 
+def get_message_for_story_unavailable():
+    """This method get the message that will be send if the story can't be
+    found before the deadline.
+
+    Returns:
+        [String]: Message.
+    """
+    data_message = Message.get_answers_from_json()
+    return data_message.get_message_for_story_unavailable()
+
+
 def check_page_id(google_api, page_id):
     """This method check if the page_id is present in the request response from
     wiki. If there is no page_id, the status of the google_api is set to "NOT
@@ -1,7 +1,14 @@
+import json
+
 from flask import render_template, jsonify, request
-from flask import Blueprint
+from flask import Blueprint, Response
+
+import configuration.config as config
 
-from flaskr.utils import treat_data_from_user
+from flaskr import metrics
+from flaskr.profiling import profiled
+from flaskr.utils import (stream_data_from_user, treat_batch_from_user,
+                          treat_data_from_user)
 
 view = Blueprint('view', __name__)
 
@@ -17,14 +24,76 @@ def index():
 
 
 @view.route('/form', methods=["POST"])
+@profiled
 def form():
-    """This function get the data from the question-form.
+    """This function get the data from the question-form. The duration of
+    each stage is sent back in the Server-Timing header.
 
     Returns:
         [JSON]: The response contains the lat, long, url, and the
                 different messages.
     """
     data = request.form["user_text"]
-    response = treat_data_from_user(data)
+    with metrics.request_timings() as timings:
+        response = treat_data_from_user(data)
+
+    response = jsonify(response)
+    response.headers['Server-Timing'] = metrics.server_timing(timings)
+
+    return response
+
+
+@view.route('/form/stream', methods=["POST"])
+@profiled
+def form_stream():
+    """This function get the data from the question-form and streams the
+    answer as server-sent events: the address as soon as it is known, then
+    the story.
+
+    Returns:
+        [Response]: Stream of "address", "story" and "error" events.
+    """
+    data = request.form["user_text"]
+
+    def generate():
+        for event, event_data in stream_data_from_user(data):
+            yield f"event: {event}\ndata: {json.dumps(event_data)}\n\n"
+
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache',
+                             'X-Accel-Buffering': 'no'})
 
-    return jsonify(response)
+
+@view.route('/form/batch', methods=["POST"])
+def form_batch():
+    """This function get a batch of questions from a JSON body:
+    {"questions": ["...", "..."]}.
+
+    Returns:
+        [JSON]: The response contains the results of the questions, in the
+                order of the batch.
+    """
+    data = request.get_json(silent=True)
+    questions = data.get("questions") if isinstance(data, dict) else None
+
+    if (not isinstance(questions, list)
+            or not all(isinstance(question, str) for question in questions)):
+        return jsonify({"error": "questions must be a list of strings"}), 400
+
+    if len(questions) > config.value['BATCH']['MAX_QUESTIONS']:
+        return jsonify({"error": "too many questions"}), 400
+
+    return jsonify({"results": treat_batch_from_user(questions)})
+
+
+@view.route('/metrics')
+def metrics_endpoint():
+    """This function exposes the metrics of the process in the text format of
+    Prometheus.
+
+    Returns:
+        [Response]: Histograms of the stages and of the apis, counters of the
+                    status codes of the apis.
+    """
+    return Response(metrics.render(),
+                    mimetype='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,62 @@
+"""Configuration of gunicorn, read from the current directory at boot."""
+import time
+
+import configuration.config as config
+
+BOOT = time.perf_counter()
+
+config.load('./configuration/config.yml')
+
+preload_app = config.value['STARTUP']['PRELOAD']
+
+
+def on_starting(server):
+    """This hook prepares the directory where the workers write their
+    metrics, before the app is imported and the workers are forked."""
+    from flaskr import metrics
+
+    directory = metrics.prepare(config.value['METRICS']['DIRECTORY'])
+    server.log.info("metrics of the workers in %s", directory)
+
+
+def when_ready(server):
+    """This hook loads the state shared by the workers in the master, once
+    the app is imported and before the workers are forked."""
+    from flaskr import startup
+
+    timings = startup.preload() if preload_app else None
+    server.log.info(startup.describe("master", time.perf_counter() - BOOT,
+                                     timings))
+
+
+def post_fork(server, worker):
+    """This hook opens the connections to the upstream apis as soon as a
+    worker is forked, before it serves its first request."""
+    from flaskr.session import warm_up
+
+    worker.forked_at = time.perf_counter()
+    warm_up()
+
+
+def post_worker_init(worker):
+    """This hook logs the boot time and the resident memory of a worker,
+    once it has imported the app."""
+    from flaskr import startup
+
+    worker.log.info(startup.describe(
+        "worker", time.perf_counter() - worker.forked_at))
+
+
+def worker_exit(server, worker):
+    """This hook writes the last metrics of a worker before it exits."""
+    from flaskr import metrics
+
+    metrics.dump()
+
+
+def child_exit(server, worker):
+    """This hook keeps the metrics of a worker gone in the archive, so the
+    counters added up by /metrics never go back."""
+    from flaskr import metrics
+
+    metrics.archive(worker.pid)
@@ -0,0 +1,23 @@
+import pytest
+
+from flaskr import models, resources
+
+CACHES = (models.geocode_cache, models.geosearch_cache, models.page_cache)
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """This fixture empties the upstream caches, closes the circuits and
+    forgets the loaded resources so that every test starts with a cold
+    cache."""
+    for cache in CACHES:
+        cache.clear()
+    for breaker in models.breakers.values():
+        breaker.reset()
+    resources.clear()
+    yield
+    for cache in CACHES:
+        cache.clear()
+    for breaker in models.breakers.values():
+        breaker.reset()
+    resources.clear()
@@ -0,0 +1,167 @@
+import asyncio
+import inspect
+import json
+
+from flaskr import aio, asgi
+
+
+GOOGLE_DATA = {"results": [
+    {"formatted_address": "7 Cité Paradis, 75010 Paris, France",
+     "geometry": {"location": {"lat": 48.874847, "lng": 2.350487}}}],
+    "status": "OK"}
+
+WIKI_DATA = {"batchcomplete": "",
+             "query": {"pages": {"51281575": {
+                 "pageid": 51281575,
+                 "title": "Studio Berçot",
+                 "coordinates": [{"dist": 138}],
+                 "extract": "Intro == Histoire == Texte ==",
+                 "fullurl": "https://fr.wikipedia.org/wiki/S"}}}}
+
+
+async def mock_fetch_json(url, params):
+    """This function mock the fetch_json function.
+
+    Returns:
+        [JSON]: Contains the data from the api.
+    """
+    if 'address' in params:
+        return GOOGLE_DATA
+    return WIKI_DATA
+
+
+class TestAsyncPipeline:
+    """This class contains all the methods to test the async pipeline."""
+
+    def test_send_request(self, monkeypatch):
+        """This method tests the send_request method of AsyncGoogleApi.
+
+        Args:
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+        """
+        monkeypatch.setattr('flaskr.aio.fetch_json', mock_fetch_json)
+        google_api = aio.AsyncGoogleApi()
+
+        asyncio.run(google_api.send_request("OpenClassrooms"))
+
+        assert google_api.get_latitude() == 48.874847
+
+    def test_treat_data_from_user(self, monkeypatch):
+        """This method tests the async treat_data_from_user function.
+
+        Args:
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+        """
+        monkeypatch.setattr('flaskr.aio.fetch_json', mock_fetch_json)
+        monkeypatch.setattr('flaskr.aio.parse_data_from_user',
+                            lambda data: "openclassrooms")
+
+        response = asyncio.run(aio.treat_data_from_user("OpenClassrooms?"))
+
+        assert response["status"] == "OK"
+        assert response["url"] == "https://fr.wikipedia.org/wiki/S"
+        assert response["message_for_story"] == "Histoire : Texte"
+
+    def test_candidate_pages_without_coordinates(self, monkeypatch):
+        """This method tests that the async wiki api looks for no page
+        without coordinates.
+
+        Args:
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+        """
+        monkeypatch.setattr('flaskr.aio.fetch_json', mock_fetch_json)
+
+        async def collect():
+            return [page async for page in
+                    aio.AsyncWikiApi().get_candidate_pages(None, None)]
+
+        assert asyncio.run(collect()) == []
+
+    def test_bad_json(self, monkeypatch):
+        """This method tests that a response which isn't JSON is recorded
+        and gives no data.
+
+        Args:
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+        """
+        calls = []
+
+        class MockResponse:
+            status = 200
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *args):
+                pass
+
+            async def json(self, content_type=None):
+                raise json.JSONDecodeError("Expecting value", "<html>", 0)
+
+        class MockSession:
+            def get(self, url, **kwargs):
+                return MockResponse()
+
+        monkeypatch.setattr('flaskr.aio.get_client_session', MockSession)
+        monkeypatch.setattr('flaskr.aio.record_call',
+                            lambda url, status, start: calls.append(status))
+
+        assert asyncio.run(aio.fetch_json("https://example.org", {})) is None
+        assert calls == [200]
+
+    def test_request_methods_are_coroutines(self):
+        """This method tests that the methods of the api classes which send
+        a request are coroutines in the async api classes."""
+        for name in ("send_request", "_fetch"):
+            assert inspect.iscoroutinefunction(
+                getattr(aio.AsyncGoogleApi, name))
+        for name in ("send_geosearch_request", "send_pageids_request",
+                     "send_geosearch_pages_request", "get_page",
+                     "_fetch_page", "_stream_page", "find_candidate_ids",
+                     "_fetch_candidates"):
+            assert inspect.iscoroutinefunction(
+                getattr(aio.AsyncWikiApi, name))
+
+
+class TestAsgiApp:
+    """This class contains all the methods to test the ASGI entry point."""
+
+    def test_form(self, monkeypatch):
+        """This method tests the post method on form route of the ASGI app.
+
+        Args:
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+        """
+        async def mock_treat_data_from_user(data):
+            return {"status": "OK", "question": data}
+
+        monkeypatch.setattr('flaskr.asgi.treat_data_from_user',
+                            mock_treat_data_from_user)
+        scope = {"type": "http", "path": "/form", "method": "POST",
+                 "headers": [(b"content-type",
+                              b"application/x-www-form-urlencoded")]}
+        events = [{"type": "http.request",
+                   "body": b"user_text=Texte+de+l%27utilisateur"}]
+        sent = []
+
+        async def receive():
+            return events.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        asyncio.run(asgi.app(scope, receive, send))
+
+        assert sent[0]["status"] == 200
+        assert json.loads(sent[1]["body"]) == {
+            "status": "OK", "question": "Texte de l'utilisateur"}
@@ -0,0 +1,109 @@
+import json
+
+import pytest
+
+from benchmarks import loadgen, stubs, suite
+from flaskr.utils import parse_data_from_user
+
+
+class TestSuite:
+    """This class contains all the methods to test the benchmark suite."""
+
+    def test_compare(self):
+        """This method tests that only the benchmarks slower than the
+        threshold are regressions."""
+        rows = suite.compare({"a": 1.0, "b": 1.0, "c": 1.0},
+                             {"a": 1.05, "b": 1.2, "d": 2.0}, 0.1)
+
+        assert [(row[0], row[4]) for row in rows] == [
+            ("a", False), ("b", True)]
+
+    def test_save_and_load(self, tmp_path):
+        """This method tests that a saved baseline can be loaded.
+
+        Args:
+            tmp_path (Path): Temporary directory from pytest.
+        """
+        path = str(tmp_path / "baseline.json")
+        suite.save(path, {"parser.normalize": 0.001})
+
+        assert suite.load(path) == {"parser.normalize": 0.001}
+        with open(path) as baseline_file:
+            assert "python" in json.load(baseline_file)
+
+    def test_extract_has_sections(self):
+        """This method tests that the extract of the benchmarks is split into
+        sections like a wikipedia extract."""
+        sections = suite.Parser(suite.EXTRACT).split_sections()
+
+        assert len(suite.EXTRACT) > 100000
+        assert len(sections) > 40
+
+
+class TestLoadgen:
+    """This class contains all the methods to test the load generator."""
+
+    def test_percentile(self):
+        """This method tests the nearest rank percentiles."""
+        values = list(range(1, 101))
+
+        assert loadgen.percentile(values, 50) == 50
+        assert loadgen.percentile(values, 99) == 99
+        assert loadgen.percentile([], 50) is None
+
+    def test_parse_server_timing(self):
+        """This method tests the parsing of a Server-Timing header."""
+        timings = loadgen.parse_server_timing(
+            'google;dur=12.5, wiki;desc="Wiki";dur=30, miss')
+
+        assert timings == {"google": 12.5, "wiki": 30.0}
+
+    def test_make_questions(self):
+        """This method tests that the distinct questions give distinct
+        addresses to the parser."""
+        unique = len(loadgen.PLACES) * len(loadgen.CITIES)
+        addresses = {parse_data_from_user(question)
+                     for question in loadgen.make_questions(unique)}
+
+        assert len(addresses) == unique
+        assert "" not in addresses
+        with pytest.raises(ValueError):
+            loadgen.make_questions(unique + 1)
+
+
+class TestStubs:
+    """This class contains all the methods to test the stubs of the apis."""
+
+    def test_wiki(self):
+        """This method tests that the stubs answer the requests of the
+        combined lookup and of the legacy geosearch."""
+        stage, data = stubs.wiki({"generator": "geosearch"}, "Intro", 2)
+        pages = data["query"]["pages"]
+
+        assert stage == "geosearch_pages"
+        assert len(pages) == 2
+        assert [page.get("extract") for page in pages.values()] == [
+            "Intro", None]
+
+        stage, data = stubs.wiki({"generator": "geosearch", "ggslimit": "1"},
+                                 "Intro", 2)
+
+        assert len(data["query"]["pages"]) == 1
+
+        stage, data = stubs.wiki({"list": "geosearch"}, "Intro", 2)
+
+        assert stage == "geosearch"
+        assert data["query"]["geosearch"][0]["pageid"] == stubs.FIRST_PAGE_ID
+
+    def test_wiki_trimmed(self):
+        """This method tests that the stubs cut the extracts longer than
+        exchars, as the api does."""
+        stage, data = stubs.wiki({"pageids": "7", "exchars": "5"},
+                                 "Intro == A ==", 1)
+
+        assert data["query"]["pages"]["7"]["extract"] == "Intro…"
+
+        stage, data = stubs.wiki({"pageids": "7", "exchars": "50"},
+                                 "Intro == A ==", 1)
+
+        assert data["query"]["pages"]["7"]["extract"] == "Intro == A =="
@@ -0,0 +1,104 @@
+import threading
+
+import requests
+
+from flaskr import models
+from flaskr.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from flaskr.models import GeocodeResult, GoogleApi, geocode_cache
+from tests.test_utils import MockRequestGet
+
+SETTINGS = {"WINDOW": 4, "MIN_CALLS": 2, "ERROR_RATE": 0.5, "SLOW_CALL": 1,
+            "OPEN_TIME": 10}
+
+
+class TestCircuitBreaker:
+    """This class contains all the methods to test the CircuitBreaker."""
+
+    def test_open_on_errors(self):
+        """This method tests that the circuit opens when the error rate is
+        reached and that it doesn't allow the calls any more."""
+        breaker = CircuitBreaker("test", SETTINGS)
+        breaker.record(True, 0.1)
+        breaker.record(True, 0.1)
+        breaker.record(False, 0.1)
+
+        assert breaker.state == CLOSED
+
+        breaker.record(True, 2)
+
+        assert breaker.state == OPEN
+        assert not breaker.allow()
+
+    def test_probe(self, monkeypatch):
+        """This method tests that a single probe is started once the circuit
+        has been open long enough, and that it closes the circuit.
+
+        Args:
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+        """
+        now = [1000.0]
+        monkeypatch.setattr('flaskr.breaker.time.monotonic', lambda: now[0])
+        breaker = CircuitBreaker("test", SETTINGS)
+        breaker.record(False, 0.1)
+        breaker.record(False, 0.1)
+        release = threading.Event()
+        done = threading.Event()
+        probes = []
+
+        def probe():
+            probes.append(breaker.allow())
+            release.wait(5)
+            breaker.record(True, 0.1)
+            done.set()
+
+        assert not breaker.probe(probe)
+
+        now[0] += 10
+
+        assert breaker.probe(probe)
+        assert not breaker.probe(probe)
+        assert breaker.state == HALF_OPEN
+        assert not breaker.allow()
+
+        release.set()
+        done.wait(5)
+
+        assert probes == [True]
+        assert breaker.state == CLOSED
+
+
+class TestStaleWhileOpen:
+    """This class contains all the methods to test the answers served while
+    a circuit is open."""
+
+    def test_serve_stale(self, monkeypatch):
+        """This method tests that an expired address is served without
+        request while the circuit of the google api is open.
+
+        Args:
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+        """
+        calls = []
+
+        def mock_get(session, url, params=None, **kwargs):
+            calls.append(params['address'])
+            raise requests.ConnectionError()
+
+        monkeypatch.setattr('flaskr.models.requests.Session.get', mock_get)
+        monkeypatch.setattr(geocode_cache, 'stale_ttl', 60)
+        geocode_cache.set("openclassrooms", GeocodeResult.from_json(
+            MockRequestGet("", {"address": "openclassrooms"}).json()), ttl=0)
+        breaker = models.breakers[GoogleApi().url]
+        for i in range(breaker.min_calls):
+            breaker.record(False, 0.1)
+
+        google_api = GoogleApi()
+        google_api.send_request("openclassrooms")
+
+        assert calls == []
+        assert google_api.get_status() == "OK"
+        assert google_api.get_latitude() == 48.874847
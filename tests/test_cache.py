@@ -0,0 +1,92 @@
+from flaskr.cache import TTLCache, quantize_coordinates
+
+
+class TestTTLCache:
+    """This class contains all the methods to test the TTLCache."""
+
+    def test_get_missing_key(self):
+        """This method tests get method with an unknown key."""
+        cache = TTLCache(2, 60)
+
+        assert cache.get("tour eiffel") is None
+
+    def test_set_and_get(self):
+        """This method tests set and get methods."""
+        cache = TTLCache(2, 60)
+        cache.set("tour eiffel", {"status": "OK"})
+
+        assert cache.get("tour eiffel") == {"status": "OK"}
+
+    def test_expired_entry(self, monkeypatch):
+        """This method tests that an expired entry is not returned.
+
+        Args:
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+        """
+        now = [1000.0]
+        monkeypatch.setattr('flaskr.cache.time.monotonic', lambda: now[0])
+        cache = TTLCache(2, 60)
+        cache.set("tour eiffel", "OK")
+        cache.set("nowhere", "ZERO_RESULTS", 10)
+
+        now[0] += 30
+
+        assert cache.get("tour eiffel") == "OK"
+        assert cache.get("nowhere") is None
+
+    def test_stale_entry(self, monkeypatch):
+        """This method tests that an expired entry is served stale until its
+        stale time to live has passed.
+
+        Args:
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+        """
+        now = [1000.0]
+        monkeypatch.setattr('flaskr.cache.time.monotonic', lambda: now[0])
+        cache = TTLCache(2, 60, 100)
+        cache.set("tour eiffel", "OK")
+
+        now[0] += 90
+
+        assert cache.get("tour eiffel") is None
+        assert cache.get_stale("tour eiffel") == "OK"
+
+        now[0] += 90
+
+        assert cache.get_stale("tour eiffel") is None
+        assert len(cache) == 0
+
+    def test_lru_eviction(self):
+        """This method tests that the least recently used entry is evicted
+        when the cache is full."""
+        cache = TTLCache(2, 60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+
+class TestQuantizeCoordinates:
+    """This class contains all the methods to test quantize_coordinates."""
+
+    def test_close_points_share_a_cell(self):
+        """This method tests that two points a few metres apart are in the
+        same cell."""
+        cell = quantize_coordinates(48.874847, 2.350487, 100)
+
+        assert quantize_coordinates(48.874860, 2.350500, 100) == cell
+
+    def test_distant_points_are_in_different_cells(self):
+        """This method tests that two points a kilometre apart are in
+        different cells."""
+        cell = quantize_coordinates(48.874847, 2.350487, 100)
+
+        assert quantize_coordinates(48.883847, 2.350487, 100) != cell
@@ -0,0 +1,245 @@
+import contextlib
+import http.server
+import threading
+import time
+
+import pytest
+import requests
+
+import configuration.config as config
+
+from flaskr import deadline
+from flaskr.models import fetch_json
+from flaskr.sections import PageReader, SectionScanner
+from flaskr.singleflight import SingleFlight
+from flaskr.utils import treat_data_from_user
+from tests.test_utils import MockRequestGet
+
+
+class TestDeadline:
+    """This class contains all the methods to test the deadlines."""
+
+    def test_default_timeout(self):
+        """This method tests that the default timeout is used without
+        deadline."""
+        assert deadline.current() is None
+        assert deadline.get_timeout() == config.value['DEADLINE']['TIMEOUT']
+        assert not deadline.expired()
+
+    def test_scope(self):
+        """This method tests that the timeout is the time left in the scope
+        and that the deadline is forgotten after the scope."""
+        with deadline.scope(10):
+            assert 9 < deadline.get_timeout() <= 10
+
+        with deadline.scope(0):
+            assert deadline.get_timeout() == 0
+            assert deadline.expired()
+
+        assert deadline.current() is None
+
+    def test_new_context(self):
+        """This method tests that the deadline of a new context is only seen
+        by the code run in this context."""
+        context = deadline.new_context(0)
+
+        assert context.run(deadline.expired)
+        assert not deadline.expired()
+
+
+class TestFetchJson:
+    """This class contains all the methods to test the timeout of the
+    requests."""
+
+    def test_timeout_is_time_left(self, monkeypatch):
+        """This method tests that the timeout of a request is the time left
+        before the deadline.
+
+        Args:
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+        """
+        timeouts = []
+
+        def mock_get(session, url, params=None, timeout=None, **kwargs):
+            timeouts.append(timeout)
+            return MockRequestGet(url, params)
+
+        monkeypatch.setattr('flaskr.models.requests.Session.get', mock_get)
+
+        with deadline.scope(5):
+            fetch_json("https://example.org", {"address": "x"})
+
+        assert 4 < timeouts[0] <= 5
+
+    def test_no_time_left(self, monkeypatch):
+        """This method tests that no request is sent after the deadline.
+
+        Args:
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+        """
+        calls = []
+        monkeypatch.setattr('flaskr.models.requests.Session.get',
+                            lambda *args, **kwargs: calls.append(args))
+
+        with deadline.scope(0):
+            assert fetch_json("https://example.org", {}) is None
+
+        assert calls == []
+
+    def test_wait_timeout(self):
+        """This method tests that a caller waiting on a running call gives up
+        after its timeout."""
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def function():
+            started.set()
+            release.wait(5)
+
+        leader = threading.Thread(target=flight.do, args=("key", function))
+        leader.start()
+        started.wait(5)
+
+        with pytest.raises(TimeoutError):
+            flight.do("key", function, timeout=0.01)
+
+        release.set()
+        leader.join(5)
+
+
+class SlowHandler(http.server.BaseHTTPRequestHandler):
+    """Handler of a server which stalls before its response, answers 503
+    slowly, or sends its body chunk by chunk, slowly."""
+
+    def do_GET(self):
+        """This method answers a request slowly."""
+        try:
+            if self.path.startswith("/stall"):
+                time.sleep(2)
+            if self.path.startswith("/unavailable"):
+                time.sleep(1)
+                self.send_response(503)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(8192 * 30))
+            self.end_headers()
+            for _ in range(30):
+                self.wfile.write(b" " * 8192)
+                self.wfile.flush()
+                time.sleep(0.1)
+        except OSError:
+            pass
+
+    def log_message(self, *args):
+        """This method keeps the requests out of the output of the tests."""
+
+
+@contextlib.contextmanager
+def slow_server():
+    """This context manager runs a slow server in a thread.
+
+    Yields:
+        [String]: Url of the server.
+    """
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class TestSlowServer:
+    """This class contains all the methods to test that a request to a slow
+    server keeps to the deadline, retries included."""
+
+    BUDGET = 0.5
+    MARGIN = 0.3
+
+    def test_stalled_response(self):
+        """This method tests that a read timeout is not retried under a
+        deadline."""
+        with slow_server() as url, deadline.scope(self.BUDGET):
+            start = time.monotonic()
+            assert fetch_json(url + "/stall", {}) is None
+            elapsed = time.monotonic() - start
+
+        assert elapsed <= self.BUDGET + self.MARGIN
+
+    def test_slow_unavailable(self, monkeypatch):
+        """This method tests that a 503 status is not retried under a
+        deadline, and is recorded.
+
+        Args:
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+        """
+        calls = []
+        monkeypatch.setattr('flaskr.models.record_call',
+                            lambda url, status, start: calls.append(status))
+
+        with slow_server() as url, deadline.scope(1.5):
+            start = time.monotonic()
+            assert fetch_json(url + "/unavailable", {}) is None
+            elapsed = time.monotonic() - start
+
+        assert elapsed <= 1.5 + self.MARGIN
+        assert calls == [503]
+
+    def test_slow_body(self):
+        """This method tests that a streamed body is read until the deadline
+        only."""
+        reader = PageReader(SectionScanner())
+
+        with slow_server() as url, deadline.scope(self.BUDGET):
+            start = time.monotonic()
+            assert fetch_json(url + "/drip", {}, reader) is None
+            elapsed = time.monotonic() - start
+
+        assert elapsed <= self.BUDGET + self.MARGIN
+
+
+class TestPartialAnswer:
+    """This class contains all the methods to test the answer given when the
+    deadline passes."""
+
+    def test_address_without_story(self, monkeypatch):
+        """This method tests that the address is answered when the story can't
+        be found in time.
+
+        Args:
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+        """
+        def mock_get(session, url, params=None, **kwargs):
+            if 'address' in params:
+                return MockRequestGet(url, params)
+            time.sleep(0.05)
+            raise requests.Timeout()
+
+        monkeypatch.setattr('flaskr.models.requests.Session.get', mock_get)
+        monkeypatch.setattr('flaskr.utils.parse_data_from_user',
+                            lambda data: data.lower())
+        monkeypatch.setitem(config.value['DEADLINE'], 'TIMEOUT', 0.02)
+
+        result = treat_data_from_user("OpenClassrooms")
+
+        assert result["status"] == "OK"
+        assert result["latitude"] == 48.874847
+        assert result["url"] is None
+        assert "7 Cité Paradis" in result["message_for_address"]
+        assert result["message_for_story"]
+        assert result["message_for_error"] is None
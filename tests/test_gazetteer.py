@@ -0,0 +1,104 @@
+import configuration.config as config
+
+from flaskr import gazetteer as gazetteer_module
+from flaskr.gazetteer import Gazetteer, get_gazetteer, tokenize_name
+
+
+class TestGazetteer:
+    """This class contains all the methods to test the Gazetteer."""
+
+    def build_gazetteer(self):
+        """This method creates a gazetteer with a few places.
+
+        Returns:
+            [Gazetteer]: Gazetteer.
+        """
+        gazetteer = Gazetteer()
+        gazetteer.add("Tour Eiffel", "Champ de Mars, 75007 Paris, France",
+                      48.8584, 2.2945)
+        gazetteer.add("Paris", "Paris, France", 48.8566, 2.3522, 2138551)
+        gazetteer.add("Arc de Triomphe", "Place Charles de Gaulle, Paris",
+                      48.8738, 2.2950)
+        return gazetteer
+
+    def test_tokenize_name(self):
+        """This method tests that names are normalized like the questions."""
+        assert tokenize_name("l'Arc de Triomphe") == ("arc", "triomphe")
+
+    def test_lookup_exact(self):
+        """This method tests the lookup of a whole question."""
+        gazetteer = self.build_gazetteer()
+
+        assert gazetteer.lookup("tour eiffel?") == (
+            "Champ de Mars, 75007 Paris, France", 48.8584, 2.2945)
+
+    def test_lookup_name_in_question(self):
+        """This method tests the lookup of a name inside a question."""
+        gazetteer = self.build_gazetteer()
+
+        assert gazetteer.lookup("adresse arc triomphe?")[0] == (
+            "Place Charles de Gaulle, Paris")
+
+    def test_lookup_unknown_words(self):
+        """This method tests that a question with words outside of the name
+        is left to the google api."""
+        gazetteer = self.build_gazetteer()
+
+        assert gazetteer.lookup("adresse openclassrooms paris?") is None
+
+    def test_load_geonames(self, tmp_path):
+        """This method tests the loading of a GeoNames dump.
+
+        Args:
+            tmp_path (Path): Temporary directory from pytest.
+        """
+        path = tmp_path / "FR.txt"
+        path.write_text(
+            "2988507\tParis\tParis\tLutece,Paname\t48.85341\t2.3488\tP\tPPLC"
+            "\tFR\t\t11\t75\t751\t75056\t2138551\t\t42\tEurope/Paris"
+            "\t2020-01-01\n", encoding='utf-8')
+
+        gazetteer = Gazetteer.load(str(path))
+
+        assert gazetteer.lookup("paname?") == (
+            "Paris, France", 48.85341, 2.3488)
+
+    def test_load_without_coordinates(self, tmp_path):
+        """This method tests that the rows of a file without coordinates are
+        skipped.
+
+        Args:
+            tmp_path (Path): Temporary directory from pytest.
+        """
+        path = tmp_path / "places.csv"
+        path.write_text("name,lat,lng\nParis,48.85,2.35\n", encoding='utf-8')
+
+        assert len(Gazetteer.load(str(path))) == 0
+
+    def test_get_gazetteer_bad_file(self, tmp_path, monkeypatch):
+        """This method tests that a file which can't be read gives no
+        gazetteer and isn't read again.
+
+        Args:
+            tmp_path (Path): Temporary directory from pytest.
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+        """
+        path = tmp_path / "places.csv"
+        path.write_bytes(b"name,latitude,longitude\n\xe9,1,2\n")
+        loads = []
+        load_file = Gazetteer.load
+
+        def load(path):
+            loads.append(path)
+            return load_file(path)
+
+        monkeypatch.setitem(config.value, 'GAZETTEER', {'PATH': str(path)})
+        monkeypatch.setattr(gazetteer_module, '_gazetteer', None)
+        monkeypatch.setattr(gazetteer_module, '_loaded', False)
+        monkeypatch.setattr(Gazetteer, 'load', load)
+
+        assert get_gazetteer() is None
+        assert get_gazetteer() is None
+        assert loads == [str(path)]
@@ -0,0 +1,113 @@
+import pytest
+
+import configuration.config as config
+
+from flaskr import geoindex
+from flaskr.geoindex import GeoIndex, build_index, main
+
+
+class TestGeoIndex:
+    """This class contains all the methods to test the GeoIndex."""
+
+    POINTS = [(51281575, 48.8738, 2.3515),
+              (18618509, 48.8790, 2.3560),
+              (681159, 43.2965, 5.3698)]
+
+    def test_nearest(self, tmp_path):
+        """This method tests that the nearest page within the radius is found.
+
+        Args:
+            tmp_path (Path): Temporary directory from pytest.
+        """
+        path = str(tmp_path / "geoindex.bin")
+        build_index(self.POINTS, path)
+        geo_index = GeoIndex(path)
+
+        page_id, distance = geo_index.nearest(48.874847, 2.350487, 1000)
+
+        assert len(geo_index) == 3
+        assert page_id == 51281575
+        assert 130 < distance < 150
+
+    def test_nearest_across_cells(self, tmp_path):
+        """This method tests that a page in a neighbour cell is found.
+
+        Args:
+            tmp_path (Path): Temporary directory from pytest.
+        """
+        path = str(tmp_path / "geoindex.bin")
+        build_index(self.POINTS, path, cell_size=0.001)
+
+        page_id, distance = GeoIndex(path).nearest(48.8780, 2.3560, 1000)
+
+        assert page_id == 18618509
+
+    def test_nothing_within_radius(self, tmp_path):
+        """This method tests that no page is found far from every point.
+
+        Args:
+            tmp_path (Path): Temporary directory from pytest.
+        """
+        path = str(tmp_path / "geoindex.bin")
+        build_index(self.POINTS, path)
+
+        assert GeoIndex(path).nearest(45.7640, 4.8357, 1000) is None
+
+    def test_truncated_file(self, tmp_path):
+        """This method tests that a truncated index file is rejected.
+
+        Args:
+            tmp_path (Path): Temporary directory from pytest.
+        """
+        path = tmp_path / "geoindex.bin"
+        build_index(self.POINTS, str(path))
+        data = path.read_bytes()
+
+        for size in (10, len(data) - 8):
+            path.write_bytes(data[:size])
+            with pytest.raises(ValueError):
+                GeoIndex(str(path))
+
+    def test_get_geo_index_bad_file(self, tmp_path, monkeypatch):
+        """This method tests that a file which can't be opened gives no geo
+        index and isn't opened again.
+
+        Args:
+            tmp_path (Path): Temporary directory from pytest.
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+        """
+        path = tmp_path / "geoindex.bin"
+        path.write_bytes(b"0123456789")
+        opened = []
+
+        def open_index(path):
+            opened.append(path)
+            return GeoIndex(path)
+
+        monkeypatch.setitem(config.value, 'GEO_INDEX', {'PATH': str(path)})
+        monkeypatch.setattr(geoindex, '_geo_index', None)
+        monkeypatch.setattr(geoindex, '_loaded', False)
+        monkeypatch.setattr(geoindex, 'GeoIndex', open_index)
+
+        assert geoindex.get_geo_index() is None
+        assert geoindex.get_geo_index() is None
+        assert opened == [str(path)]
+
+    def test_main(self, tmp_path, capsys):
+        """This method tests the command which builds the index from a dump.
+
+        Args:
+            tmp_path (Path): Temporary directory from pytest.
+            capsys (CaptureFixture): Captures the output.
+        """
+        dump = tmp_path / "coordinates.csv"
+        dump.write_text("page_id,lat,lon\n51281575,48.8738,2.3515\n",
+                        encoding='utf-8')
+        path = str(tmp_path / "geoindex.bin")
+
+        main([str(dump), path])
+
+        assert GeoIndex(path).nearest(48.8738, 2.3515, 10)[0] == 51281575
+        assert "1 pages" in capsys.readouterr().out
@@ -0,0 +1,119 @@
+import json
+import os
+import time
+
+from flaskr import metrics
+from flaskr.run import app
+from tests.test_utils import MockRequestGet
+
+
+class TestMetrics:
+    """This class contains all the methods to test the metrics."""
+
+    def test_histogram(self):
+        """This method tests the buckets of a histogram in the text format of
+        Prometheus."""
+        histogram = metrics.Histogram("test_seconds", "Test.", ("stage",),
+                                      (0.1, 1))
+        histogram.observe(0.05, "parse")
+        histogram.observe(0.5, "parse")
+        histogram.observe(5, "parse")
+
+        lines = histogram.render()
+
+        assert 'test_seconds_bucket{stage="parse",le="0.1"} 1' in lines
+        assert 'test_seconds_bucket{stage="parse",le="1"} 2' in lines
+        assert 'test_seconds_bucket{stage="parse",le="+Inf"} 3' in lines
+        assert 'test_seconds_count{stage="parse"} 3' in lines
+
+    def test_request_timings(self):
+        """This method tests that the stages run in a request are added to
+        its timings."""
+        with metrics.request_timings() as timings:
+            with metrics.stage("parse"):
+                pass
+            with metrics.stage("parse"):
+                pass
+
+        assert set(timings) == {"parse", "total"}
+        assert metrics.server_timing({"parse": 0.0012}) == "parse;dur=1.2"
+
+    def test_nested_stages(self):
+        """This method tests that the duration of a stage doesn't include the
+        stages nested in it, so the stages add up to at most the total."""
+        with metrics.request_timings() as timings:
+            with metrics.stage("geosearch"):
+                with metrics.stage("sections"):
+                    time.sleep(0.05)
+            with metrics.stage("sections"):
+                pass
+
+        assert timings["sections"] >= 0.05
+        assert timings["geosearch"] < 0.05
+        assert timings["geosearch"] + timings["sections"] <= timings["total"]
+
+    def test_workers(self, monkeypatch, tmp_path):
+        """This method tests that the metrics of all the workers are added up,
+        and that those of a worker gone are kept in the archive."""
+        monkeypatch.setitem(metrics.config.value, 'METRICS',
+                            {"DIRECTORY": None, "FLUSH_INTERVAL": 1})
+        (tmp_path / "old.json").write_text("{}")
+        directory = metrics.prepare(str(tmp_path))
+        metrics.clear()
+        other = {"grandpy_upstream_responses": [[["host", "200"], 2]],
+                 "grandpy_stage_seconds": [
+                     [["parse"], [[1] + [0] * 11, 0.001]]]}
+        (tmp_path / "1.json").write_text(json.dumps(other))
+        (tmp_path / "2.json").write_text(json.dumps(other))
+
+        metrics.observe_upstream("http://host/", 200, 0.001)
+        metrics.archive(2)
+        text = metrics.render()
+        metrics.clear()
+
+        assert directory == str(tmp_path)
+        assert sorted(os.listdir(tmp_path)) == [
+            "1.json", f"{os.getpid()}.json", metrics.ARCHIVE]
+        assert 'grandpy_upstream_responses_total{host="host",' \
+               'status="200"} 5' in text
+        assert 'grandpy_stage_seconds_count{stage="parse"} 2' in text
+
+
+class TestMetricsRoutes:
+    """This class contains all the methods to test the routes of the
+    metrics."""
+
+    def test_form_server_timing(self, monkeypatch):
+        """This method tests that the form route sends the timings of the
+        stages and records the responses of the apis.
+
+        Args:
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+        """
+        def mock_get(session, url, params=None, **kwargs):
+            return MockRequestGet(url, params)
+
+        monkeypatch.setattr('flaskr.models.requests.Session.get', mock_get)
+        monkeypatch.setattr('flaskr.utils.parse_data_from_user',
+                            lambda data: data.lower())
+        metrics.clear()
+        client = app.test_client()
+
+        response = client.post('/form', data={"user_text": "OpenClassrooms"})
+        stages = [metric.split(";")[0] for metric in
+                  response.headers["Server-Timing"].split(", ")]
+
+        assert stages == ["parse", "geocode", "sections", "geosearch",
+                          "extract", "format", "total"]
+        assert metrics.upstream_responses.get(
+            "maps.googleapis.com", "200") == 1
+
+        response = client.get('/metrics')
+        text = response.get_data(as_text=True)
+
+        assert response.status_code == 200
+        assert 'grandpy_stage_seconds_count{stage="geocode"} 1' in text
+        assert ('grandpy_upstream_responses_total{host="fr.wikipedia.org",'
+                'status="200"} 1') in text
@@ -1,7 +1,13 @@
 import json
 import os
+import re
 
-from flaskr.models import GoogleApi, Message, Parser, Response, WikiApi
+import configuration.config as config
+
+from benchmarks.data import QUESTIONS
+from flaskr import models
+from flaskr.models import (GeocodeResult, GoogleApi, Message, Parser,
+                           Response, WikiApi, WikiPage, stem)
 from flaskr.run import app
 
 
@@ -11,7 +17,7 @@ class TestGoogleApi:
     class MockRequestGet:
         """This class mock the get method from Request for google api."""
 
-        def __init__(self, url, params=None):
+        def __init__(self, url, params=None, **kwargs):
             """Constructor of the class MockRequestGet.
 
             Args:
@@ -42,24 +48,26 @@ class TestGoogleApi:
             by another and go back to the initial method after the process
             instructions are done.
         """
+        monkeypatch.setattr('flaskr.models.requests.Session.get',
+                            self.MockRequestGet)
+        response = GoogleApi().send_request("OpenClassrooms")
 
-        results = {
-            "results": [
-                {
-                    "address_components": [
-                        {"long_name": "Paris"}],
-                    "formatted_address": "7 Cité Paradis, 75010 Paris, France",
-                    "geometry": {"location":
-                                 {"lat": 48.874847, "lng": 2.350487}}
-                }
-            ],
-            "status": 'OK'
-        }
+        assert isinstance(response, GeocodeResult)
+        assert response.status == "OK"
+        assert response.formatted_address == (
+            "7 Cité Paradis, 75010 Paris, France")
+        assert (response.latitude, response.longitude) == (48.874847,
+                                                           2.350487)
+        assert not hasattr(response, "__dict__")
 
-        monkeypatch.setattr('flaskr.models.requests.get', self.MockRequestGet)
-        response = GoogleApi().send_request("OpenClassrooms")
+    def test_send_request_without_geometry(self):
+        """This method tests that a response OK whose first result can't be
+        read gives a status which is not OK."""
+        result = GeocodeResult.from_json(
+            {"results": [{"formatted_address": "Paris"}], "status": "OK"})
 
-        assert response == results
+        assert result.status == "UNKNOWN_ERROR"
+        assert result.latitude is None
 
     def test_get_formatted_address(self, monkeypatch):
         """This method tests the send request method.
@@ -71,7 +79,8 @@ class TestGoogleApi:
         """
         result = "7 Cité Paradis, 75010 Paris, France"
 
-        monkeypatch.setattr('flaskr.models.requests.get', self.MockRequestGet)
+        monkeypatch.setattr('flaskr.models.requests.Session.get',
+                            self.MockRequestGet)
         google_api = GoogleApi()
         google_api.send_request("OpenClassrooms")
         formatted_address = google_api.get_formatted_address()
@@ -88,7 +97,8 @@ class TestGoogleApi:
         """
         result = 2.350487
 
-        monkeypatch.setattr('flaskr.models.requests.get', self.MockRequestGet)
+        monkeypatch.setattr('flaskr.models.requests.Session.get',
+                            self.MockRequestGet)
         google_api = GoogleApi()
         google_api.send_request("OpenClassrooms")
 
@@ -106,7 +116,8 @@ class TestGoogleApi:
         """
         result = 48.874847
 
-        monkeypatch.setattr('flaskr.models.requests.get', self.MockRequestGet)
+        monkeypatch.setattr('flaskr.models.requests.Session.get',
+                            self.MockRequestGet)
         google_api = GoogleApi()
         google_api.send_request("OpenClassrooms")
 
@@ -124,7 +135,8 @@ class TestGoogleApi:
         """
         result = "OK"
 
-        monkeypatch.setattr('flaskr.models.requests.get', self.MockRequestGet)
+        monkeypatch.setattr('flaskr.models.requests.Session.get',
+                            self.MockRequestGet)
         google_api = GoogleApi()
         google_api.send_request("OpenClassrooms")
 
@@ -142,7 +154,8 @@ class TestGoogleApi:
         """
         result = "NOT OK"
 
-        monkeypatch.setattr('flaskr.models.requests.get', self.MockRequestGet)
+        monkeypatch.setattr('flaskr.models.requests.Session.get',
+                            self.MockRequestGet)
         google_api = GoogleApi()
         google_api.send_request("OpenClassrooms")
 
@@ -151,13 +164,54 @@ class TestGoogleApi:
 
         assert status == result
 
+    def test_set_status_keeps_cache(self, monkeypatch):
+        """This method tests that set_status doesn't change the result shared
+        with the geocode cache.
+
+        Args:
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+        """
+        monkeypatch.setattr('flaskr.models.requests.Session.get',
+                            self.MockRequestGet)
+        google_api = GoogleApi()
+        google_api.send_request("OpenClassrooms")
+        google_api.set_status("NOT OK")
+
+        assert GoogleApi().send_request("OpenClassrooms").status == "OK"
+        assert google_api.get_latitude() == 48.874847
+
+    def test_send_request_cached(self, monkeypatch):
+        """This method tests that a second request for the same place is
+        answered by the cache.
+
+        Args:
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+        """
+        calls = []
+
+        def mock_get(session, url, params=None, **kwargs):
+            calls.append(params['address'])
+            return self.MockRequestGet(url, params)
+
+        monkeypatch.setattr('flaskr.models.requests.Session.get', mock_get)
+        GoogleApi().send_request("OpenClassrooms")
+        google_api = GoogleApi()
+        google_api.send_request("OpenClassrooms")
+
+        assert calls == ["OpenClassrooms"]
+        assert google_api.get_status() == "OK"
+
 
 class TestWikiApi:
     """This class contains all the methods to test the Wiki API."""
     class MockRequestGetGeosearch:
         """This class mock the get method from Request for wikimedia."""
 
-        def __init__(self, url, params=None):
+        def __init__(self, url, params=None, **kwargs):
             """Constructor of the class MockRequestGetGeosearch.
 
             Args:
@@ -176,7 +230,7 @@ class TestWikiApi:
                                              'primary': ''}]}}
 
     class MockRequestGetPageId:
-        def __init__(self, url, params=None):
+        def __init__(self, url, params=None, **kwargs):
             """Constructor of the class MockRequestGet.
 
             Args:
@@ -202,6 +256,59 @@ class TestWikiApi:
                                 "extract": "Text description of the page",
                                 "fullurl": "https://fr.wikipedia.org/wiki/"}}}}
 
+        encoding = "utf-8"
+
+        def iter_content(self, chunk_size, decode_unicode=False):
+            """This method returns the body of a streamed response.
+
+            Args:
+                chunk_size (Int): Size of the chunks.
+                decode_unicode (Boolean, optional): Decode the chunks.
+
+            Yields:
+                [String]: Chunks of the JSON text.
+            """
+            text = json.dumps(self.json())
+            for start in range(0, len(text), chunk_size):
+                yield text[start:start + chunk_size]
+
+        def close(self):
+            """This method closes the streamed response."""
+
+    class MockRequestGetGeosearchPages:
+        """This class mock the get method from Request for a geosearch pages
+        request."""
+
+        def __init__(self, url, params=None, **kwargs):
+            """Constructor of the class MockRequestGetGeosearchPages.
+
+            Args:
+                url (String): Url endpoint for the api.
+            """
+            self.status_code = 200
+
+        def json(self):
+            """This method returns the data get from the request into JSON.
+
+            Returns:
+                [JSON]: Contains the data from the api.
+            """
+            return {"batchcomplete": "",
+                    "query": {
+                        "pages": {
+                            "18618509": {
+                                "pageid": 18618509,
+                                "title": "Wikimedia Foundation",
+                                "coordinates": [{"dist": 650.2}],
+                                "fullurl": "https://fr.wikipedia.org/wiki/"},
+                            "51281575": {
+                                "pageid": 51281575,
+                                "title": "Studio Berçot",
+                                "coordinates": [{"dist": 138}],
+                                "extract": "Intro == Histoire == Texte ==",
+                                "fullurl": "https://fr.wikipedia.org/wiki/S"}
+                        }}}
+
     def test_send_geosearch_request(self, monkeypatch):
         """This method tests send_geosearch_request method.
 
@@ -211,21 +318,12 @@ class TestWikiApi:
             instructions are done.
         """
 
-        results = {'batchcomplete': '',
-                   'query': {'geosearch': [{'pageid': 51281575,
-                                            'ns': 0,
-                                            'title': 'Studio Berçot',
-                                            'lat': 48.8738,
-                                            'lon': 2.3515,
-                                            'dist': 138,
-                                            'primary': ''}]}}
-
-        monkeypatch.setattr("flaskr.models.requests.get",
+        monkeypatch.setattr("flaskr.models.requests.Session.get",
                             self.MockRequestGetGeosearch)
         wikimedia_api = WikiApi()
         response = wikimedia_api.send_geosearch_request(48.8738, 2.3515)
 
-        assert response == results
+        assert response == [51281575]
 
     def test_send_pageids_request(self, monkeypatch):
         """This method tests send_pageids_request method.
@@ -236,24 +334,15 @@ class TestWikiApi:
             instructions are done.
         """
 
-        results = {"batchcomplete": "",
-                   "warnings": {
-                       "extracts": {}},
-                   "query": {
-                       "pages": {
-                           "18618509": {
-                               "pageid": 18618509,
-                               "ns": 0,
-                               "title": "Wikimedia Foundation",
-                               "extract": "Text description of the page",
-                               "fullurl": "https://fr.wikipedia.org/wiki/"}}}}
-
-        monkeypatch.setattr("flaskr.models.requests.get",
+        monkeypatch.setattr("flaskr.models.requests.Session.get",
                             self.MockRequestGetPageId)
         wikimedia_api = WikiApi()
         response = wikimedia_api.send_pageids_request(18618509)
 
-        assert response == results
+        assert isinstance(response, WikiPage)
+        assert response.page_id == 18618509
+        assert response.extract == "Text description of the page"
+        assert response.url == "https://fr.wikipedia.org/wiki/"
 
     def test_get_extract(self, monkeypatch):
         """This method tests get_extract method.
@@ -267,7 +356,7 @@ class TestWikiApi:
         result = "Text description of the page"
         page_id = 18618509
 
-        monkeypatch.setattr("flaskr.models.requests.get",
+        monkeypatch.setattr("flaskr.models.requests.Session.get",
                             self.MockRequestGetPageId)
         wikimedia_api = WikiApi()
         wikimedia_api.send_pageids_request(page_id)
@@ -286,7 +375,7 @@ class TestWikiApi:
         """
         result = 51281575
 
-        monkeypatch.setattr('flaskr.models.requests.get',
+        monkeypatch.setattr('flaskr.models.requests.Session.get',
                             self.MockRequestGetGeosearch)
         wikimedia_api = WikiApi()
         wikimedia_api.send_geosearch_request(48.8738, 2.3515)
@@ -295,6 +384,29 @@ class TestWikiApi:
 
         assert page_id == result
 
+    def test_send_geosearch_request_cached(self, monkeypatch):
+        """This method tests that a geosearch for a point close to a previous
+        one is answered by the cache.
+
+        Args:
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+        """
+        calls = []
+
+        def mock_get(session, url, params=None, **kwargs):
+            calls.append(params['gscoord'])
+            return self.MockRequestGetGeosearch(url, params)
+
+        monkeypatch.setattr('flaskr.models.requests.Session.get', mock_get)
+        WikiApi().send_geosearch_request(48.8738, 2.3515)
+        wikimedia_api = WikiApi()
+        wikimedia_api.send_geosearch_request(48.87381, 2.35151)
+
+        assert calls == ["48.8738|2.3515"]
+        assert wikimedia_api.get_page_id() == 51281575
+
     def test_get_wiki_url(self, monkeypatch):
         """This method tests get_wiki_url method.
 
@@ -306,7 +418,7 @@ class TestWikiApi:
         result = "https://fr.wikipedia.org/wiki/"
         page_id = 18618509
 
-        monkeypatch.setattr("flaskr.models.requests.get",
+        monkeypatch.setattr("flaskr.models.requests.Session.get",
                             self.MockRequestGetPageId)
         wikimedia_api = WikiApi()
         wikimedia_api.send_pageids_request(page_id)
@@ -315,6 +427,172 @@ class TestWikiApi:
 
         assert fullurl == result
 
+    def test_find_candidate_ids(self, monkeypatch):
+        """This method tests that find_candidate_ids gives the nearest page
+        first, and caches the extract received with the geosearch.
+
+        Args:
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+        """
+        calls = []
+
+        def mock_get(session, url, params=None, **kwargs):
+            calls.append(params.get('generator'))
+            return self.MockRequestGetGeosearchPages(url, params)
+
+        monkeypatch.setattr('flaskr.models.requests.Session.get', mock_get)
+        page_ids = WikiApi().find_candidate_ids(48.8738, 2.3515)
+        page = WikiApi().get_page(page_ids[0])
+
+        assert page_ids[0] == 51281575
+        assert page.sections == [("Histoire", "Texte")]
+        assert calls == ["geosearch"]
+
+    def test_find_candidate_ids_without_coordinates(self, monkeypatch):
+        """This method tests that no page is looked for without coordinates.
+
+        Args:
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+        """
+        calls = []
+        monkeypatch.setattr('flaskr.models.requests.Session.get',
+                            lambda *args, **kwargs: calls.append(args))
+
+        assert WikiApi().find_candidate_ids(None, None) == []
+        assert calls == []
+
+    def test_get_cell(self, monkeypatch):
+        """This method tests that the cells of the geosearch cache follow the
+        radius of the geosearch.
+
+        Args:
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+        """
+        cell = WikiApi._get_cell(48.874847, 2.350487)
+        monkeypatch.setitem(config.value['MEDIA_WIKI'], 'GS_RADIUS', 10000)
+
+        assert WikiApi._get_cell(48.874847, 2.350487) != cell
+        assert WikiApi._get_cell(48.874847, 2.350487) == (
+            models.quantize_coordinates(48.874847, 2.350487, 1000))
+
+    def test_get_page_cached(self, monkeypatch):
+        """This method tests that get_page split the extract into sections and
+        answers a second call from the cache.
+
+        Args:
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+        """
+        calls = []
+
+        def mock_get(session, url, params=None, **kwargs):
+            calls.append(params['pageids'])
+            return self.MockRequestGetPageId(url, params)
+
+        monkeypatch.setattr('flaskr.models.requests.Session.get', mock_get)
+        WikiApi().get_page(18618509)
+        page = WikiApi().get_page(18618509)
+
+        assert calls == ["18618509"]
+        assert page.url == "https://fr.wikipedia.org/wiki/"
+        assert page.sections == []
+        assert page.extract is None
+
+    def test_get_page_trimmed(self, monkeypatch):
+        """This method tests that the extract is requested trimmed, and in
+        full when its first section is cut by the character limit.
+
+        Args:
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+        """
+        calls = []
+        extracts = {True: "Intro == Histoire == Texte cou...",
+                    False: "Intro == Histoire == Texte complet == Voir =="}
+
+        class MockResponse:
+            status_code = 200
+            encoding = "utf-8"
+
+            def __init__(self, extract):
+                self.extract = extract
+
+            def json(self):
+                return {"query": {"pages": {"7": {
+                    "pageid": 7, "extract": self.extract,
+                    "fullurl": "https://fr.wikipedia.org/wiki/"}}}}
+
+            def iter_content(self, chunk_size, decode_unicode=False):
+                text = json.dumps(self.json())
+                for start in range(0, len(text), 5):
+                    yield text[start:start + 5]
+
+            def close(self):
+                pass
+
+        def mock_get(session, url, params=None, **kwargs):
+            calls.append(params.get('exchars'))
+            return MockResponse(extracts['exchars' in params])
+
+        monkeypatch.setattr('flaskr.models.requests.Session.get', mock_get)
+        monkeypatch.setitem(config.value['MEDIA_WIKI']['EXTRACT'], 'TRIMMED',
+                            True)
+        page = WikiApi().get_page(7)
+
+        assert calls == ["1200", None]
+        assert page.sections[0] == ("Histoire", "Texte complet")
+
+    def test_get_page_streamed(self, monkeypatch):
+        """This method tests that the extract is requested once, and that its
+        reading stops once the first section is found, the keys of the page
+        having come before the extract.
+
+        Args:
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+        """
+        calls = []
+        chunks = []
+        extract = "Intro == Histoire == Texte == Voir ==" + "x" * 5000
+        text = json.dumps({"query": {"pages": {"7": {
+            "pageid": 7, "lastrevid": 42,
+            "fullurl": "https://fr.wikipedia.org/wiki/",
+            "extract": extract}}}})
+
+        class MockResponse:
+            status_code = 200
+            encoding = "utf-8"
+
+            def iter_content(self, chunk_size, decode_unicode=False):
+                for start in range(0, len(text), 100):
+                    chunks.append(start)
+                    yield text[start:start + 100]
+
+            def close(self):
+                pass
+
+        def mock_get(session, url, params=None, **kwargs):
+            calls.append(params.get('exchars'))
+            return MockResponse()
+
+        monkeypatch.setattr('flaskr.models.requests.Session.get', mock_get)
+        page = WikiApi().get_page(7)
+
+        assert calls == [None]
+        assert len(chunks) < 5
+        assert (page.url, page.revision) == ("https://fr.wikipedia.org/wiki/",
+                                             42)
+        assert page.sections == [("Histoire", "Texte")]
+
 
 class TestParser:
     """This class contains all the methods to test the Parser."""
@@ -378,6 +656,34 @@ class TestParser:
 
         assert parser.remove_apostrof() == result
 
+    def test_normalize(self):
+        """This method tests that normalize gives the same string as the chain
+        of methods it replaces."""
+        messages = ["Salut GrandPy! Est-ce que tu connais l'adresse "
+                    "d’OpenClassrooms ?",
+                    "ÉCOLE Straße Ωμέγα  ÇA —va ?",
+                    ""]
+
+        for message in messages:
+            parser = Parser(message)
+            parser.set_lowercase()
+            parser.remove_accents()
+            parser.remove_apostrof()
+            parser.remove_hyphen()
+            parser.remove_stop_words()
+
+            assert Parser(message).normalize() == parser.message
+
+    def test_normalization_table_bounded(self):
+        """This method tests that the characters above MAX_CODE are translated
+        without being kept in the table."""
+        message = "Ça \U0001d400\U0001f600"
+
+        assert message.translate(models.normalization_table) == "ca A"
+        assert ord("Ç") in models.normalization_table
+        assert 0x1d400 not in models.normalization_table
+        assert 0x1f600 not in models.normalization_table
+
     def test_pick_up_question(self):
         """This method test pick_up_question method."""
         message = ["donne moi l'adresse de",
@@ -388,6 +694,27 @@ class TestParser:
 
         assert parser._pick_up_question(message) == result
 
+    def test_pick_up_question_stems(self, monkeypatch):
+        """This method test that pick_up_question compares the stems of the
+        words with the stems of the detect words, and memoizes the stems.
+
+        Args:
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+        """
+        monkeypatch.setattr('flaskr.models.word_tokenize', str.split)
+        message = ["quel temps fait il",
+                   "quelle est l adresse de la tour eiffel"]
+        result = "quelle est l adresse de la tour eiffel"
+
+        parser = Parser("")
+        stem.cache_clear()
+
+        assert parser._pick_up_question(message) == result
+        parser._pick_up_question(message)
+        assert stem.cache_info().hits >= 10
+
     def test_get_section(self):
         """This method test get_section method."""
         result = "1ère section : contenu de la section"
@@ -398,6 +725,61 @@ class TestParser:
 
         assert parser.get_section() == result
 
+    def test_split_sections(self):
+        """This method test split_sections method."""
+        result = [("1ère section", "contenu de la section"),
+                  ("contenu de la section", "2ème section"),
+                  ("2ème section", "contenu")]
+        message = (" Premier paragraphe == 1ère section == "
+                   "contenu de la section\n"
+                   "                        == 2ème section == contenu ==")
+
+        parser = Parser(message)
+
+        assert parser.split_sections() == result
+
+
+class TestTokenizer:
+    """This class contains all the methods to test the tokenizers."""
+
+    def test_regex_parity(self):
+        """This method tests that the regex tokenizer gives the words of the
+        tokenizer of NLTK, for the questions and their normalized form. A
+        question is one sentence, so NLTK is run without its punkt model."""
+        from nltk.tokenize import word_tokenize
+
+        def words(tokens):
+            return [token for token in tokens if re.search(r"\w", token)]
+
+        for question in QUESTIONS:
+            for text in (question, Parser(question).normalize()):
+                assert words(models.regex_tokenize(text)) == words(
+                    word_tokenize(text, preserve_line=True))
+
+    def test_regex_tokenize(self):
+        """This method tests that the regex tokenizer keeps the apostrophes
+        and hyphens inside the words and splits the punctuation marks."""
+        result = ["Est-ce", "que", "tu", "connais", "l'adresse", "?"]
+
+        assert models.regex_tokenize("Est-ce que tu connais l'adresse ?") \
+            == result
+
+    def test_select_tokenizer(self, monkeypatch):
+        """This method tests that word_tokenize uses the tokenizer set in
+        PARSER.TOKENIZER.
+
+        Args:
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+        """
+        monkeypatch.setitem(config.value['PARSER'], 'TOKENIZER', 'regex')
+        assert models.word_tokenize("tour eiffel?") == ["tour", "eiffel", "?"]
+
+        monkeypatch.setitem(models.TOKENIZERS, 'nltk', str.split)
+        monkeypatch.setitem(config.value['PARSER'], 'TOKENIZER', 'nltk')
+        assert models.word_tokenize("tour eiffel?") == ["tour", "eiffel?"]
+
 
 class TestResponse:
     """This class contains all the methods to test Response."""
@@ -445,7 +827,7 @@ class TestMessage:
                     ["Bien sûr mon poussin ! La voici:"]}
 
         result = "Bien sûr mon poussin ! La voici:"
-        monkeypatch.setattr('flaskr.models.json.load',
+        monkeypatch.setattr('flaskr.resources.json.load',
                             mock_json_load)
         data_message = Message.get_answers_from_json()
 
@@ -468,7 +850,7 @@ class TestMessage:
                     ["story"]}
 
         result = "story"
-        monkeypatch.setattr('flaskr.models.json.load',
+        monkeypatch.setattr('flaskr.resources.json.load',
                             mock_json_load)
         data_message = Message.get_answers_from_json()
 
@@ -491,7 +873,7 @@ class TestMessage:
                     ["error"]}
 
         result = "error"
-        monkeypatch.setattr('flaskr.models.json.load',
+        monkeypatch.setattr('flaskr.resources.json.load',
                             mock_json_load)
         data_message = Message.get_answers_from_json()
 
@@ -522,3 +904,57 @@ class TestAppRoutes:
 
         response = client.post(url, data=mock_request_data)
         assert response.status_code == 200
+
+    def test_form_batch(self, monkeypatch):
+        """This method tests the post method on form batch route.
+
+        Args:
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+        """
+        monkeypatch.setattr('flaskr.views.treat_batch_from_user',
+                            lambda data: [{"question": q} for q in data])
+        client = app.test_client()
+
+        response = client.post('/form/batch',
+                               json={"questions": ["a?", "b?"]})
+
+        assert response.status_code == 200
+        assert response.get_json() == {
+            "results": [{"question": "a?"}, {"question": "b?"}]}
+
+    def test_form_batch_invalid(self):
+        """This method tests that the form batch route rejects a body without
+        a list of questions."""
+        client = app.test_client()
+
+        response = client.post('/form/batch', json={"questions": "a?"})
+
+        assert response.status_code == 400
+
+    def test_form_stream(self, monkeypatch):
+        """This method tests that the form stream route sends the address
+        before the story, as server-sent events.
+
+        Args:
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+        """
+        def mock_stream_data_from_user(data):
+            yield "address", {"status": "OK", "latitude": 48.87}
+            yield "story", {"url": "https://fr.wikipedia.org/wiki/"}
+
+        monkeypatch.setattr('flaskr.views.stream_data_from_user',
+                            mock_stream_data_from_user)
+        client = app.test_client()
+
+        response = client.post('/form/stream',
+                               data={"user_text": "Texte de l'utilisateur"})
+
+        assert response.mimetype == "text/event-stream"
+        assert response.get_data(as_text=True) == (
+            'event: address\ndata: {"status": "OK", "latitude": 48.87}\n\n'
+            'event: story\ndata: {"url": "https://fr.wikipedia.org/wiki/"}'
+            '\n\n')
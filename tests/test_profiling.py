@@ -0,0 +1,88 @@
+import configuration.config as config
+
+from flask import Response
+
+from flaskr.profiling import profiled
+from flaskr.run import app
+
+
+def view_function():
+    return "ok"
+
+
+def stream_function():
+    def generate():
+        yield "a"
+        yield str(sum(range(100000)))
+
+    return Response(generate())
+
+
+class TestProfiled:
+    """This class contains all the methods to test the profiling hook."""
+
+    def test_disabled(self, monkeypatch):
+        """This method tests that the view is not wrapped when the profiling
+        is disabled.
+
+        Args:
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+        """
+        monkeypatch.setitem(config.value, 'PROFILING', {"ENABLED": False})
+
+        assert profiled(view_function) is view_function
+
+    def test_profile_with_header(self, monkeypatch, tmp_path):
+        """This method tests that a request with the profiling header writes
+        its stats, named after the id of the request.
+
+        Args:
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+            tmp_path (Path): Temporary directory from pytest.
+        """
+        monkeypatch.setitem(config.value, 'PROFILING', {
+            "ENABLED": True, "HEADER": "X-Profile", "SAMPLE_RATE": 0,
+            "DIRECTORY": str(tmp_path)})
+        view = profiled(view_function)
+
+        with app.test_request_context(headers={"X-Profile": "1",
+                                               "X-Request-Id": "abc-1"}):
+            response = view()
+
+        assert response.headers["X-Profile-Id"] == "abc-1"
+        assert (tmp_path / "abc-1.pstats").exists()
+        assert "view_function" in (tmp_path / "abc-1.collapsed").read_text()
+
+        with app.test_request_context():
+            response = view()
+
+        assert response == "ok"
+        assert len(list(tmp_path.iterdir())) == 2
+
+    def test_profile_stream(self, monkeypatch, tmp_path):
+        """This method tests that the body of a streamed response is profiled
+        while it is sent, and its stats written once it is done.
+
+        Args:
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+            tmp_path (Path): Temporary directory from pytest.
+        """
+        monkeypatch.setitem(config.value, 'PROFILING', {
+            "ENABLED": True, "HEADER": "X-Profile", "SAMPLE_RATE": 0,
+            "DIRECTORY": str(tmp_path)})
+        view = profiled(stream_function)
+
+        with app.test_request_context(headers={"X-Profile": "1",
+                                               "X-Request-Id": "abc-2"}):
+            response = view()
+
+        assert response.headers["X-Profile-Id"] == "abc-2"
+        assert not (tmp_path / "abc-2.pstats").exists()
+        assert response.get_data() == b"a4999950000"
+        assert "generate" in (tmp_path / "abc-2.collapsed").read_text()
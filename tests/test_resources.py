@@ -0,0 +1,54 @@
+import os
+
+import configuration.config as config
+
+from flaskr.resources import Resource, stop_words
+
+
+class TestResource:
+    """This class contains all the methods to test the resource registry."""
+
+    def test_stop_words(self):
+        """This method tests that the stop words are loaded into a frozen
+        set."""
+        words = stop_words.get()
+
+        assert isinstance(words, frozenset)
+        assert "abord" in words
+
+    def test_loaded_once(self):
+        """This method tests that the file is read on the first call only."""
+        loads = []
+
+        def build(data):
+            loads.append(data)
+            return tuple(data)
+
+        resource = Resource('detect_word.json', build)
+        resource.get()
+        resource.get()
+
+        assert len(loads) == 1
+
+    def test_auto_reload(self, monkeypatch, tmp_path):
+        """This method tests that a changed file is loaded again when the auto
+        reload is enabled.
+
+        Args:
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+            tmp_path (Path): Temporary directory from pytest.
+        """
+        path = tmp_path / "words.json"
+        path.write_text('["lieu"]', encoding='utf-8')
+        monkeypatch.setitem(config.value, 'RESOURCES', {'AUTO_RELOAD': True})
+        resource = Resource('words.json', frozenset)
+        resource.path = str(path)
+
+        assert resource.get() == frozenset(["lieu"])
+
+        path.write_text('["adresse"]', encoding='utf-8')
+        os.utime(path, (0, 0))
+
+        assert resource.get() == frozenset(["adresse"])
@@ -0,0 +1,150 @@
+import json
+import re
+
+from flaskr.sections import JsonStringReader, PageReader, SectionScanner
+
+EXTRACTS = [
+    "Intro == Histoire == Texte complet == Voir ==",
+    "Intro\n\n== Histoire ==\nTexte\n\n=== Origine ===\nSuite\n== Voir ==",
+    " b ======b==a= = bb=== \n=\n=\n a=",
+    "==== == ===",
+    "Intro == Histoire == Texte cou...",
+    "",
+]
+
+
+def split_with_regex(message):
+    """This function split a message into sections with the regex the parser
+    used before the scanner.
+
+    Args:
+        message (String): Wikipedia extract.
+
+    Returns:
+        [List]: Contains (title, body) tuples.
+    """
+    parts = [match.group().strip() for match in re.finditer(
+        r"(?<=(\={2}))(.*?)(?=(\={2}))", message, re.DOTALL)]
+
+    sections = []
+    for title, body in zip(parts, parts[1:]):
+        if title and body:
+            sections.append((title[1:] if title[0] == '=' else title,
+                             body[1:] if body[0] == '=' else body))
+
+    return sections
+
+
+def split_in_chunks(text, size):
+    """This function split a text into chunks.
+
+    Args:
+        text (String): Text.
+        size (Int): Size of the chunks.
+
+    Returns:
+        [List]: Chunks of the text.
+    """
+    return [text[start:start + size] for start in range(0, len(text), size)]
+
+
+class TestSectionScanner:
+    """This class contains all the methods to test the section scanner."""
+
+    def test_same_sections_as_regex(self):
+        """This method tests that the scanner finds the sections of the regex,
+        whatever the size of the chunks."""
+        for extract in EXTRACTS:
+            for size in (1, 2, 3, 7, 1000):
+                scanner = SectionScanner()
+                for chunk in split_in_chunks(extract, size):
+                    scanner.feed(chunk)
+
+                assert scanner.sections == split_with_regex(extract)
+
+    def test_stops_at_limit(self):
+        """This method tests that the scanner stops once it has the first
+        section, and drops the text it has read."""
+        scanner = SectionScanner(limit=1)
+
+        assert not scanner.feed("Intro == Histoire == Texte ")
+        assert scanner.feed("complet == Voir ==")
+        assert scanner.feed("== Ignoré == Ignoré ==")
+        assert scanner.sections == [("Histoire", "Texte complet")]
+        assert scanner._buffer == ""
+
+    def test_keeps_only_current_part(self):
+        """This method tests that the scanner doesn't keep the parts of the
+        text it has already split."""
+        scanner = SectionScanner()
+        for number in range(1000):
+            scanner.feed(f"== Titre {number} == Texte ")
+
+        assert len(scanner.sections) == 1998
+        assert len(scanner._buffer) < 30
+
+
+class TestPageReader:
+    """This class contains all the methods to test the reading of a page
+    response."""
+
+    def test_read_in_chunks(self):
+        """This method tests that the extract is sent to the scanner and that
+        the rest of the response is decoded, whatever the size of the
+        chunks."""
+        extract = "Intro == Histoire \"é\" 😀 == Texte\\n… == Voir =="
+        data = {"query": {"pages": {"7": {
+            "pageid": 7, "extract": extract,
+            "fullurl": "https://fr.wikipedia.org/wiki/"}}}}
+
+        for ensure_ascii in (True, False):
+            text = json.dumps(data, ensure_ascii=ensure_ascii)
+            for size in (1, 2, 5, 13, 10000):
+                scanner = SectionScanner()
+                reader = PageReader(scanner)
+                for chunk in split_in_chunks(text, size):
+                    reader.feed(chunk)
+                page = reader.close()["query"]["pages"]["7"]
+
+                assert scanner.sections == split_with_regex(extract)
+                assert page["extract"] == ""
+                assert page["fullurl"] == "https://fr.wikipedia.org/wiki/"
+
+    def test_skips_after_first_section(self):
+        """This method tests that the rest of the extract is skipped once the
+        first section is found."""
+        scanner = SectionScanner(limit=1)
+        reader = PageReader(scanner)
+        reader.feed('{"extract": "== A == B == ')
+        reader.feed('C \\" == D ==", "lastrevid": 3}')
+
+        assert scanner.sections == [("A", "B")]
+        assert reader.close() == {"extract": "", "lastrevid": 3}
+
+    def test_done_with_keys(self):
+        """This method tests that the reader is done once the first section
+        is found, only if the keys came before the extract, and that the
+        response is then closed after the extract."""
+        reader = PageReader(SectionScanner(limit=1), keys=("lastrevid",))
+        reader.feed('{"pages": [{"lastrevid": 3, "title": "{\\"[", ')
+        reader.feed('"extract": "== A == B == C')
+
+        assert reader.done
+        assert reader.close() == {"pages": [{
+            "lastrevid": 3, "title": '{"[', "extract": ""}]}
+
+        reader = PageReader(SectionScanner(limit=1), keys=("fullurl",))
+        reader.feed('{"lastrevid": 3, "extract": "== A == B == C')
+
+        assert not reader.done
+
+    def test_string_reader_escapes(self):
+        """This method tests that an escape sequence cut between two chunks
+        is decoded once whole."""
+        string = JsonStringReader()
+
+        assert string.feed("a\\u00") == ("a", None)
+        assert string.feed("e9\\ud83d") == ("é", None)
+        assert string.feed("\\ude00\\") == ("😀", None)
+        assert string.feed('"", 1') == ('"', ", 1")
+        assert string.closed
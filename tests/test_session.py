@@ -0,0 +1,36 @@
+from flaskr import session
+
+
+class TestSession:
+    """This class contains all the methods to test the shared session."""
+
+    def test_get_session_is_shared(self):
+        """This method tests that the session is created once per process."""
+        assert session.get_session() is session.get_session()
+
+    def test_get_session_after_fork(self, monkeypatch):
+        """This method tests that a new session is created in a forked
+        process.
+
+        Args:
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+        """
+        parent_session = session.get_session()
+        monkeypatch.setattr('flaskr.session._session_pid', -1)
+
+        assert session.get_session() is not parent_session
+
+    def test_create_session(self):
+        """This method tests the pool and retry settings of the session."""
+        settings = {"POOL_CONNECTIONS": 2, "POOL_MAXSIZE": 5,
+                    "KEEP_ALIVE": False, "RETRIES": 3, "BACKOFF_FACTOR": 0}
+
+        new_session = session.create_session(settings)
+        adapter = new_session.get_adapter("https://fr.wikipedia.org")
+
+        assert isinstance(adapter.max_retries, session.DeadlineRetry)
+        assert adapter.max_retries.total == 3
+        assert adapter._pool_maxsize == 5
+        assert new_session.headers['Connection'] == 'close'
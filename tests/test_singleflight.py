@@ -0,0 +1,115 @@
+import threading
+import time
+
+import pytest
+
+from flaskr.models import GoogleApi
+from flaskr.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    """This class contains all the methods to test the SingleFlight."""
+
+    def test_concurrent_calls_are_coalesced(self):
+        """This method tests that the callers waiting on a running call get
+        its result without running the function again."""
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+        results = []
+
+        def function():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "result"
+
+        leader = threading.Thread(
+            target=lambda: results.append(flight.do("key", function)))
+        leader.start()
+        started.wait(5)
+        followers = [threading.Thread(
+            target=lambda: results.append(flight.do("key", function)))
+            for i in range(5)]
+        for follower in followers:
+            follower.start()
+        deadline = time.monotonic() + 5
+        while (len(flight._calls["key"].done._cond._waiters) < 5
+               and time.monotonic() < deadline):
+            time.sleep(0.001)
+        release.set()
+        for thread in [leader] + followers:
+            thread.join(5)
+
+        assert calls == [1]
+        assert results == ["result"] * 6
+        assert len(flight) == 0
+
+    def test_sequential_calls_are_not_coalesced(self):
+        """This method tests that a call which has finished is not reused."""
+        flight = SingleFlight()
+        calls = []
+
+        flight.do("key", calls.append, 1)
+        flight.do("key", calls.append, 2)
+
+        assert calls == [1, 2]
+
+    def test_error_is_raised(self):
+        """This method tests that the exception of the function is raised."""
+        flight = SingleFlight()
+
+        with pytest.raises(ValueError):
+            flight.do("key", int, "not a number")
+
+        assert len(flight) == 0
+
+
+class TestCoalescedRequests:
+    """This class contains all the methods to test the coalescing of the
+    requests to the apis."""
+
+    def test_send_request(self, monkeypatch):
+        """This method tests that identical concurrent requests to the google
+        api are sent once.
+
+        Args:
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+        """
+        release = threading.Event()
+        calls = []
+
+        class MockResponse:
+            status_code = 200
+
+            def json(self):
+                return {"results": [], "status": "ZERO_RESULTS"}
+
+        def mock_get(session, url, params=None, **kwargs):
+            calls.append(params['address'])
+            release.wait(5)
+            return MockResponse()
+
+        monkeypatch.setattr('flaskr.models.requests.Session.get', mock_get)
+        statuses = []
+
+        def ask():
+            google_api = GoogleApi()
+            google_api.send_request("tour eiffel")
+            statuses.append(google_api.get_status())
+
+        threads = [threading.Thread(target=ask) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        deadline = time.monotonic() + 5
+        while not calls and time.monotonic() < deadline:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert calls == ["tour eiffel"]
+        assert statuses == ["ZERO_RESULTS"] * 4
@@ -0,0 +1,82 @@
+import os
+import subprocess
+import sys
+
+import configuration.config as config
+
+from flaskr import startup
+
+
+class TestConfig:
+    """This class contains all the methods to test the loading of the
+    configuration."""
+
+    def test_load_once(self, tmp_path, monkeypatch):
+        """This method tests that a file already loaded is read again only
+        when asked for.
+
+        Args:
+            tmp_path (Path): Temporary directory from pytest.
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+        """
+        path = tmp_path / "config.yml"
+        path.write_text("STARTUP_TEST: 1\n")
+        monkeypatch.setattr(config, 'value', {})
+
+        config.load(str(path))
+        path.write_text("STARTUP_TEST: 2\n")
+        config.load(str(path))
+        assert config.value['STARTUP_TEST'] == 1
+
+        config.load(str(path), reload=True)
+        assert config.value['STARTUP_TEST'] == 2
+
+
+class TestStartup:
+    """This class contains all the methods to test the cold start of the
+    app."""
+
+    def test_nltk_not_imported(self):
+        """This method tests that importing the app doesn't import NLTK."""
+        output = subprocess.run(
+            [sys.executable, "-c",
+             "import sys, flaskr.run; print('nltk' in sys.modules)"],
+            capture_output=True, text=True, cwd=os.getcwd(), check=True)
+
+        assert output.stdout.strip() == "False"
+
+    def test_preload(self, monkeypatch):
+        """This method tests that every step is run and timed, even after a
+        step which fails, and that the loaded objects are frozen.
+
+        Args:
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+        """
+        calls = []
+
+        def fail():
+            calls.append("tokenizer")
+            raise LookupError("punkt")
+
+        monkeypatch.setattr(startup, 'STEPS', (
+            ("tokenizer", fail),
+            ("resources", lambda: calls.append("resources"))))
+        monkeypatch.setattr(startup.gc, 'freeze',
+                            lambda: calls.append("freeze"))
+
+        timings = startup.preload()
+
+        assert calls == ["tokenizer", "resources", "freeze"]
+        assert list(timings) == ["tokenizer", "resources"]
+
+    def test_describe(self):
+        """This method tests the line logged at the boot of a process."""
+        line = startup.describe("worker", 0.25, {"stemmer": 0.1})
+
+        assert startup.resident_memory() > 0
+        assert line.startswith(f"worker pid={os.getpid()} boot=250ms rss=")
+        assert line.endswith(" stemmer=100ms")
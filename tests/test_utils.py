@@ -0,0 +1,142 @@
+import threading
+
+from flaskr.models import WikiPage
+from flaskr.utils import (select_pages, stream_data_from_user,
+                          treat_batch_from_user)
+
+
+class MockRequestGet:
+    """This class mock the get method from Request for both apis."""
+
+    def __init__(self, url, params=None, **kwargs):
+        """Constructor of the class MockRequestGet.
+
+        Args:
+            url (String): Url endpoint for the api.
+        """
+        self.status_code = 200
+        self.params = params
+
+    def json(self):
+        """This method returns the data get from the request into JSON.
+
+        Returns:
+            [JSON]: Contains the data from the api.
+        """
+        if 'address' in self.params:
+            return {"results": [
+                {"formatted_address": "7 Cité Paradis, 75010 Paris, France",
+                 "geometry": {"location": {"lat": 48.874847,
+                                           "lng": 2.350487}}}],
+                "status": "OK"}
+
+        return {"query": {"pages": {"51281575": {
+            "pageid": 51281575,
+            "coordinates": [{"dist": 138}],
+            "extract": "Intro == Histoire == Texte ==",
+            "fullurl": "https://fr.wikipedia.org/wiki/S"}}}}
+
+
+class TestSelectPages:
+    """This class contains all the methods to test select_pages."""
+
+    def test_skip_page_without_section(self):
+        """This method tests that a page without section is skipped and that
+        a page wanted by two places is fetched once."""
+        pages = {1: WikiPage(1, sections=[]),
+                 2: WikiPage(2, sections=[("a", "b")])}
+        fetched = []
+
+        def fetch_pages(page_ids):
+            fetched.append(sorted(page_ids))
+            return {page_id: pages[page_id] for page_id in page_ids}
+
+        selected = select_pages({"x": [1, 2], "y": [2], "z": []}, fetch_pages)
+
+        assert selected == {"x": (pages[2], 2), "y": (pages[2], 2),
+                            "z": (None, None)}
+        assert fetched == [[1, 2], [2]]
+
+    def test_keep_nearest_page(self):
+        """This method tests that the nearest page is kept if no page has a
+        section."""
+        pages = {1: WikiPage(1, sections=[]), 2: None}
+
+        selected = select_pages(
+            {"x": [1, 2]},
+            lambda page_ids: {page_id: pages[page_id] for page_id in page_ids})
+
+        assert selected == {"x": (pages[1], 1)}
+
+
+class TestTreatBatchFromUser:
+    """This class contains all the methods to test treat_batch_from_user."""
+
+    def test_deduplicate(self, monkeypatch):
+        """This method tests that identical questions are sent once to the
+        apis and that the results keep the order of the batch.
+
+        Args:
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+        """
+        calls = []
+        lock = threading.Lock()
+
+        def mock_get(session, url, params=None, **kwargs):
+            with lock:
+                calls.append(params.get('address', 'wiki'))
+            return MockRequestGet(url, params)
+
+        monkeypatch.setattr('flaskr.models.requests.Session.get', mock_get)
+        monkeypatch.setattr('flaskr.utils.parse_data_from_user',
+                            lambda data: data.lower())
+
+        results = treat_batch_from_user(
+            ["OpenClassrooms", "Nowhere", "openclassrooms"])
+
+        assert sorted(calls) == ["nowhere", "openclassrooms", "wiki"]
+        assert [result["url"] for result in results] == [
+            "https://fr.wikipedia.org/wiki/S"] * 3
+        assert results[1]["message_for_story"] == "Histoire : Texte"
+
+
+class TestStreamDataFromUser:
+    """This class contains all the methods to test stream_data_from_user."""
+
+    def test_address_before_story(self, monkeypatch):
+        """This method tests that the address is yielded before the wiki api
+        is requested.
+
+        Args:
+            monkeypatch (MonkeyPatch): Method from pytest to replace a method
+            by another and go back to the initial method after the process
+            instructions are done.
+        """
+        calls = []
+
+        def mock_get(session, url, params=None, **kwargs):
+            calls.append(params.get('address', 'wiki'))
+            return MockRequestGet(url, params)
+
+        monkeypatch.setattr('flaskr.models.requests.Session.get', mock_get)
+        monkeypatch.setattr('flaskr.utils.parse_data_from_user',
+                            lambda data: data.lower())
+        events = stream_data_from_user("OpenClassrooms")
+
+        event, data = next(events)
+        assert event == "address"
+        assert data["latitude"] == 48.874847
+        assert calls == ["openclassrooms"]
+
+        event, data = next(events)
+        assert event == "story"
+        assert data["message_for_story"] == "Histoire : Texte"
+
+        event, data = next(events)
+        stages = [metric.split(";")[0]
+                  for metric in data["server_timing"].split(", ")]
+        assert event == "timing"
+        assert stages == ["parse", "geocode", "format", "sections",
+                          "geosearch", "extract", "total"]